@@ -0,0 +1,176 @@
+"""
+Embedding Storage Benchmark
+
+Compares the EMBEDDING_STORAGE_MODE options on synthetic data against a
+Postgres instance with pgvector >= 0.7, using the adapter's own index
+definitions (EMBEDDING_INDEXES) and search query (similar_items_sql):
+  - float32: vector(dim) + ivfflat (lists = 100, searched with --probes),
+             top ``limit * candidate_factor`` rows by cosine
+  - half:    halfvec(dim) + HNSW (halfvec_cosine_ops),
+             top ``limit * candidate_factor`` rows by cosine
+  - binary:  halfvec(dim) + HNSW over binary_quantize() (bit_hamming_ops),
+             exact cosine rerank of the top ``limit * rerank_factor`` candidates
+
+Every mode's search is served by its index, so recall is approximate and
+latency reflects the index, not an exact scan.
+
+Reports table/index size, COPY insert throughput, p50/p95 search latency and
+recall@k against exact (NumPy) nearest neighbours. Uses throwaway tables
+prefixed ``bench_embeddings_`` shaped like ``items``, dropped afterwards.
+
+Usage (from the repository root, with .env in place):
+    PYTHONPATH=. python benchmarks/embedding_storage_benchmark.py --dsn postgresql://... --rows 100000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import asyncpg
+import numpy as np
+from pgvector.asyncpg import register_vector
+
+from src.adapters.database.postgres_adapter import EMBEDDING_INDEXES, EMBEDDING_STORAGE_MODES, similar_items_sql
+
+MODES = EMBEDDING_STORAGE_MODES
+
+
+def synthetic_embeddings(rows: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    """Clustered unit vectors, closer to real item-name embeddings than pure noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    assignment = rng.integers(0, clusters, rows)
+    data = centers[assignment] + 0.35 * rng.standard_normal((rows, dim)).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data
+
+
+def exact_top_k(data: np.ndarray, queries: np.ndarray, k: int) -> list[set[int]]:
+    scores = queries @ data.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return [set(row.tolist()) for row in top]
+
+
+def table_sql(mode: str, table: str, dim: int) -> tuple[str, str]:
+    column = f"vector({dim})" if mode == "float32" else f"halfvec({dim})"
+    create = (
+        f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, item_name TEXT NOT NULL, "
+        f"total_price DOUBLE PRECISION NOT NULL, purchase_date TIMESTAMPTZ, item_name_embedding {column})"
+    )
+    _, definition = EMBEDDING_INDEXES[mode]
+    index = f"CREATE INDEX ON {table} {definition.format(column='item_name_embedding', dim=dim)}"
+    return create, index
+
+
+async def run_mode(
+    conn: asyncpg.Connection,
+    mode: str,
+    data: np.ndarray,
+    queries: np.ndarray,
+    truth: list[set[int]],
+    k: int,
+    rerank_factor: int,
+    candidate_factor: int,
+    probes: int,
+) -> dict:
+    dim = data.shape[1]
+    table = f"bench_embeddings_{mode}"
+    create, index = table_sql(mode, table, dim)
+
+    await conn.execute(f"DROP TABLE IF EXISTS {table}")
+    await conn.execute(create)
+
+    start = time.perf_counter()
+    await conn.copy_records_to_table(
+        table,
+        records=((i, f"item {i}", 1.0, None, vector) for i, vector in enumerate(data)),
+        columns=["id", "item_name", "total_price", "purchase_date", "item_name_embedding"],
+    )
+    insert_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await conn.execute(index)
+    index_seconds = time.perf_counter() - start
+
+    table_bytes = await conn.fetchval(f"SELECT pg_table_size('{table}')")
+    index_bytes = await conn.fetchval(f"SELECT pg_indexes_size('{table}')")
+
+    sql = similar_items_sql(
+        mode,
+        "item_name_embedding",
+        dim,
+        rerank_factor if mode == "binary" else candidate_factor,
+        table=table,
+    )
+    await conn.execute("SET hnsw.ef_search = 100")
+    await conn.execute(f"SET ivfflat.probes = {probes}")
+    await conn.execute(f"ANALYZE {table}")
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        rows = await conn.fetch(sql, query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(expected & {int(row["item_name"].split()[-1]) for row in rows})
+
+    await conn.execute(f"DROP TABLE {table}")
+    latencies.sort()
+    return {
+        "mode": mode,
+        "table_mb": table_bytes / 1e6,
+        "index_mb": index_bytes / 1e6,
+        "insert_rows_per_s": len(data) / insert_seconds,
+        "index_build_s": index_seconds,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "recall": hits / (k * len(queries)),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    data = synthetic_embeddings(args.rows, args.dim, args.clusters, args.seed)
+    queries = synthetic_embeddings(args.queries, args.dim, args.clusters, args.seed)
+    truth = exact_top_k(data, queries, args.k)
+
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        await register_vector(conn)
+        results = [
+            await run_mode(
+                conn, mode, data, queries, truth, args.k, args.rerank_factor, args.candidate_factor, args.probes
+            )
+            for mode in args.modes
+        ]
+    finally:
+        await conn.close()
+
+    print(f"\n{args.rows} rows x {args.dim} dims, {args.queries} queries, recall@{args.k}\n")
+    header = f"{'mode':<8} {'table MB':>9} {'index MB':>9} {'insert rows/s':>14} {'index s':>8} {'p50 ms':>7} {'p95 ms':>7} {'recall':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['mode']:<8} {r['table_mb']:>9.1f} {r['index_mb']:>9.1f} {r['insert_rows_per_s']:>14.0f} "
+            f"{r['index_build_s']:>8.1f} {r['p50_ms']:>7.2f} {r['p95_ms']:>7.2f} {r['recall']:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"), help="Postgres DSN (default: $DATABASE_URL)")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank-factor", type=int, default=10)
+    parser.add_argument("--candidate-factor", type=int, default=4)
+    parser.add_argument("--probes", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("--dsn or DATABASE_URL is required")
+    asyncio.run(main(args))
@@ -0,0 +1,179 @@
+"""
+Qdrant Memory Benchmark
+
+Compares long-term memory collection layouts on synthetic data against a
+local Qdrant instance (e.g. ``docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant``):
+  - none:   float32 vectors in RAM
+  - scalar: int8 scalar quantization in RAM, originals on disk, rescored
+  - binary: binary quantization in RAM, originals on disk, rescored
+
+Each layout is built through QdrantLongTermMemory with the same settings the
+app reads (QDRANT_QUANTIZATION, QDRANT_ON_DISK_VECTORS, ...), filled through
+store_memories() and queried through search() with a user_id filter, the
+way MemoryManager recalls memories. Reports upsert throughput, time until
+the collection is indexed, p50/p95 search latency and recall@k against
+exact (NumPy) nearest neighbours within the user. Uses throwaway
+collections prefixed ``bench_memory_`` which are deleted afterwards.
+
+Usage (from the repository root, with .env in place):
+    PYTHONPATH=. python benchmarks/qdrant_memory_benchmark.py --url http://localhost:6333 --points 200000 --users 1000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+import numpy as np
+from qdrant_client.http import models as rest
+
+from src.adapters.memory.qdrant_long_term_memory import QdrantLongTermMemory
+from src.domain.models import MemoryDocument
+
+# (quantization, originals on disk) per layout
+LAYOUTS = {
+    "none": ("none", False),
+    "scalar": ("scalar", True),
+    "binary": ("binary", True),
+}
+
+
+def synthetic_embeddings(rows: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    """Clustered unit vectors, closer to real conversation embeddings than pure noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    assignment = rng.integers(0, clusters, rows)
+    data = centers[assignment] + 0.35 * rng.standard_normal((rows, dim)).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data
+
+
+def exact_top_k(data: np.ndarray, owners: np.ndarray, queries: np.ndarray, query_users: np.ndarray, k: int) -> list[set[int]]:
+    truth = []
+    for query, user in zip(queries, query_users):
+        candidates = np.flatnonzero(owners == user)
+        scores = data[candidates] @ query
+        top = candidates[np.argsort(-scores)[:k]]
+        truth.append(set(top.tolist()))
+    return truth
+
+
+async def wait_until_indexed(memory: QdrantLongTermMemory, collection: str, timeout: float) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        info = await memory._client.get_collection(collection_name=collection)
+        if info.status == rest.CollectionStatus.GREEN:
+            break
+        await asyncio.sleep(0.5)
+    return time.perf_counter() - start
+
+
+async def run_layout(
+    args: argparse.Namespace,
+    layout: str,
+    data: np.ndarray,
+    owners: np.ndarray,
+    queries: np.ndarray,
+    query_users: np.ndarray,
+    truth: list[set[int]],
+) -> dict:
+    quantization, on_disk = LAYOUTS[layout]
+    collection = f"bench_memory_{layout}"
+    memory = QdrantLongTermMemory(
+        url=args.url,
+        collection_name=collection,
+        vector_size=data.shape[1],
+        prefer_grpc=args.grpc,
+        upsert_batch_size=args.batch_size,
+        quantization=quantization,
+        on_disk=on_disk,
+        hnsw_m=args.hnsw_m,
+        hnsw_ef_construct=args.hnsw_ef_construct,
+        tenant_shard_keys=0,
+    )
+    assert memory._client is not None
+    if await memory._client.collection_exists(collection_name=collection):
+        await memory._client.delete_collection(collection_name=collection)
+
+    ids = [str(uuid.UUID(int=i)) for i in range(len(data))]
+    documents = [
+        MemoryDocument(
+            memory_id=ids[i],
+            embedding=data[i].tolist(),
+            content=f"memory {i}",
+            metadata={"user_id": f"user-{owners[i]}", "session_id": f"session-{owners[i]}", "source": "benchmark"},
+        )
+        for i in range(len(data))
+    ]
+
+    await memory.initialize()
+    start = time.perf_counter()
+    chunk = args.batch_size * 8
+    for offset in range(0, len(documents), chunk):
+        await memory.store_memories(documents[offset:offset + chunk])
+    upsert_seconds = time.perf_counter() - start
+    index_seconds = await wait_until_indexed(memory, collection, args.index_timeout)
+
+    telemetry = await memory._client.get_collection(collection_name=collection)
+    latencies, hits = [], 0
+    for query, user, expected in zip(queries, query_users, truth):
+        start = time.perf_counter()
+        results = await memory.search(embedding=query.tolist(), session_id=None, user_id=f"user-{user}", limit=args.k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found = {int(result.content.split()[-1]) for result in results}
+        hits += len(expected & found)
+
+    await memory._client.delete_collection(collection_name=collection)
+    await memory.close()
+    latencies.sort()
+    return {
+        "layout": layout,
+        "upsert_points_per_s": len(data) / upsert_seconds,
+        "index_s": index_seconds,
+        "indexed_vectors": telemetry.indexed_vectors_count or 0,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "recall": hits / sum(len(expected) for expected in truth),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    rng = np.random.default_rng(args.seed)
+    data = synthetic_embeddings(args.points, args.dim, args.clusters, args.seed)
+    owners = rng.integers(0, args.users, args.points)
+    queries = synthetic_embeddings(args.queries, args.dim, args.clusters, args.seed + 1)
+    query_users = owners[rng.integers(0, args.points, args.queries)]
+    truth = exact_top_k(data, owners, queries, query_users, args.k)
+
+    results = [await run_layout(args, layout, data, owners, queries, query_users, truth) for layout in args.layouts]
+
+    print(f"\n{args.points} points x {args.dim} dims, {args.users} users, {args.queries} user-filtered queries, recall@{args.k}\n")
+    header = f"{'layout':<8} {'upsert pts/s':>13} {'index s':>8} {'indexed':>9} {'p50 ms':>7} {'p95 ms':>7} {'recall':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['layout']:<8} {r['upsert_points_per_s']:>13.0f} {r['index_s']:>8.1f} {r['indexed_vectors']:>9} "
+            f"{r['p50_ms']:>7.2f} {r['p95_ms']:>7.2f} {r['recall']:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.environ.get("QDRANT_URL") or "http://localhost:6333")
+    parser.add_argument("--grpc", action="store_true", help="Use gRPC (port 6334)")
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--hnsw-m", type=int, default=16)
+    parser.add_argument("--hnsw-ef-construct", type=int, default=100)
+    parser.add_argument("--index-timeout", type=float, default=600.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--layouts", nargs="+", choices=list(LAYOUTS), default=list(LAYOUTS))
+    asyncio.run(main(parser.parse_args()))
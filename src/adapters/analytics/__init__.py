@@ -0,0 +1,5 @@
+"""
+Analytics Adapters
+
+Columnar implementations of AnalyticsPort for aggregate analyst queries.
+"""
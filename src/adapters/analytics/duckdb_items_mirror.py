@@ -0,0 +1,305 @@
+"""
+DuckDB Items Mirror
+
+Columnar copy of the items table for trend and aggregation questions:
+  - Incrementally mirrors items (minus embeddings) into a local DuckDB file,
+    keyed by id; items are append-only, so an id watermark is enough
+  - Re-reads a trailing window of ids each sync so rows from transactions
+    that committed out of id order are not missed (duplicates are ignored)
+  - Batches are staged as CSV and loaded with COPY, DuckDB's fast ingest path
+  - Answers aggregate-only SELECTs on a per-query cursor in a worker thread;
+    the connection cannot touch files outside its private staging directory
+    and its configuration is locked, and result columns are named the way
+    Postgres names them so answers look the same from either engine
+
+Requires the optional ``duckdb`` dependency (pip install '.[analytics]').
+"""
+
+import asyncio
+import csv
+import json
+import os
+import shutil
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import duckdb
+except ImportError:  # Optional dependency, only needed when ANALYTICS_ENGINE=duckdb
+    duckdb = None
+
+from src.ports.analytics_port import AnalyticsPort, ItemRowsLoader
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_AGGREGATE = re.compile(r"\b(SUM|COUNT|AVG|MIN|MAX)\s*\(|\bGROUP\s+BY\b")
+_TABLE_REFERENCE = re.compile(r"\b(?:FROM|JOIN)\s+([A-Z_][\w.\"]*)")
+# Vector columns/operators only exist in the OLTP database
+_VECTOR_USE = re.compile(r"ITEM_NAME_EMBEDDING|<=>|<->|<#>")
+
+# DuckDB function names whose Postgres result column is named differently
+_POSTGRES_FUNCTION_NAMES = {"count_star": "count"}
+# Postgres names a bare cast after its type
+_POSTGRES_TYPE_NAMES = {
+    "BIGINT": "int8", "INTEGER": "int4", "SMALLINT": "int2", "DOUBLE": "float8",
+    "FLOAT": "float4", "VARCHAR": "text", "TIMESTAMP WITH TIME ZONE": "timestamptz",
+}
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS items (
+        id BIGINT PRIMARY KEY,
+        receipt_id BIGINT,
+        item_name VARCHAR NOT NULL,
+        quantity DOUBLE,
+        unit_price DOUBLE,
+        total_price DOUBLE,
+        purchase_date TIMESTAMPTZ,
+        user_id VARCHAR
+    )
+"""
+
+
+class DuckDBItemsMirror(AnalyticsPort):
+    """Keeps a DuckDB copy of items in sync and serves aggregate queries from it."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        sync_interval_seconds: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        overlap_ids: Optional[int] = None,
+    ):
+        """
+        Initialize DuckDB items mirror.
+
+        Args:
+            path: DuckDB database file. Defaults to settings.ANALYTICS_DUCKDB_PATH
+            sync_interval_seconds: Time between background syncs.
+                                   Defaults to settings.ANALYTICS_SYNC_INTERVAL_SECONDS
+            batch_size: Rows fetched from the loader per round trip.
+                        Defaults to settings.ANALYTICS_SYNC_BATCH_SIZE
+            overlap_ids: Trailing id window re-read every sync.
+                         Defaults to settings.ANALYTICS_SYNC_OVERLAP_IDS
+        """
+        if duckdb is None:
+            raise ImportError(
+                "ANALYTICS_ENGINE=duckdb requires the duckdb package: "
+                "pip install '.[analytics]'"
+            )
+        self._path = path or settings.ANALYTICS_DUCKDB_PATH
+        self._sync_interval = sync_interval_seconds or settings.ANALYTICS_SYNC_INTERVAL_SECONDS
+        self._batch_size = batch_size or settings.ANALYTICS_SYNC_BATCH_SIZE
+        self._overlap_ids = settings.ANALYTICS_SYNC_OVERLAP_IDS if overlap_ids is None else overlap_ids
+
+        self._conn: Optional["duckdb.DuckDBPyConnection"] = None
+        self._staging_dir: Optional[str] = None
+        self._loader: Optional[ItemRowsLoader] = None
+        self._watermark = 0
+        self._synced_through: Optional[float] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._sync_lock = asyncio.Lock()
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+
+    async def start(self, loader: ItemRowsLoader) -> None:
+        """Open the DuckDB file, catch up once, then sync in the background."""
+        self._loader = loader
+        Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = await asyncio.to_thread(self._open)
+        self._watermark = await asyncio.to_thread(self._max_id)
+        logger.info(f"Analytics mirror '{self._path}' opened at item id {self._watermark}.")
+
+        try:
+            await self.sync()
+        except Exception as e:
+            # The mirror is optional; queries go to the database until a sync succeeds
+            logger.error(f"Initial analytics sync failed: {e}")
+        self._sync_task = asyncio.create_task(self._sync_loop())
+
+    def _open(self) -> "duckdb.DuckDBPyConnection":
+        # Analyst SQL runs on this connection: only the sync's own staging directory is readable
+        self._staging_dir = tempfile.mkdtemp(prefix="items-mirror-")
+        conn = duckdb.connect(self._path)
+        # Match Postgres defaults so DATE_TRUNC / CURRENT_DATE agree with the primary
+        conn.execute(f"SET TimeZone = '{settings.ANALYTICS_TIMEZONE}'")
+        conn.execute(SCHEMA)
+        conn.execute("SET allowed_directories = ?", [[os.path.join(self._staging_dir, "")]])
+        conn.execute("SET enable_external_access = false")
+        conn.execute("SET lock_configuration = true")
+        return conn
+
+    def _max_id(self) -> int:
+        return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM items").fetchone()[0]
+
+    async def close(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+        if self._conn is not None:
+            await asyncio.to_thread(self._conn.close)
+            self._conn = None
+        if self._staging_dir is not None:
+            shutil.rmtree(self._staging_dir, ignore_errors=True)
+            self._staging_dir = None
+        logger.info("Analytics mirror closed.")
+
+    # ── Sync ─────────────────────────────────────────────────────────────────
+
+    def notify_write(self) -> None:
+        self._wakeup.set()
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._sync_interval)
+                # Let a burst of writes settle into one sync
+                await asyncio.sleep(settings.ANALYTICS_SYNC_DEBOUNCE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Analytics sync failed: {e}")
+
+    async def sync(self) -> int:
+        """
+        Copy rows added since the last sync.
+
+        Returns:
+            Number of new rows mirrored
+        """
+        async with self._sync_lock:
+            started = time.monotonic()
+            cursor = max(0, self._watermark - self._overlap_ids)
+            added = 0
+            while True:
+                rows = await self._loader(cursor, self._batch_size)
+                if not rows:
+                    break
+                added += await asyncio.to_thread(self._load_batch, rows)
+                cursor = rows[-1][0]
+                self._watermark = max(self._watermark, cursor)
+                if len(rows) < self._batch_size:
+                    break
+            self._synced_through = started
+
+        if added:
+            logger.info(f"Analytics mirror synced {added} new rows (through item id {self._watermark}).")
+        return added
+
+    def _load_batch(self, rows: List[Tuple[Any, ...]]) -> int:
+        fd, staging = tempfile.mkstemp(suffix=".csv", prefix="items-", dir=self._staging_dir)
+        try:
+            with os.fdopen(fd, "w", newline="") as f:
+                writer = csv.writer(f)
+                for row in rows:
+                    writer.writerow(
+                        value.isoformat(sep=" ") if hasattr(value, "isoformat") else value
+                        for value in row
+                    )
+
+            cursor = self._conn.cursor()
+            try:
+                before = cursor.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+                cursor.execute(
+                    f"""
+                    INSERT OR IGNORE INTO items
+                    SELECT * FROM read_csv('{staging}', header = false, delim = ',', quote = '"', escape = '"', columns = {{
+                        'id': 'BIGINT', 'receipt_id': 'BIGINT', 'item_name': 'VARCHAR',
+                        'quantity': 'DOUBLE', 'unit_price': 'DOUBLE', 'total_price': 'DOUBLE',
+                        'purchase_date': 'TIMESTAMPTZ', 'user_id': 'VARCHAR'
+                    }})
+                    """
+                )
+                return cursor.execute("SELECT COUNT(*) FROM items").fetchone()[0] - before
+            finally:
+                cursor.close()
+        finally:
+            os.unlink(staging)
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def can_serve(self, sql: str, last_write_at: Optional[float] = None) -> bool:
+        """Aggregate-only SELECTs over items, if the mirror is fresh enough for the caller."""
+        # _synced_through is when the last completed sync started: rows committed before it are mirrored
+        if self._conn is None or self._synced_through is None:
+            return False
+        if time.monotonic() - self._synced_through > settings.ANALYTICS_MAX_STALENESS_SECONDS:
+            return False
+        if last_write_at is not None and last_write_at >= self._synced_through:
+            return False
+
+        if not _is_single_select(sql):
+            return False
+        cleaned = sql.upper()
+        if _VECTOR_USE.search(cleaned) or not _AGGREGATE.search(cleaned):
+            return False
+        tables = {name.strip('"').split(".")[-1] for name in _TABLE_REFERENCE.findall(cleaned)}
+        return tables == {"ITEMS"}
+
+    async def execute(self, sql: str, params: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        if not _is_single_select(sql):
+            raise ValueError("The analytics mirror only runs a single SELECT statement")
+
+        def run() -> List[Dict[str, Any]]:
+            # Cursors are independent connections to the same database, safe across threads
+            cursor = self._conn.cursor()
+            try:
+                tree = json.loads(cursor.execute("SELECT json_serialize_sql(?)", [sql]).fetchone()[0])
+                cursor.execute(sql, params or [])
+                columns = _postgres_column_names(sql, tree, [column[0] for column in cursor.description])
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+
+        return await asyncio.to_thread(run)
+
+
+def _is_single_select(sql: str) -> bool:
+    try:
+        statements = duckdb.extract_statements(sql)
+    except Exception:
+        return False
+    return len(statements) == 1 and statements[0].type == duckdb.StatementType.SELECT
+
+
+def _postgres_column_names(sql: str, tree: Dict[str, Any], columns: List[str]) -> List[str]:
+    """Rename DuckDB's result columns (e.g. "sum(total_price)") to Postgres's ("sum")."""
+    if tree.get("error") or len(tree.get("statements", [])) != 1:
+        return columns
+    node = tree["statements"][0]["node"]
+    select_list = node.get("select_list", []) if node.get("type") == "SELECT_NODE" else []
+    if len(select_list) != len(columns) or any(e.get("class") == "STAR" for e in select_list):
+        return columns
+    return [_postgres_column_name(sql, expression) for expression in select_list]
+
+
+def _postgres_column_name(sql: str, expression: Dict[str, Any]) -> str:
+    if expression.get("alias"):
+        return expression["alias"]
+    kind = expression.get("class")
+    if kind == "COLUMN_REF":
+        return expression["column_names"][-1]
+    if kind == "FUNCTION" and not expression.get("is_operator"):
+        name = expression["function_name"]
+        if name == "date_part" and sql[expression.get("query_location", 0):].lstrip().upper().startswith("EXTRACT"):
+            return "extract"
+        return _POSTGRES_FUNCTION_NAMES.get(name, name)
+    if kind == "CAST":
+        name = _postgres_column_name(sql, expression["child"])
+        if name != "?column?":
+            return name
+        type_id = str(expression.get("cast_type", {}).get("id", ""))
+        return _POSTGRES_TYPE_NAMES.get(type_id, type_id.lower() or "?column?")
+    if kind == "CASE":
+        return "case"
+    if expression.get("type") == "OPERATOR_COALESCE":
+        return "coalesce"
+    return "?column?"
@@ -0,0 +1,961 @@
+"""
+Async SQLite Database Adapter
+
+Implements the AsyncDatabasePort interface on SQLite so single-node and edge
+deployments can run the whole agent without PostgreSQL:
+  - A fixed pool of persistent connections in WAL mode with tuned pragmas
+  - All SQLite calls run on a dedicated thread executor, never the event loop
+  - Batched writes (executemany / one transaction per receipt)
+  - Indexes on purchase_date/id, item_name and user_id
+  - Embeddings stored as float32 BLOBs, searched with NumPy cosine similarity
+  - Items the embedding provider failed on are stored pending and filled in
+    by the embedding backfill; model changes re-embed into shadow columns
+"""
+
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing, asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.adapters.database.embedding_backfill import (
+    ACTIVE_EMBEDDING_COLUMNS,
+    EMBEDDING_TAG_INDEXES,
+    SHADOW_EMBEDDING_COLUMNS,
+    EmbeddingBackfillWorker,
+    embedding_tag,
+)
+from src.adapters.database.query_guard import validate_read_only_query
+from src.domain.models import ImportCheckpoint, Item, Receipt
+from src.ports.database_port import AsyncDatabasePort, SQLDialect
+from src.ports.embedding_port import EmbeddingPort
+from src.ports.similarity_index_port import SimilarityIndexPort
+from src.ports.analytics_port import AnalyticsPort
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Timestamps are stored as UTC text in this format so they sort and compare correctly
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+ITEM_COLUMNS = {
+    "receipt_id": "INTEGER",
+    "item_name": "TEXT",
+    "quantity": "REAL",
+    "unit_price": "REAL",
+    "total_price": "REAL",
+    "purchase_date": "TEXT",
+    "item_name_embedding": "BLOB",
+    "user_id": "TEXT",
+    "embedding_model": "TEXT",
+}
+
+
+# purchase_date is UTC text, so it compares correctly against date('now', ...) strings
+SQLITE_DIALECT = SQLDialect(
+    name="SQLite",
+    items_schema="""
+TABLE: items
+  - id              INTEGER PRIMARY KEY
+  - receipt_id      INTEGER
+  - item_name       TEXT
+  - quantity        REAL
+  - unit_price      REAL
+  - total_price     REAL
+  - purchase_date   TEXT (UTC, 'YYYY-MM-DD HH:MM:SS.ffffff')
+  - item_name_embedding  BLOB
+  - user_id         TEXT
+""",
+    date_functions=(
+        "date('now', <modifiers>) and strftime() with modifiers such as 'start of month', "
+        "'start of year', '-7 days', '-1 month', 'weekday 0'; no INTERVAL or ::casts"
+    ),
+    this_month_filter="WHERE purchase_date >= date('now', 'start of month')",
+    month_bucket="strftime('%Y-%m', purchase_date)",
+    text_match="LIKE",
+    periods={
+        "today":       "purchase_date >= date('now') AND purchase_date < date('now', '+1 day')",
+        "this_week":   "purchase_date >= date('now', 'weekday 0', '-6 days')",
+        "this_month":  "purchase_date >= date('now', 'start of month')",
+        "last_month":  (
+            "purchase_date >= date('now', 'start of month', '-1 month') "
+            "AND purchase_date < date('now', 'start of month')"
+        ),
+        "this_year":   "purchase_date >= date('now', 'start of year')",
+        "last_7_days": "purchase_date >= date('now', '-7 days')",
+        "last_30_days":"purchase_date >= date('now', '-30 days')",
+    },
+    group_by={
+        "none":      ("SUM(total_price) AS total_spent, COUNT(*) AS item_count", ""),
+        "day":       ("date(purchase_date) AS period, SUM(total_price) AS total_spent", "GROUP BY period ORDER BY period"),
+        "week":      ("date(purchase_date, 'weekday 0', '-6 days') AS period, SUM(total_price) AS total_spent", "GROUP BY period ORDER BY period"),
+        "month":     ("strftime('%Y-%m', purchase_date) AS period, SUM(total_price) AS total_spent", "GROUP BY period ORDER BY period"),
+        "item_name": ("item_name, SUM(total_price) AS total_spent, COUNT(*) AS times_bought", "GROUP BY item_name ORDER BY total_spent DESC"),
+    },
+)
+
+
+def _to_db_timestamp(value: Optional[datetime]) -> str:
+    value = value or datetime.now(timezone.utc)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+def _from_db_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _to_blob(embedding: Optional[List[float]]) -> Optional[bytes]:
+    if embedding is None:
+        return None
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def _date_trunc(unit: str, value: Optional[str]) -> Optional[str]:
+    """Postgres-style DATE_TRUNC for analyst SQL running on SQLite."""
+    parsed = _from_db_timestamp(value)
+    if parsed is None:
+        return None
+    unit = unit.lower()
+    if unit == "year":
+        parsed = parsed.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    elif unit == "month":
+        parsed = parsed.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    elif unit == "week":
+        parsed = (parsed - timedelta(days=parsed.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    elif unit == "day":
+        parsed = parsed.replace(hour=0, minute=0, second=0, microsecond=0)
+    elif unit == "hour":
+        parsed = parsed.replace(minute=0, second=0, microsecond=0)
+    return parsed.strftime(TIMESTAMP_FORMAT)
+
+
+class SQLiteConnectionPool:
+    """Fixed set of persistent SQLite connections handed out on the event loop."""
+
+    def __init__(self, connections: List[sqlite3.Connection]):
+        self._connections = connections
+        self._available: asyncio.Queue = asyncio.Queue()
+        for conn in connections:
+            self._available.put_nowait(conn)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[sqlite3.Connection]:
+        conn = await self._available.get()
+        try:
+            yield conn
+        finally:
+            self._available.put_nowait(conn)
+
+    def close(self) -> None:
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+
+
+class AsyncSQLiteAdapter(AsyncDatabasePort):
+    """SQLite implementation of AsyncDatabasePort."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        embedding_provider: Optional[EmbeddingPort] = None,
+    ):
+        """
+        Initialize async SQLite adapter.
+
+        Args:
+            db_path: Path to the SQLite database file.
+                     Defaults to settings.SQLITE_DATABASE_PATH
+            pool_size: Number of pooled connections (and executor threads).
+                       Defaults to settings.SQLITE_POOL_SIZE
+            embedding_provider: Embedding provider for generating embeddings.
+                               Defaults to None, must be set via set_embedding_provider()
+        """
+        self.db_path = db_path or settings.SQLITE_DATABASE_PATH
+        self._pool_size = pool_size or settings.SQLITE_POOL_SIZE
+        self.pool: Optional[SQLiteConnectionPool] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # SQLite allows one writer at a time; serialize in-process to avoid SQLITE_BUSY
+        self._write_lock = asyncio.Lock()
+        self._embedding_provider: Optional[EmbeddingPort] = embedding_provider
+        self._similarity_index: Optional[SimilarityIndexPort] = None
+        self._analytics: Optional[AnalyticsPort] = None
+        self._backfill: Optional[EmbeddingBackfillWorker] = None
+        self._embedding_columns = ACTIVE_EMBEDDING_COLUMNS
+        self._backfill_cursor = 0
+        self._last_write_at: Optional[float] = None
+
+    def set_embedding_provider(self, embedding_provider: EmbeddingPort) -> None:
+        """Set the embedding provider for this adapter."""
+        self._embedding_provider = embedding_provider
+
+    def set_similarity_index(self, similarity_index: Optional[SimilarityIndexPort]) -> None:
+        """Serve search_similar_items() from an in-process index instead of a table scan."""
+        self._similarity_index = similarity_index
+
+    def set_analytics_engine(self, analytics: Optional[AnalyticsPort]) -> None:
+        """Serve aggregate-only analyst queries from a columnar mirror of items."""
+        self._analytics = analytics
+
+    def set_embedding_backfill(self, backfill: Optional[EmbeddingBackfillWorker]) -> None:
+        """Embed pending items and re-embed after model changes in the background."""
+        self._backfill = backfill
+
+    # ── Connection management ────────────────────────────────────────────────
+
+    async def connect(self) -> None:
+        """Open the connection pool, apply pragmas and create tables/indexes."""
+        try:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._pool_size,
+                thread_name_prefix="sqlite",
+            )
+            connections = [
+                await self._run(self._open_connection)
+                for _ in range(self._pool_size)
+            ]
+            self.pool = SQLiteConnectionPool(connections)
+            async with self._write_lock, self.pool.acquire() as conn:
+                await self._run(self._initialize_schema, conn)
+                await self._run(self._prepare_embedding_columns, conn)
+
+            logger.info(f"SQLite database '{self.db_path}' opened in WAL mode with {self._pool_size} connections.")
+
+            if self._similarity_index is not None:
+                await self._similarity_index.load()
+                await self._similarity_index.sync(self._fetch_item_embeddings_since)
+
+            if self._analytics is not None:
+                await self._analytics.start(self._fetch_item_rows_since)
+
+            if self._backfill is not None:
+                self._backfill.start(
+                    self._fetch_embedding_backlog,
+                    self._store_backfilled_embeddings,
+                    self._finish_embedding_pass,
+                )
+
+        except Exception as e:
+            logger.error(f"Failed to open SQLite database: {e}")
+            raise
+
+    async def disconnect(self) -> None:
+        """Close all pooled connections and the executor."""
+        if self._backfill is not None:
+            await self._backfill.close()
+        if self._similarity_index is not None:
+            await self._similarity_index.close()
+        if self._analytics is not None:
+            await self._analytics.close()
+        if self.pool:
+            await self._run(self.pool.close)
+            self.pool = None
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        logger.info("SQLite connection pool closed.")
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args))
+
+    def _open_connection(self) -> sqlite3.Connection:
+        # Autocommit mode; write paths open explicit transactions
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        conn.execute(f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+        conn.create_function("date_trunc", 2, _date_trunc, deterministic=True)
+        conn.create_function("now", 0, lambda: _to_db_timestamp(None))
+        return conn
+
+    @staticmethod
+    def _initialize_schema(conn: sqlite3.Connection) -> None:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                receipt_id INTEGER,
+                item_name TEXT,
+                quantity REAL,
+                unit_price REAL,
+                total_price REAL
+            )
+        """)
+        # Bring databases created by the legacy sync adapter up to the current schema
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(items)")}
+        for column, column_type in ITEM_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE items ADD COLUMN {column} {column_type}")
+
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_items_purchase_date_id ON items (purchase_date, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_items_user_purchase_date_id ON items (user_id, purchase_date, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_items_item_name ON items (item_name COLLATE NOCASE)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS import_jobs (
+                job_id TEXT PRIMARY KEY,
+                source TEXT,
+                user_id TEXT,
+                rows_committed INTEGER NOT NULL DEFAULT 0,
+                completed INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_jobs (
+                job_id TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL DEFAULT 0,
+                rows_embedded INTEGER NOT NULL DEFAULT 0,
+                completed INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT
+            )
+        """)
+        for index_name, definition in EMBEDDING_TAG_INDEXES.items():
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON items "
+                f"{definition.format(column='embedding_model')}"
+            )
+
+    def _prepare_embedding_columns(self, conn: sqlite3.Connection) -> None:
+        """
+        Tag stored embeddings with their model and choose where new vectors go.
+
+        Untagged rows (stored before tagging existed) are tagged as the configured
+        model at their stored dimension; zero vectors left by failed embedding calls
+        are cleared so the backfill picks them up. If any row is tagged with another
+        model or dimension, new vectors go to shadow columns that the backfill fills
+        and swaps in, resuming from its checkpoint.
+        """
+        tag = embedding_tag(self._embedding_provider)
+        model = tag.rsplit(":", 1)[0]
+        job_id = f"reembed:{tag}"
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("""
+                UPDATE items SET item_name_embedding = NULL
+                WHERE embedding_model IS NULL
+                  AND item_name_embedding = zeroblob(length(item_name_embedding))
+            """)
+            conn.execute(
+                """
+                UPDATE items SET embedding_model = ? || ':' || (length(item_name_embedding) / 4)
+                WHERE embedding_model IS NULL AND item_name_embedding IS NOT NULL
+                """,
+                (model,),
+            )
+
+            stale = conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM items WHERE embedding_model <> ?)", (tag,)
+            ).fetchone()[0]
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(items)")}
+            has_shadow = SHADOW_EMBEDDING_COLUMNS[0] in columns
+            checkpoint = conn.execute(
+                "SELECT last_id FROM embedding_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+
+            if not stale:
+                if has_shadow:
+                    # Left over from a re-embed towards a model that is no longer configured
+                    self._drop_shadow_columns(conn)
+                self._embedding_columns = ACTIVE_EMBEDDING_COLUMNS
+            else:
+                if checkpoint is None or not has_shadow:
+                    if has_shadow:
+                        self._drop_shadow_columns(conn)
+                    conn.execute("ALTER TABLE items ADD COLUMN item_name_embedding_next BLOB")
+                    conn.execute("ALTER TABLE items ADD COLUMN embedding_model_next TEXT")
+                    conn.execute(
+                        """
+                        INSERT INTO embedding_jobs (job_id, updated_at) VALUES (?, ?)
+                        ON CONFLICT (job_id) DO UPDATE
+                        SET last_id = 0, rows_embedded = 0, completed = 0, updated_at = excluded.updated_at
+                        """,
+                        (job_id, _to_db_timestamp(None)),
+                    )
+                    checkpoint = (0,)
+                self._embedding_columns = SHADOW_EMBEDDING_COLUMNS
+                self._backfill_cursor = checkpoint[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if self._reembedding:
+            logger.warning(
+                f"Stored embeddings do not match {tag}; re-embedding items into shadow columns "
+                f"from item {self._backfill_cursor}. Similarity search only covers re-embedded items until it completes."
+            )
+
+    @staticmethod
+    def _drop_shadow_columns(conn: sqlite3.Connection) -> None:
+        conn.execute("ALTER TABLE items DROP COLUMN item_name_embedding_next")
+        conn.execute("ALTER TABLE items DROP COLUMN embedding_model_next")
+        conn.execute("DELETE FROM embedding_jobs WHERE job_id LIKE 'reembed:%' AND NOT completed")
+
+    @property
+    def _reembedding(self) -> bool:
+        return self._embedding_columns == SHADOW_EMBEDDING_COLUMNS
+
+    @property
+    def sql_dialect(self) -> SQLDialect:
+        return SQLITE_DIALECT
+
+    def _require_pool(self) -> SQLiteConnectionPool:
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized. Call connect() first.")
+        return self.pool
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    async def _generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Generate embeddings for the given texts in one batched provider call.
+
+        Texts that could not be embedded (no provider set, or the call failed) get
+        None; their rows are stored pending and embedded later by the backfill.
+        """
+        if not self._embedding_provider:
+            logger.warning("No embedding provider set. Storing items without embeddings.")
+            return [None] * len(texts)
+
+        try:
+            vectors = await self._embedding_provider.generate_embeddings(texts)
+        except Exception as e:
+            logger.error(f"Embedding failed, storing items without embeddings: {e}")
+            return [None] * len(texts)
+        # Zero vectors are some providers' failure fallback
+        return [vector if vector is not None and any(vector) else None for vector in vectors]
+
+    def _insert_rows(
+        self,
+        conn: sqlite3.Connection,
+        rows: List[tuple],
+        checkpoint: Optional[ImportCheckpoint] = None,
+    ) -> None:
+        embedding_column, tag_column = self._embedding_columns
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                f"""
+                INSERT INTO items
+                    (receipt_id, item_name, quantity, unit_price,
+                     total_price, purchase_date, {embedding_column}, user_id, {tag_column})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            if checkpoint is not None:
+                conn.execute(
+                    """
+                    INSERT INTO import_jobs (job_id, source, user_id, rows_committed, completed, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (job_id) DO UPDATE
+                    SET rows_committed = excluded.rows_committed,
+                        completed = excluded.completed,
+                        updated_at = excluded.updated_at
+                    """,
+                    (
+                        checkpoint.job_id,
+                        checkpoint.source,
+                        checkpoint.user_id,
+                        checkpoint.rows_committed,
+                        int(checkpoint.completed),
+                        _to_db_timestamp(None),
+                    ),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _mark_write(self) -> None:
+        """Record a committed write so the analytics mirror syncs before serving this process again."""
+        if self._analytics is not None:
+            self._last_write_at = time.monotonic()
+            self._analytics.notify_write()
+
+    def _index_items(self, rows: List[tuple]) -> List[Item]:
+        """Rebuild Items from inserted rows for the similarity index (rows with embeddings only)."""
+        return [
+            Item(
+                item_name=row[1],
+                quantity=row[2],
+                unit_price=row[3],
+                total_price=row[4],
+                purchase_date=_from_db_timestamp(row[5]),
+                item_name_embedding=np.frombuffer(row[6], dtype=np.float32).tolist(),
+            )
+            for row in rows
+            if row[6] is not None
+        ]
+
+    def _item_row(self, item: Item, receipt_id: int, user_id: Optional[str], embedding: Optional[List[float]]) -> tuple:
+        return (
+            receipt_id,
+            item.item_name,
+            item.quantity,
+            item.unit_price,
+            item.total_price,
+            _to_db_timestamp(item.purchase_date),
+            _to_blob(embedding),
+            user_id,
+            embedding_tag(self._embedding_provider) if embedding is not None else None,
+        )
+
+    async def save_receipt(self, receipt: Receipt) -> bool:
+        """Save receipt items (with embeddings) in a single transaction."""
+        if not self.pool:
+            logger.error("Database pool not initialized. Call connect() first.")
+            return False
+
+        try:
+            embeddings = await self._generate_embeddings([item.item_name for item in receipt.items])
+            rows = [
+                self._item_row(item, receipt.receipt_id, receipt.user_id, embedding)
+                for item, embedding in zip(receipt.items, embeddings)
+            ]
+            async with self._write_lock, self.pool.acquire() as conn:
+                await self._run(self._insert_rows, conn, rows)
+
+            self._mark_write()
+            if self._similarity_index is not None:
+                await self._similarity_index.add_items(self._index_items(rows))
+            logger.info(f"Saved receipt {receipt.receipt_id} with {len(receipt.items)} items.")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error saving receipt: {e}")
+            return False
+
+    async def bulk_insert_items(
+        self,
+        items: List[Item],
+        *,
+        receipt_id: int,
+        user_id: Optional[str] = None,
+        checkpoint: Optional[ImportCheckpoint] = None,
+    ) -> int:
+        """Insert items with executemany in one transaction, together with the checkpoint."""
+        pool = self._require_pool()
+        rows = [self._item_row(item, receipt_id, user_id, item.item_name_embedding) for item in items]
+        async with self._write_lock, pool.acquire() as conn:
+            await self._run(self._insert_rows, conn, rows, checkpoint)
+        self._mark_write()
+        if self._similarity_index is not None and rows:
+            await self._similarity_index.add_items(self._index_items(rows))
+        return len(rows)
+
+    async def get_import_checkpoint(self, job_id: str) -> Optional[ImportCheckpoint]:
+        """Get the stored progress of a bulk import, if any."""
+        pool = self._require_pool()
+
+        def fetch(conn: sqlite3.Connection) -> Optional[sqlite3.Row]:
+            return conn.execute(
+                "SELECT job_id, source, user_id, rows_committed, completed FROM import_jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+
+        async with pool.acquire() as conn:
+            row = await self._run(fetch, conn)
+        if row is None:
+            return None
+        return ImportCheckpoint(**{**dict(row), "completed": bool(row["completed"])})
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    async def query_spending(self, item_name: str, days: int = 7) -> float:
+        """Query total spending for an item within specified days (days <= 0 means all time)."""
+        if not self.pool:
+            return 0.0
+
+        sql = "SELECT COALESCE(SUM(total_price), 0) FROM items WHERE item_name LIKE ?"
+        args: List[Any] = [f"%{item_name}%"]
+        if days > 0:
+            sql += " AND purchase_date >= ?"
+            args.append(_to_db_timestamp(datetime.now(timezone.utc) - timedelta(days=days)))
+
+        try:
+            async with self.pool.acquire() as conn:
+                result = await self._run(lambda c: c.execute(sql, args).fetchone()[0], conn)
+            return float(result) if result else 0.0
+
+        except Exception as e:
+            logger.error(f"Error querying spending: {e}")
+            return 0.0
+
+    async def get_items(self, receipt_id: Optional[int] = None) -> List[Item]:
+        """Get items, optionally filtered by receipt_id (capped at ITEMS_LIST_HARD_CAP)."""
+        if not self.pool:
+            return []
+
+        cap = settings.ITEMS_LIST_HARD_CAP
+        items: List[Item] = []
+        try:
+            async with aclosing(self.iter_items(receipt_id=receipt_id)) as stream:
+                async for item in stream:
+                    if len(items) >= cap:
+                        logger.warning(
+                            f"get_items truncated at {cap} rows; use iter_items() to stream the rest."
+                        )
+                        break
+                    items.append(item)
+            return items
+
+        except Exception as e:
+            logger.error(f"Error getting items: {e}")
+            return []
+
+    async def iter_items(
+        self,
+        *,
+        receipt_id: Optional[int] = None,
+        user_id: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        fetch_size: Optional[int] = None,
+    ) -> AsyncIterator[Item]:
+        """Stream items keyset-ordered by (purchase_date, id), fetch_size rows per executor hop."""
+        pool = self._require_pool()
+
+        conditions: List[str] = []
+        args: List[Any] = []
+        if receipt_id is not None:
+            conditions.append("receipt_id = ?")
+            args.append(receipt_id)
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            args.append(user_id)
+        if start_date is not None:
+            conditions.append("purchase_date >= ?")
+            args.append(_to_db_timestamp(start_date))
+        if end_date is not None:
+            conditions.append("purchase_date < ?")
+            args.append(_to_db_timestamp(end_date))
+        if after is not None:
+            conditions.append("(purchase_date, id) > (?, ?)")
+            args.extend([_to_db_timestamp(after[0]), after[1]])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"""
+            SELECT id, item_name, quantity, unit_price, total_price, purchase_date
+            FROM items
+            {where}
+            ORDER BY purchase_date, id
+        """
+        size = fetch_size or settings.ITEMS_FETCH_SIZE
+
+        async with pool.acquire() as conn:
+            cursor = await self._run(conn.execute, sql, args)
+            try:
+                while True:
+                    rows = await self._run(cursor.fetchmany, size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield Item(
+                            id=row["id"],
+                            item_name=row["item_name"],
+                            quantity=row["quantity"],
+                            unit_price=row["unit_price"],
+                            total_price=row["total_price"],
+                            purchase_date=_from_db_timestamp(row["purchase_date"]),
+                        )
+            finally:
+                await self._run(cursor.close)
+
+    async def execute_read_query(
+        self,
+        sql: str,
+        params: Optional[List[Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute a read-only SQL query. Only SELECT statements are allowed.
+
+        Runs with PRAGMA query_only. Queries are expected in SQLite syntax
+        (sql_dialect); DATE_TRUNC() and NOW() are also provided as functions.
+        Aggregate-only queries are answered by the analytics mirror when it is
+        configured and fresh.
+        """
+        pool = self._require_pool()
+        validate_read_only_query(sql)
+
+        if self._analytics is not None and self._analytics.can_serve(sql, self._last_write_at):
+            try:
+                return await self._analytics.execute(sql, params)
+            except Exception as e:
+                logger.info(f"Analytics mirror declined query, using database: {e}")
+
+        def run(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+            conn.execute("PRAGMA query_only = ON")
+            try:
+                return [dict(row) for row in conn.execute(sql, params or [])]
+            finally:
+                conn.execute("PRAGMA query_only = OFF")
+
+        try:
+            async with pool.acquire() as conn:
+                return await self._run(run, conn)
+
+        except Exception as e:
+            logger.error(f"Error executing read query: {e}")
+            raise
+
+    async def _fetch_item_rows_since(self, after_id: int, limit: int) -> List[Tuple[Any, ...]]:
+        """Analytics mirror loader: up to ``limit`` item rows with id > after_id, by id."""
+        pool = self._require_pool()
+
+        def fetch(conn: sqlite3.Connection) -> List[sqlite3.Row]:
+            return conn.execute(
+                """
+                SELECT id, receipt_id, item_name, quantity, unit_price,
+                       total_price, purchase_date, user_id
+                FROM items
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+                """,
+                (after_id, limit),
+            ).fetchall()
+
+        async with pool.acquire() as conn:
+            rows = await self._run(fetch, conn)
+        return [
+            (*tuple(row)[:6], _from_db_timestamp(row["purchase_date"]), row["user_id"])
+            for row in rows
+        ]
+
+    async def _fetch_item_embeddings_since(self, watermark: int) -> Tuple[int, List[Item]]:
+        """
+        Similarity index loader: latest embedded row per item name with id > watermark.
+
+        Returns:
+            (highest item id seen, items)
+        """
+        pool = self._require_pool()
+        embedding_column, _ = self._embedding_columns
+
+        def fetch(conn: sqlite3.Connection) -> Tuple[int, List[sqlite3.Row]]:
+            # One read transaction so MAX(id) and the rows come from the same snapshot
+            conn.execute("BEGIN")
+            try:
+                high = conn.execute("SELECT COALESCE(MAX(id), 0) FROM items").fetchone()[0]
+                if high <= watermark:
+                    return watermark, []
+                rows = conn.execute(
+                    f"""
+                    SELECT i.id, i.item_name, i.quantity, i.unit_price, i.total_price,
+                           i.purchase_date, i.{embedding_column} AS item_name_embedding
+                    FROM items i
+                    JOIN (
+                        SELECT MAX(id) AS id FROM items
+                        WHERE id > ? AND id <= ? AND {embedding_column} IS NOT NULL
+                        GROUP BY item_name
+                    ) latest ON latest.id = i.id
+                    """,
+                    (watermark, high),
+                ).fetchall()
+                return high, rows
+            finally:
+                conn.execute("COMMIT")
+
+        async with pool.acquire() as conn:
+            high, rows = await self._run(fetch, conn)
+
+        items = [
+            Item(
+                id=row["id"],
+                item_name=row["item_name"],
+                quantity=row["quantity"] or 0.0,
+                unit_price=row["unit_price"] or 0.0,
+                total_price=row["total_price"] or 0.0,
+                purchase_date=_from_db_timestamp(row["purchase_date"]),
+                item_name_embedding=np.frombuffer(row["item_name_embedding"], dtype=np.float32).tolist(),
+            )
+            for row in rows
+        ]
+        return high, items
+
+    async def _fetch_embedding_backlog(self, limit: int) -> List[Item]:
+        """Backfill loader: next items after the cursor with no embedding in the target columns."""
+        pool = self._require_pool()
+        _, tag_column = self._embedding_columns
+
+        def fetch(conn: sqlite3.Connection) -> List[sqlite3.Row]:
+            return conn.execute(
+                f"""
+                SELECT id, item_name, quantity, unit_price, total_price, purchase_date
+                FROM items
+                WHERE id > ? AND {tag_column} IS NULL AND trim(item_name) <> ''
+                ORDER BY id
+                LIMIT ?
+                """,
+                (self._backfill_cursor, limit),
+            ).fetchall()
+
+        async with pool.acquire() as conn:
+            rows = await self._run(fetch, conn)
+        return [
+            Item(
+                id=row["id"],
+                item_name=row["item_name"],
+                quantity=row["quantity"] or 0.0,
+                unit_price=row["unit_price"] or 0.0,
+                total_price=row["total_price"] or 0.0,
+                purchase_date=_from_db_timestamp(row["purchase_date"]),
+            )
+            for row in rows
+        ]
+
+    async def _store_backfilled_embeddings(self, items: List[Item], checkpoint_id: int) -> None:
+        """Backfill writer: bulk-update vectors and record the re-embed checkpoint atomically."""
+        pool = self._require_pool()
+        embedding_column, tag_column = self._embedding_columns
+        tag = embedding_tag(self._embedding_provider)
+        reembedding = self._reembedding
+
+        def store(conn: sqlite3.Connection) -> None:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    f"""
+                    UPDATE items SET {embedding_column} = ?, {tag_column} = ?
+                    WHERE id = ? AND {tag_column} IS NULL
+                    """,
+                    [(_to_blob(item.item_name_embedding), tag, item.id) for item in items],
+                )
+                if reembedding:
+                    conn.execute(
+                        """
+                        UPDATE embedding_jobs
+                        SET last_id = MAX(last_id, ?), rows_embedded = rows_embedded + ?, updated_at = ?
+                        WHERE job_id = ?
+                        """,
+                        (checkpoint_id, len(items), _to_db_timestamp(None), f"reembed:{tag}"),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        async with self._write_lock, pool.acquire() as conn:
+            await self._run(store, conn)
+        self._backfill_cursor = checkpoint_id
+        if self._similarity_index is not None and items:
+            await self._similarity_index.add_items(items)
+
+    async def _finish_embedding_pass(self) -> None:
+        """
+        Backfill pass complete: rewind the cursor so skipped items are retried, and
+        after a re-embed swap the shadow columns in (dropping the old ones).
+        """
+        self._backfill_cursor = 0
+        if not self._reembedding:
+            return
+        pool = self._require_pool()
+        tag = embedding_tag(self._embedding_provider)
+
+        def swap(conn: sqlite3.Connection) -> None:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # SQLite cannot drop an indexed column
+                for index_name in EMBEDDING_TAG_INDEXES:
+                    conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+                conn.execute("ALTER TABLE items DROP COLUMN item_name_embedding")
+                conn.execute("ALTER TABLE items DROP COLUMN embedding_model")
+                conn.execute("ALTER TABLE items RENAME COLUMN item_name_embedding_next TO item_name_embedding")
+                conn.execute("ALTER TABLE items RENAME COLUMN embedding_model_next TO embedding_model")
+                for index_name, definition in EMBEDDING_TAG_INDEXES.items():
+                    conn.execute(
+                        f"CREATE INDEX {index_name} ON items {definition.format(column='embedding_model')}"
+                    )
+                conn.execute(
+                    "UPDATE embedding_jobs SET completed = 1, updated_at = ? WHERE job_id = ?",
+                    (_to_db_timestamp(None), f"reembed:{tag}"),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        async with self._write_lock, pool.acquire() as conn:
+            await self._run(swap, conn)
+        self._embedding_columns = ACTIVE_EMBEDDING_COLUMNS
+        logger.info(f"Re-embedding complete; swapped in {tag} embeddings.")
+
+    async def search_similar_items(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank distinct item names by cosine similarity of their stored embeddings.
+
+        Returns the top ``limit`` names, most similar first. Served by the
+        in-process similarity index when one is configured.
+        """
+        if self._similarity_index is not None:
+            return await self._similarity_index.search(query_embedding, limit)
+
+        pool = self._require_pool()
+        embedding_column, _ = self._embedding_columns
+
+        def load(conn: sqlite3.Connection) -> List[sqlite3.Row]:
+            # Latest row per distinct item name
+            return conn.execute(f"""
+                SELECT i.item_name, i.{embedding_column} AS item_name_embedding, i.total_price, i.purchase_date
+                FROM items i
+                JOIN (
+                    SELECT MAX(id) AS id FROM items
+                    WHERE {embedding_column} IS NOT NULL
+                    GROUP BY item_name
+                ) latest ON latest.id = i.id
+            """).fetchall()
+
+        def rank(rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+            query = np.asarray(query_embedding, dtype=np.float32)
+            query_norm = np.linalg.norm(query)
+            if not rows or query_norm == 0:
+                return []
+            matrix = np.stack([np.frombuffer(row["item_name_embedding"], dtype=np.float32) for row in rows])
+            norms = np.linalg.norm(matrix, axis=1)
+            norms[norms == 0] = np.inf
+            scores = (matrix @ query) / (norms * query_norm)
+            top = np.argsort(-scores)[:limit]
+            return [
+                {
+                    "item_name": rows[i]["item_name"],
+                    "similarity_score": float(scores[i]),
+                    "total_price": float(rows[i]["total_price"]),
+                    "purchase_date": (
+                        _from_db_timestamp(rows[i]["purchase_date"]).isoformat()
+                        if rows[i]["purchase_date"]
+                        else None
+                    ),
+                }
+                for i in top
+            ]
+
+        try:
+            async with pool.acquire() as conn:
+                rows = await self._run(load, conn)
+            return await self._run(rank, rows)
+
+        except Exception as e:
+            logger.error(f"Error searching similar items: {e}")
+            return []
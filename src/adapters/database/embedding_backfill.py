@@ -0,0 +1,183 @@
+"""
+Embedding Backfill Worker
+
+Fills in item embeddings outside the request path:
+  - Items saved while the embedding provider was failing are stored without a
+    vector (their embedding_model tag is NULL) and embedded here later
+  - After an embedding model or dimension change, the database adapter points
+    the worker at shadow columns; every item is re-embedded into them with a
+    checkpoint per batch, and the adapter swaps them in when a pass completes
+  - Each batch is one generate_embeddings() call and one bulk update, paced to
+    a maximum number of texts per second
+  - With several app processes on one database, the adapter can elect a
+    leader; the others skip their passes instead of embedding the same rows
+  - Passes, items and the current checkpoint are reported under
+    "embeddings" on /health and /metrics
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.domain.models import Item
+from src.observability.embedding_metrics import get_backfill_stats
+from src.ports.embedding_port import EmbeddingPort
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# (embedding, model tag) columns new vectors are written to. While re-embedding after
+# a model or dimension change they go to the shadow pair, swapped in once complete.
+ACTIVE_EMBEDDING_COLUMNS = ("item_name_embedding", "embedding_model")
+SHADOW_EMBEDDING_COLUMNS = ("item_name_embedding_next", "embedding_model_next")
+# Indexes on the model tag column; NULL tags are the backfill backlog
+EMBEDDING_TAG_INDEXES = {
+    "idx_items_embedding_pending": "(id) WHERE {column} IS NULL",
+    "idx_items_embedding_model": "({column})",
+}
+
+# Next ``limit`` items after the adapter's checkpoint that still need an embedding
+EmbeddingBacklogLoader = Callable[[int], Awaitable[List[Item]]]
+# Store embedded items and move the checkpoint to the given item id
+EmbeddingWriter = Callable[[List[Item], int], Awaitable[None]]
+# Called once the loader runs dry (rewinds the cursor, swaps in re-embedded columns)
+PassCompleteCallback = Callable[[], Awaitable[None]]
+# Whether this process should run the next pass (e.g. it holds a database-wide lock)
+LeadershipCheck = Callable[[], Awaitable[bool]]
+
+
+def embedding_tag(provider: Optional[EmbeddingPort]) -> str:
+    """Model and dimension stored next to each embedding, e.g. "gemini-embedding-001:768"."""
+    if provider is None:
+        return f"{settings.EMBEDDING_MODEL_NAME}:{settings.EMBEDDING_DIMENSION}"
+    return f"{provider.get_model_name()}:{provider.get_embedding_dimension()}"
+
+
+class EmbeddingBackfillWorker:
+    """Background loop embedding items that were stored without a current vector."""
+
+    def __init__(
+        self,
+        provider: EmbeddingPort,
+        batch_size: Optional[int] = None,
+        rate_per_second: Optional[float] = None,
+        interval_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize embedding backfill worker.
+
+        Args:
+            provider: Embedding provider used for the backfill
+            batch_size: Items per provider call and bulk update.
+                        Defaults to settings.EMBEDDING_BACKFILL_BATCH_SIZE
+            rate_per_second: Max texts sent to the provider per second.
+                             Defaults to settings.EMBEDDING_BACKFILL_RATE_PER_SECOND
+            interval_seconds: Pause between passes once the backlog is empty.
+                              Defaults to settings.EMBEDDING_BACKFILL_INTERVAL_SECONDS
+        """
+        self._provider = provider
+        self._batch_size = batch_size or settings.EMBEDDING_BACKFILL_BATCH_SIZE
+        self._rate = rate_per_second or settings.EMBEDDING_BACKFILL_RATE_PER_SECOND
+        self._interval = interval_seconds or settings.EMBEDDING_BACKFILL_INTERVAL_SECONDS
+        self._task: Optional[asyncio.Task] = None
+        self._stats = get_backfill_stats()
+
+    def start(
+        self,
+        loader: EmbeddingBacklogLoader,
+        writer: EmbeddingWriter,
+        on_pass_complete: PassCompleteCallback,
+        is_leader: Optional[LeadershipCheck] = None,
+    ) -> None:
+        """
+        Run passes in the background: one now, then every interval_seconds.
+
+        Args:
+            is_leader: Checked before each pass; passes are skipped while it returns False.
+                       Defaults to None (always run)
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(loader, writer, on_pass_complete, is_leader))
+
+    async def run_pass(
+        self,
+        loader: EmbeddingBacklogLoader,
+        writer: EmbeddingWriter,
+        on_pass_complete: PassCompleteCallback,
+    ) -> int:
+        """
+        Embed batches until the loader has nothing left.
+
+        Items the provider fails on are left pending; the checkpoint still moves
+        past them, so they are retried on the next pass instead of blocking this one.
+
+        Returns:
+            Number of items embedded
+        """
+        embedded = 0
+        while True:
+            items = await loader(self._batch_size)
+            if not items:
+                break
+
+            started = time.monotonic()
+            names = list(dict.fromkeys(item.item_name for item in items))
+            vectors: Dict[str, Optional[List[float]]] = dict(
+                zip(names, await self._provider.generate_embeddings(names))
+            )
+            done = [
+                item.model_copy(update={"item_name_embedding": vectors[item.item_name]})
+                for item in items
+                if vectors[item.item_name] is not None and any(vectors[item.item_name])
+            ]
+            await writer(done, items[-1].id)
+
+            embedded += len(done)
+            self._stats.embedded += len(done)
+            self._stats.failed += len(items) - len(done)
+            self._stats.checkpoint = items[-1].id
+            logger.debug(f"Backfilled {len(done)}/{len(items)} embeddings through item {items[-1].id}.")
+
+            # Pace provider traffic to rate_per_second texts
+            delay = len(names) / self._rate - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        await on_pass_complete()
+        self._stats.passes += 1
+        self._stats.checkpoint = 0
+        return embedded
+
+    async def _run(
+        self,
+        loader: EmbeddingBacklogLoader,
+        writer: EmbeddingWriter,
+        on_pass_complete: PassCompleteCallback,
+        is_leader: Optional[LeadershipCheck],
+    ) -> None:
+        while True:
+            try:
+                if is_leader is not None and not await is_leader():
+                    self._stats.skipped_passes += 1
+                    logger.debug("Embedding backfill is running in another worker; skipping this pass.")
+                    await asyncio.sleep(self._interval)
+                    continue
+                embedded = await self.run_pass(loader, writer, on_pass_complete)
+                if embedded:
+                    logger.info(f"Embedding backfill pass complete: {embedded} items embedded.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Embedding backfill pass failed, retrying in {self._interval}s: {e}")
+            await asyncio.sleep(self._interval)
+
+    async def close(self) -> None:
+        """Stop the background loop; an interrupted batch resumes from its checkpoint."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -7,20 +7,140 @@ for the multi-agent NL2SQL workflow.
 """
 
 import logging
+import re
+from contextlib import aclosing
 from datetime import datetime, timezone
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, AsyncIterator, Tuple
 
 import asyncpg
 import numpy as np
 from pgvector.asyncpg import register_vector
 
-from src.ports.database_port import AsyncDatabasePort
+from src.adapters.database.embedding_backfill import (
+    ACTIVE_EMBEDDING_COLUMNS,
+    EMBEDDING_TAG_INDEXES,
+    SHADOW_EMBEDDING_COLUMNS,
+    EmbeddingBackfillWorker,
+    embedding_tag,
+)
+from src.adapters.database.query_guard import validate_read_only_query
+from src.adapters.database.routing import ReplicaRouter
+from src.observability.pool_metrics import InstrumentedPool, create_instrumented_pool, unregister_pool
+from src.ports.database_port import AsyncDatabasePort, SQLDialect
 from src.ports.embedding_port import EmbeddingPort
-from src.domain.models import Receipt, Item
+from src.ports.similarity_index_port import SimilarityIndexPort
+from src.ports.analytics_port import AnalyticsPort
+from src.domain.models import Receipt, Item, ImportCheckpoint
 from src.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Column type and similarity index per EMBEDDING_STORAGE_MODE.
+# "binary" keeps halfvec rows for the exact rerank and indexes their
+# binary_quantize() bit signature (Hamming distance) for the candidate scan.
+EMBEDDING_STORAGE_MODES = ("float32", "half", "binary")
+EMBEDDING_INDEXES = {
+    "float32": (
+        "idx_items_embedding",
+        "USING ivfflat ({column} vector_cosine_ops) WITH (lists = 100)",
+    ),
+    "half": (
+        "idx_items_embedding_half",
+        "USING hnsw ({column} halfvec_cosine_ops)",
+    ),
+    "binary": (
+        "idx_items_embedding_bits",
+        "USING hnsw ((binary_quantize({column})::bit({dim})) bit_hamming_ops)",
+    ),
+}
+
+
+POSTGRES_DIALECT = SQLDialect(
+    name="PostgreSQL",
+    items_schema="""
+TABLE: items
+  - id              SERIAL PRIMARY KEY
+  - receipt_id      INTEGER NOT NULL
+  - item_name       TEXT NOT NULL
+  - quantity        REAL NOT NULL
+  - unit_price      REAL NOT NULL
+  - total_price     REAL NOT NULL
+  - purchase_date   TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+  - item_name_embedding  vector(768)
+  - user_id         TEXT
+""",
+    date_functions="DATE_TRUNC, CURRENT_DATE, intervals",
+    this_month_filter="WHERE purchase_date >= DATE_TRUNC('month', CURRENT_DATE)",
+    month_bucket="DATE_TRUNC('month', purchase_date)",
+    text_match="ILIKE",
+    periods={
+        "today":       "purchase_date::date = CURRENT_DATE",
+        "this_week":   "purchase_date >= DATE_TRUNC('week', CURRENT_DATE)",
+        "this_month":  "purchase_date >= DATE_TRUNC('month', CURRENT_DATE)",
+        "last_month":  (
+            "purchase_date >= DATE_TRUNC('month', CURRENT_DATE - INTERVAL '1 month') "
+            "AND purchase_date < DATE_TRUNC('month', CURRENT_DATE)"
+        ),
+        "this_year":   "purchase_date >= DATE_TRUNC('year', CURRENT_DATE)",
+        "last_7_days": "purchase_date >= CURRENT_DATE - INTERVAL '7 days'",
+        "last_30_days":"purchase_date >= CURRENT_DATE - INTERVAL '30 days'",
+    },
+    group_by={
+        "none":      ("SUM(total_price) AS total_spent, COUNT(*) AS item_count", ""),
+        "day":       ("DATE_TRUNC('day', purchase_date) AS period, SUM(total_price) AS total_spent", "GROUP BY period ORDER BY period"),
+        "week":      ("DATE_TRUNC('week', purchase_date) AS period, SUM(total_price) AS total_spent", "GROUP BY period ORDER BY period"),
+        "month":     ("DATE_TRUNC('month', purchase_date) AS period, SUM(total_price) AS total_spent", "GROUP BY period ORDER BY period"),
+        "item_name": ("item_name, SUM(total_price) AS total_spent, COUNT(*) AS times_bought", "GROUP BY item_name ORDER BY total_spent DESC"),
+    },
+)
+
+
+def similar_items_sql(mode: str, column: str, dim: int, candidate_factor: int, table: str = "items") -> str:
+    """
+    Nearest distinct item names to $1 (limit $2), best first.
+
+    Each storage mode takes ``$2 * candidate_factor`` nearest rows from its
+    index and keeps the best row per item name: "binary" by Hamming distance
+    on the bit index, reranked by exact cosine; "float32" and "half" by cosine
+    on the ivfflat/HNSW index. "exact" compares every embedded row (for
+    columns without an index, e.g. re-embedding shadow columns).
+    """
+    if mode == "binary":
+        query_param = "$1::halfvec"
+        order = f"binary_quantize({column})::bit({dim}) <~> binary_quantize($1::halfvec({dim}))"
+    else:
+        query_param = "$1::halfvec" if mode == "half" else "$1"
+        order = f"{column} <=> {query_param}"
+
+    if mode == "exact":
+        source = table
+    else:
+        # A bare ORDER BY distance ... LIMIT is the shape the vector indexes serve
+        source = f"""(
+            SELECT item_name, {column}, total_price, purchase_date
+            FROM {table}
+            WHERE {column} IS NOT NULL
+            ORDER BY {order}
+            LIMIT $2 * {candidate_factor}
+        ) AS candidates"""
+
+    # DISTINCT ON needs item_name first in its ORDER BY; rank by similarity outside it
+    return f"""
+        SELECT item_name, similarity_score, total_price, purchase_date
+        FROM (
+            SELECT DISTINCT ON (item_name)
+                item_name,
+                1 - ({column} <=> {query_param}) AS similarity_score,
+                total_price,
+                purchase_date
+            FROM {source}
+            WHERE {column} IS NOT NULL
+            ORDER BY item_name, {column} <=> {query_param}
+        ) AS best
+        ORDER BY similarity_score DESC
+        LIMIT $2
+    """
+
 
 class PostgresAdapter(AsyncDatabasePort):
     """PostgreSQL database adapter with pgvector support."""
@@ -36,28 +156,56 @@ class PostgresAdapter(AsyncDatabasePort):
                                Defaults to None, must be set via set_embedding_provider()
         """
         self.database_url = database_url or settings.DATABASE_URL
-        self.pool: Optional[asyncpg.Pool] = None
+        self.pool: Optional[InstrumentedPool] = None
+        self._router = ReplicaRouter()
+        self._embedding_dimension = settings.EMBEDDING_DIMENSION
+        self._storage_mode = settings.EMBEDDING_STORAGE_MODE.lower()
+        if self._storage_mode not in EMBEDDING_STORAGE_MODES:
+            raise ValueError(
+                f"Unknown EMBEDDING_STORAGE_MODE '{self._storage_mode}'. "
+                f"Options: {', '.join(EMBEDDING_STORAGE_MODES)}"
+            )
         self._embedding_provider: Optional[EmbeddingPort] = embedding_provider
+        self._similarity_index: Optional[SimilarityIndexPort] = None
+        self._analytics: Optional[AnalyticsPort] = None
+        self._backfill: Optional[EmbeddingBackfillWorker] = None
+        self._embedding_columns = ACTIVE_EMBEDDING_COLUMNS
+        self._backfill_cursor = 0
+        # Dedicated connection holding the backfill leader lock, in the worker that won it
+        self._backfill_leader: Optional[asyncpg.Connection] = None
 
     def set_embedding_provider(self, embedding_provider: EmbeddingPort) -> None:
         """Set the embedding provider for this adapter."""
         self._embedding_provider = embedding_provider
 
+    def set_similarity_index(self, similarity_index: Optional[SimilarityIndexPort]) -> None:
+        """Serve search_similar_items() from an in-process index instead of pgvector."""
+        self._similarity_index = similarity_index
+
+    def set_analytics_engine(self, analytics: Optional[AnalyticsPort]) -> None:
+        """Serve aggregate-only analyst queries from a columnar mirror of items."""
+        self._analytics = analytics
+
+    def set_embedding_backfill(self, backfill: Optional[EmbeddingBackfillWorker]) -> None:
+        """Embed pending items and re-embed after model changes in the background."""
+        self._backfill = backfill
+
     async def connect(self) -> None:
         """Initialize connection pool and create tables/extensions."""
         try:
-            self.pool = await asyncpg.create_pool(
+            self.pool = await create_instrumented_pool(
                 self.database_url,
-                min_size=2,
-                max_size=10,
+                name="primary",
+                min_size=settings.DB_POOL_MIN_SIZE,
+                max_size=settings.DB_POOL_MAX_SIZE,
                 init=self._init_connection,
                 statement_cache_size=0,
             )
-            async with self.pool.acquire() as conn:
+            async with self.pool.acquire("connect") as conn:
                 # Enable pgvector extension
                 await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
                 # Create items table with embedding column
-                await conn.execute("""
+                await conn.execute(f"""
                     CREATE TABLE IF NOT EXISTS items (
                         id SERIAL PRIMARY KEY,
                         receipt_id INTEGER NOT NULL,
@@ -66,22 +214,313 @@ class PostgresAdapter(AsyncDatabasePort):
                         unit_price REAL NOT NULL,
                         total_price REAL NOT NULL,
                         purchase_date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                        item_name_embedding vector(768)
+                        item_name_embedding {self._column_type(self._storage_mode)}
                     )
                 """)
-                # Create index for vector similarity search
+                # Owner column for per-user filtering (added after initial release)
+                await conn.execute("ALTER TABLE items ADD COLUMN IF NOT EXISTS user_id TEXT")
+                # Indexes backing keyset pagination in iter_items()
+                await conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_items_purchase_date_id
+                    ON items (purchase_date, id)
+                """)
                 await conn.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_items_embedding
-                    ON items USING ivfflat (item_name_embedding vector_cosine_ops)
-                    WITH (lists = 100)
+                    CREATE INDEX IF NOT EXISTS idx_items_user_purchase_date_id
+                    ON items (user_id, purchase_date, id)
                 """)
+                # Progress of resumable bulk imports
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS import_jobs (
+                        job_id TEXT PRIMARY KEY,
+                        source TEXT,
+                        user_id TEXT,
+                        rows_committed BIGINT NOT NULL DEFAULT 0,
+                        completed BOOLEAN NOT NULL DEFAULT FALSE,
+                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                # Re-embedding progress after embedding model/dimension changes
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS embedding_jobs (
+                        job_id TEXT PRIMARY KEY,
+                        last_id BIGINT NOT NULL DEFAULT 0,
+                        rows_embedded BIGINT NOT NULL DEFAULT 0,
+                        completed BOOLEAN NOT NULL DEFAULT FALSE,
+                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                # Tag embeddings with their model and pick the columns new vectors go to
+                await self._prepare_embedding_columns(conn)
 
             logger.info("PostgreSQL connection pool created and schema initialized.")
 
+            await self._connect_replicas()
+
+            if self._similarity_index is not None:
+                await self._similarity_index.load()
+                await self._similarity_index.sync(self._fetch_item_embeddings_since)
+
+            if self._analytics is not None:
+                await self._analytics.start(self._fetch_item_rows_since)
+
+            if self._backfill is not None:
+                self._backfill.start(
+                    self._fetch_embedding_backlog,
+                    self._store_backfilled_embeddings,
+                    self._finish_embedding_pass,
+                    is_leader=self._lead_embedding_backfill,
+                )
+
         except Exception as e:
             logger.error(f"Failed to connect to PostgreSQL: {e}")
             raise
 
+    async def _connect_replicas(self) -> None:
+        """Create pools for configured read replicas; unreachable replicas are skipped."""
+        replica_urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+        replicas: List[InstrumentedPool] = []
+        for index, url in enumerate(replica_urls):
+            try:
+                replicas.append(
+                    await create_instrumented_pool(
+                        url,
+                        name=f"replica-{index}",
+                        min_size=settings.DB_POOL_MIN_SIZE,
+                        max_size=settings.DB_POOL_MAX_SIZE,
+                        init=self._init_connection,
+                        statement_cache_size=0,
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Failed to connect to read replica #{index}, skipping it: {e}")
+
+        self._router = ReplicaRouter(replicas)
+        if replicas:
+            logger.info(
+                f"Routing reads across {len(replicas)} replica(s) "
+                f"({settings.DATABASE_REPLICA_SELECTION})."
+            )
+
+    def _column_type(self, mode: str) -> str:
+        base = "vector" if mode == "float32" else "halfvec"
+        return f"{base}({self._embedding_dimension})"
+
+    @staticmethod
+    async def _current_column_type(conn: asyncpg.Connection, column: str) -> Optional[str]:
+        """Declared type of an items column (e.g. "vector(768)"), or None if it does not exist."""
+        return await conn.fetchval(
+            """
+            SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+            WHERE attrelid = 'items'::regclass AND attname = $1 AND NOT attisdropped
+            """,
+            column,
+        )
+
+    @property
+    def _reembedding(self) -> bool:
+        return self._embedding_columns == SHADOW_EMBEDDING_COLUMNS
+
+    def _reembed_job_id(self) -> str:
+        return f"reembed:{embedding_tag(self._embedding_provider)}"
+
+    async def _prepare_embedding_columns(self, conn: asyncpg.Connection) -> None:
+        """
+        Tag stored embeddings with their model and choose where new vectors go.
+
+        Untagged rows (stored before tagging existed, or by an older release) are
+        tagged as the configured model at the column's dimension; zero vectors left
+        by failed embedding calls are cleared so the backfill picks them up. If any
+        row is tagged with another model or dimension, new vectors go to shadow
+        columns that the backfill fills and swaps in, resuming from its checkpoint.
+        """
+        tag = embedding_tag(self._embedding_provider)
+        await conn.execute("ALTER TABLE items ADD COLUMN IF NOT EXISTS embedding_model TEXT")
+        for index_name, definition in EMBEDDING_TAG_INDEXES.items():
+            await conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON items "
+                f"{definition.format(column='embedding_model')}"
+            )
+
+        current_type = await self._current_column_type(conn, "item_name_embedding")
+        stored_dimension = re.search(r"\((\d+)\)", current_type).group(1)
+        async with conn.transaction():
+            cleared = await conn.execute(
+                """
+                UPDATE items SET item_name_embedding = NULL
+                WHERE embedding_model IS NULL AND item_name_embedding IS NOT NULL
+                  AND vector_norm(item_name_embedding::vector) = 0
+                """
+            )
+            tagged = await conn.execute(
+                """
+                UPDATE items SET embedding_model = $1
+                WHERE embedding_model IS NULL AND item_name_embedding IS NOT NULL
+                """,
+                f"{tag.rsplit(':', 1)[0]}:{stored_dimension}",
+            )
+        if cleared != "UPDATE 0" or tagged != "UPDATE 0":
+            logger.info(f"Embedding tags backfilled: {tagged.split()[-1]} tagged, {cleared.split()[-1]} zero vectors cleared.")
+
+        stale = stored_dimension != str(self._embedding_dimension) or await conn.fetchval(
+            "SELECT EXISTS (SELECT 1 FROM items WHERE embedding_model <> $1)", tag
+        )
+        shadow_type = await self._current_column_type(conn, "item_name_embedding_next")
+        if not stale:
+            if shadow_type is not None:
+                # Left over from a re-embed towards a model that is no longer configured
+                await self._drop_shadow_columns(conn)
+            self._embedding_columns = ACTIVE_EMBEDDING_COLUMNS
+            # Reconcile embedding column type and similarity index with the configured mode
+            await self._ensure_embedding_storage(conn)
+            return
+
+        job_id = self._reembed_job_id()
+        checkpoint = await conn.fetchval("SELECT last_id FROM embedding_jobs WHERE job_id = $1", job_id)
+        if checkpoint is None or shadow_type != self._column_type(self._storage_mode):
+            async with conn.transaction():
+                if shadow_type is not None:
+                    await self._drop_shadow_columns(conn)
+                await conn.execute(
+                    f"ALTER TABLE items ADD COLUMN item_name_embedding_next {self._column_type(self._storage_mode)}, "
+                    f"ADD COLUMN embedding_model_next TEXT"
+                )
+                await conn.execute(
+                    """
+                    INSERT INTO embedding_jobs (job_id) VALUES ($1)
+                    ON CONFLICT (job_id) DO UPDATE
+                    SET last_id = 0, rows_embedded = 0, completed = FALSE, updated_at = NOW()
+                    """,
+                    job_id,
+                )
+            checkpoint = 0
+
+        self._embedding_columns = SHADOW_EMBEDDING_COLUMNS
+        self._backfill_cursor = checkpoint
+        logger.warning(
+            f"Stored embeddings do not match {tag}; re-embedding items into shadow columns "
+            f"from item {checkpoint}. Similarity search only covers re-embedded items until it completes."
+        )
+
+    @staticmethod
+    async def _drop_shadow_columns(conn: asyncpg.Connection) -> None:
+        await conn.execute(
+            "ALTER TABLE items DROP COLUMN IF EXISTS item_name_embedding_next, "
+            "DROP COLUMN IF EXISTS embedding_model_next"
+        )
+        await conn.execute("DELETE FROM embedding_jobs WHERE job_id LIKE 'reembed:%' AND NOT completed")
+
+    async def _ensure_embedding_storage(self, conn: asyncpg.Connection) -> None:
+        """
+        Make item_name_embedding match EMBEDDING_STORAGE_MODE.
+
+        Changing the column type rewrites the table, so it only happens with
+        EMBEDDING_STORAGE_AUTO_MIGRATE; otherwise the adapter keeps serving the
+        existing column type and logs how to migrate.
+        """
+        current_type = await self._current_column_type(conn, "item_name_embedding")
+        if current_type != self._column_type(self._storage_mode):
+            if settings.EMBEDDING_STORAGE_AUTO_MIGRATE:
+                await self._migrate_embedding_column(conn, self._storage_mode)
+            else:
+                actual_mode = "float32" if current_type.startswith("vector") else "half"
+                logger.warning(
+                    f"items.item_name_embedding is {current_type} but EMBEDDING_STORAGE_MODE="
+                    f"{self._storage_mode}; serving as '{actual_mode}'. Set "
+                    f"EMBEDDING_STORAGE_AUTO_MIGRATE=true or call migrate_embedding_storage() to convert."
+                )
+                self._storage_mode = actual_mode
+
+        await self._ensure_embedding_index(conn, self._storage_mode)
+
+    async def _ensure_embedding_index(
+        self,
+        conn: asyncpg.Connection,
+        mode: str,
+        *,
+        drop_other_modes: bool = False,
+    ) -> None:
+        """
+        Create the similarity index for ``mode``.
+
+        Other modes' indexes are only dropped by an explicit migration, so a
+        worker started with a different EMBEDDING_STORAGE_MODE can't remove
+        the index the rest of the fleet is using. The index is built
+        concurrently so items stay writable during the build; one worker
+        builds it while the others start without waiting.
+        """
+        if drop_other_modes:
+            for other_mode, (index_name, _) in EMBEDDING_INDEXES.items():
+                if other_mode != mode:
+                    await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+        index_name, definition = EMBEDDING_INDEXES[mode]
+        if not await conn.fetchval("SELECT pg_try_advisory_lock(hashtext('items_embedding_index'))"):
+            logger.info(f"Another worker is building {index_name}; searches scan until it is ready.")
+            return
+        try:
+            # An interrupted concurrent build leaves an invalid index that IF NOT EXISTS would keep
+            if await conn.fetchval(
+                "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)",
+                index_name,
+            ):
+                await conn.execute(f"DROP INDEX CONCURRENTLY {index_name}")
+            await conn.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON items "
+                f"{definition.format(column='item_name_embedding', dim=self._embedding_dimension)}"
+            )
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock(hashtext('items_embedding_index'))")
+
+    async def _migrate_embedding_column(self, conn: asyncpg.Connection, mode: str) -> None:
+        column_type = self._column_type(mode)
+        logger.info(f"Migrating items.item_name_embedding to {column_type} ({mode})...")
+        async with conn.transaction():
+            # Indexes are tied to the old type's operator class
+            for index_name, _ in EMBEDDING_INDEXES.values():
+                await conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+            await conn.execute(
+                f"""
+                ALTER TABLE items ALTER COLUMN item_name_embedding
+                TYPE {column_type} USING item_name_embedding::{column_type}
+                """
+            )
+        logger.info(f"items.item_name_embedding migrated to {column_type}.")
+
+    async def migrate_embedding_storage(self, mode: str) -> None:
+        """
+        Convert stored embeddings to another storage mode ("float32", "half", "binary").
+
+        Rewrites the items table under an exclusive lock, then rebuilds the
+        similarity index; run it during a maintenance window on large tables.
+        """
+        mode = mode.lower()
+        if mode not in EMBEDDING_STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode '{mode}'. Options: {', '.join(EMBEDDING_STORAGE_MODES)}")
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized. Call connect() first.")
+        if self._reembedding:
+            raise RuntimeError("Re-embedding in progress; the new storage mode applies when it is swapped in.")
+
+        async with self.pool.acquire("migrate_embedding_storage") as conn:
+            current_type = await self._current_column_type(conn, "item_name_embedding")
+            if current_type != self._column_type(mode):
+                await self._migrate_embedding_column(conn, mode)
+            await self._ensure_embedding_index(conn, mode, drop_other_modes=True)
+        self._storage_mode = mode
+
+    @property
+    def sql_dialect(self) -> SQLDialect:
+        return POSTGRES_DIALECT
+
+    def _read_pool(self) -> InstrumentedPool:
+        """Pool for analyst reads: a replica unless the session just wrote."""
+        return self._router.read_pool(self.pool)
+
+    def _mark_write(self) -> None:
+        """Record a committed write for read-your-writes routing and the analytics mirror."""
+        self._router.mark_write()
+        if self._analytics is not None:
+            self._analytics.notify_write()
+
     @staticmethod
     async def _init_connection(conn: asyncpg.Connection) -> None:
         """Initialize each connection in the pool with pgvector type."""
@@ -89,58 +528,71 @@ class PostgresAdapter(AsyncDatabasePort):
 
     async def disconnect(self) -> None:
         """Close the connection pool."""
+        if self._backfill is not None:
+            await self._backfill.close()
+        if self._backfill_leader is not None:
+            await self._backfill_leader.close()
+            self._backfill_leader = None
+        if self._similarity_index is not None:
+            await self._similarity_index.close()
+        if self._analytics is not None:
+            await self._analytics.close()
+        await self._router.close()
         if self.pool:
             await self.pool.close()
+            unregister_pool(self.pool.name)
+            self.pool = None
             logger.info("PostgreSQL connection pool closed.")
 
-    async def _generate_embedding(self, text: str) -> List[float]:
+    async def _generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
         """
-        Generate a 768-dim embedding for the given text using the configured embedding provider.
+        Generate embeddings for the given texts in one batched provider call.
 
-        Falls back to a zero vector if embedding provider is not set or generation fails.
+        Texts that could not be embedded (no provider set, or the call failed) get
+        None; their rows are stored pending and embedded later by the backfill.
         """
         if not self._embedding_provider:
-            logger.warning("No embedding provider set. Using zero vector fallback.")
-            return [0.0] * 768
+            logger.warning("No embedding provider set. Storing items without embeddings.")
+            return [None] * len(texts)
 
-        return await self._embedding_provider.generate_embedding(text)
+        try:
+            vectors = await self._embedding_provider.generate_embeddings(texts)
+        except Exception as e:
+            logger.error(f"Embedding failed, storing items without embeddings: {e}")
+            return [None] * len(texts)
+        # Zero vectors are some providers' failure fallback
+        return [vector if vector is not None and any(vector) else None for vector in vectors]
 
     async def save_receipt(self, receipt: Receipt) -> bool:
         """
         Save receipt items to PostgreSQL including embeddings.
 
         Each item gets an auto generated embedding for its item_name.
+        All names are embedded in one batch before a connection is taken.
         """
         if not self.pool:
             logger.error("Database pool not initialized. Call connect() first.")
             return False
 
         try:
-            async with self.pool.acquire() as conn:
-                async with conn.transaction():
-                    for item in receipt.items:
-                        # Generate embedding for item name
-                        embedding = await self._generate_embedding(item.item_name)
-                        embedding_np = np.array(embedding, dtype=np.float32)
-
-                        purchase_date = item.purchase_date or datetime.now(timezone.utc)
-
-                        await conn.execute(
-                            """
-                            INSERT INTO items 
-                                (receipt_id, item_name, quantity, unit_price, 
-                                 total_price, purchase_date, item_name_embedding)
-                            VALUES ($1, $2, $3, $4, $5, $6, $7)
-                            """,
-                            receipt.receipt_id,
-                            item.item_name,
-                            item.quantity,
-                            item.unit_price,
-                            item.total_price,
-                            purchase_date,
-                            embedding_np,
-                        )
+            embeddings = await self._generate_embeddings([item.item_name for item in receipt.items])
+            now = datetime.now(timezone.utc)
+            indexed = [
+                item.model_copy(
+                    update={"purchase_date": item.purchase_date or now, "item_name_embedding": embedding}
+                )
+                for item, embedding in zip(receipt.items, embeddings)
+            ]
+            try:
+                await self._insert_receipt_items(receipt, indexed)
+            except asyncpg.UndefinedColumnError:
+                # Another worker swapped in re-embedded columns; follow it and retry once
+                await self._reload_embedding_columns()
+                await self._insert_receipt_items(receipt, indexed)
 
+            self._mark_write()
+            if self._similarity_index is not None:
+                await self._similarity_index.add_items(indexed)
             logger.info(
                 f"Saved receipt {receipt.receipt_id} with {len(receipt.items)} items."
             )
@@ -150,13 +602,126 @@ class PostgresAdapter(AsyncDatabasePort):
             logger.error(f"Error saving receipt: {e}")
             return False
 
+    async def _insert_receipt_items(self, receipt: Receipt, items: List[Item]) -> None:
+        embedding_column, tag_column = self._embedding_columns
+        tag = embedding_tag(self._embedding_provider)
+        async with self.pool.acquire("save_receipt") as conn:
+            async with conn.transaction():
+                for item in items:
+                    embedded = item.item_name_embedding is not None
+                    await conn.execute(
+                        f"""
+                        INSERT INTO items 
+                            (receipt_id, item_name, quantity, unit_price, 
+                             total_price, purchase_date, {embedding_column}, {tag_column}, user_id)
+                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                        """,
+                        receipt.receipt_id,
+                        item.item_name,
+                        item.quantity,
+                        item.unit_price,
+                        item.total_price,
+                        item.purchase_date,
+                        np.array(item.item_name_embedding, dtype=np.float32) if embedded else None,
+                        tag if embedded else None,
+                        receipt.user_id,
+                    )
+
+    async def bulk_insert_items(
+        self,
+        items: List[Item],
+        *,
+        receipt_id: int,
+        user_id: Optional[str] = None,
+        checkpoint: Optional[ImportCheckpoint] = None,
+    ) -> int:
+        """
+        Load items with COPY (copy_records_to_table) in a single transaction.
+
+        The optional import checkpoint is upserted in the same transaction.
+        """
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized. Call connect() first.")
+
+        now = datetime.now(timezone.utc)
+        embedding_column, tag_column = self._embedding_columns
+        tag = embedding_tag(self._embedding_provider)
+        records = [
+            (
+                receipt_id,
+                item.item_name,
+                item.quantity,
+                item.unit_price,
+                item.total_price,
+                item.purchase_date or now,
+                (
+                    np.array(item.item_name_embedding, dtype=np.float32)
+                    if item.item_name_embedding is not None
+                    else None
+                ),
+                tag if item.item_name_embedding is not None else None,
+                user_id,
+            )
+            for item in items
+        ]
+
+        async with self.pool.acquire("bulk_insert_items") as conn:
+            async with conn.transaction():
+                if records:
+                    await conn.copy_records_to_table(
+                        "items",
+                        records=records,
+                        columns=[
+                            "receipt_id", "item_name", "quantity", "unit_price",
+                            "total_price", "purchase_date", embedding_column, tag_column, "user_id",
+                        ],
+                    )
+                if checkpoint is not None:
+                    await conn.execute(
+                        """
+                        INSERT INTO import_jobs (job_id, source, user_id, rows_committed, completed, updated_at)
+                        VALUES ($1, $2, $3, $4, $5, NOW())
+                        ON CONFLICT (job_id) DO UPDATE
+                        SET rows_committed = EXCLUDED.rows_committed,
+                            completed = EXCLUDED.completed,
+                            updated_at = NOW()
+                        """,
+                        checkpoint.job_id,
+                        checkpoint.source,
+                        checkpoint.user_id,
+                        checkpoint.rows_committed,
+                        checkpoint.completed,
+                    )
+
+        self._mark_write()
+        if self._similarity_index is not None and records:
+            await self._similarity_index.add_items(
+                [item.model_copy(update={"purchase_date": item.purchase_date or now}) for item in items]
+            )
+        return len(records)
+
+    async def get_import_checkpoint(self, job_id: str) -> Optional[ImportCheckpoint]:
+        """Get the stored progress of a bulk import, if any."""
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized. Call connect() first.")
+
+        async with self.pool.acquire("get_import_checkpoint") as conn:
+            row = await conn.fetchrow(
+                """
+                SELECT job_id, source, user_id, rows_committed, completed
+                FROM import_jobs WHERE job_id = $1
+                """,
+                job_id,
+            )
+        return ImportCheckpoint(**dict(row)) if row else None
+
     async def query_spending(self, item_name: str, days: int = 7) -> float:
         """Query total spending for an item within specified days."""
         if not self.pool:
             return 0.0
 
         try:
-            async with self.pool.acquire() as conn:
+            async with self._read_pool().acquire("query_spending") as conn:
                 if days > 0:
                     result = await conn.fetchval(
                         """
@@ -185,42 +750,90 @@ class PostgresAdapter(AsyncDatabasePort):
             return 0.0
 
     async def get_items(self, receipt_id: Optional[int] = None) -> List[Item]:
-        """Get items, optionally filtered by receipt_id."""
+        """
+        Get items, optionally filtered by receipt_id.
+
+        Built on iter_items() and capped at settings.ITEMS_LIST_HARD_CAP rows
+        so an unfiltered call can't materialize the whole table.
+        """
         if not self.pool:
             return []
 
+        cap = settings.ITEMS_LIST_HARD_CAP
+        items: List[Item] = []
         try:
-            async with self.pool.acquire() as conn:
-                if receipt_id is not None:
-                    rows = await conn.fetch(
-                        """
-                        SELECT item_name, quantity, unit_price, total_price, purchase_date
-                        FROM items WHERE receipt_id = $1
-                        """,
-                        receipt_id,
-                    )
-                else:
-                    rows = await conn.fetch(
-                        """
-                        SELECT item_name, quantity, unit_price, total_price, purchase_date
-                        FROM items
-                        """
-                    )
+            async with aclosing(self.iter_items(receipt_id=receipt_id)) as stream:
+                async for item in stream:
+                    if len(items) >= cap:
+                        logger.warning(
+                            f"get_items truncated at {cap} rows; use iter_items() to stream the rest."
+                        )
+                        break
+                    items.append(item)
+            return items
 
-                return [
-                    Item(
+        except Exception as e:
+            logger.error(f"Error getting items: {e}")
+            return []
+
+    async def iter_items(
+        self,
+        *,
+        receipt_id: Optional[int] = None,
+        user_id: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        fetch_size: Optional[int] = None,
+    ) -> AsyncIterator[Item]:
+        """
+        Stream items through a server-side cursor, keyset-ordered by (purchase_date, id).
+
+        A connection is held for as long as the generator is open.
+        """
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized. Call connect() first.")
+
+        conditions: List[str] = []
+        args: List[Any] = []
+
+        def bind(value: Any) -> str:
+            args.append(value)
+            return f"${len(args)}"
+
+        if receipt_id is not None:
+            conditions.append(f"receipt_id = {bind(receipt_id)}")
+        if user_id is not None:
+            conditions.append(f"user_id = {bind(user_id)}")
+        if start_date is not None:
+            conditions.append(f"purchase_date >= {bind(start_date)}")
+        if end_date is not None:
+            conditions.append(f"purchase_date < {bind(end_date)}")
+        if after is not None:
+            after_date, after_id = after
+            conditions.append(f"(purchase_date, id) > ({bind(after_date)}, {bind(after_id)})")
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"""
+            SELECT id, item_name, quantity, unit_price, total_price, purchase_date
+            FROM items
+            {where}
+            ORDER BY purchase_date, id
+        """
+
+        async with self._read_pool().acquire("iter_items") as conn:
+            # Server-side cursors only live inside a transaction
+            async with conn.transaction(readonly=True):
+                cursor = conn.cursor(sql, *args, prefetch=fetch_size or settings.ITEMS_FETCH_SIZE)
+                async for row in cursor:
+                    yield Item(
+                        id=row["id"],
                         item_name=row["item_name"],
                         quantity=row["quantity"],
                         unit_price=row["unit_price"],
                         total_price=row["total_price"],
                         purchase_date=row["purchase_date"],
                     )
-                    for row in rows
-                ]
-
-        except Exception as e:
-            logger.error(f"Error getting items: {e}")
-            return []
 
     async def execute_read_query(
         self,
@@ -230,30 +843,23 @@ class PostgresAdapter(AsyncDatabasePort):
         """
         Execute a read-only SQL query. Only SELECT statements are allowed.
 
-        Used by the Database Analyst Agent for NL2SQL queries.
+        Used by the Database Analyst Agent for NL2SQL queries. Aggregate-only
+        queries are answered by the analytics mirror when it is configured and fresh.
         """
         if not self.pool:
             raise RuntimeError("Database pool not initialized. Call connect() first.")
 
-        # Safety: only allow SELECT statements
-        cleaned = sql.strip().upper()
-        if not cleaned.startswith("SELECT"):
-            raise ValueError(
-                "Only SELECT queries are allowed. "
-                f"Received query starting with: {cleaned[:20]}"
-            )
+        validate_read_only_query(sql)
 
-        # Block dangerous keywords
-        dangerous_keywords = ["DROP", "DELETE", "INSERT", "UPDATE", "ALTER", "TRUNCATE", "GRANT", "REVOKE"]
-        for keyword in dangerous_keywords:
-            # Check for keyword as a standalone word
-            if f" {keyword} " in f" {cleaned} ":
-                raise ValueError(
-                    f"Query contains forbidden keyword: {keyword}"
-                )
+        if self._analytics is not None and self._analytics.can_serve(sql, self._router.last_write_at()):
+            try:
+                return await self._analytics.execute(sql, params)
+            except Exception as e:
+                # Postgres-only syntax the mirror can't run; the database can
+                logger.info(f"Analytics mirror declined query, using database: {e}")
 
         try:
-            async with self.pool.acquire() as conn:
+            async with self._read_pool().acquire("execute_read_query") as conn:
                 # Use a read-only transaction for extra safety
                 async with conn.transaction(readonly=True):
                     if params:
@@ -267,6 +873,210 @@ class PostgresAdapter(AsyncDatabasePort):
             logger.error(f"Error executing read query: {e}")
             raise
 
+    async def _fetch_item_rows_since(self, after_id: int, limit: int) -> List[Tuple[Any, ...]]:
+        """Analytics mirror loader: up to ``limit`` item rows with id > after_id, by id."""
+        # Primary, not a replica: the mirror's freshness bound assumes it sees every committed row
+        async with self.pool.acquire("analytics_sync") as conn:
+            rows = await conn.fetch(
+                """
+                SELECT id, receipt_id, item_name, quantity, unit_price,
+                       total_price, purchase_date, user_id
+                FROM items
+                WHERE id > $1
+                ORDER BY id
+                LIMIT $2
+                """,
+                after_id,
+                limit,
+            )
+        return [tuple(row.values()) for row in rows]
+
+    async def _fetch_item_embeddings_since(self, watermark: int) -> Tuple[int, List[Item]]:
+        """
+        Similarity index loader: latest embedded row per item name with id > watermark.
+
+        Returns:
+            (highest item id seen, items)
+        """
+        embedding_column, _ = self._embedding_columns
+        async with self.pool.acquire("similarity_index_sync") as conn:
+            async with conn.transaction(readonly=True, isolation="repeatable_read"):
+                high = await conn.fetchval("SELECT COALESCE(MAX(id), 0) FROM items")
+                if high <= watermark:
+                    return watermark, []
+                rows = await conn.fetch(
+                    f"""
+                    SELECT DISTINCT ON (item_name)
+                        id, item_name, quantity, unit_price, total_price, purchase_date,
+                        {embedding_column}::vector AS embedding
+                    FROM items
+                    WHERE id > $1 AND id <= $2 AND {embedding_column} IS NOT NULL
+                    ORDER BY item_name, id DESC
+                    """,
+                    watermark,
+                    high,
+                )
+
+        items = [
+            Item(
+                id=row["id"],
+                item_name=row["item_name"],
+                quantity=row["quantity"],
+                unit_price=row["unit_price"],
+                total_price=row["total_price"],
+                purchase_date=row["purchase_date"],
+                item_name_embedding=row["embedding"].tolist(),
+            )
+            for row in rows
+        ]
+        return high, items
+
+    async def _fetch_embedding_backlog(self, limit: int) -> List[Item]:
+        """Backfill loader: next items after the cursor with no embedding in the target columns."""
+        _, tag_column = self._embedding_columns
+        try:
+            async with self.pool.acquire("embedding_backfill") as conn:
+                rows = await conn.fetch(
+                    f"""
+                    SELECT id, item_name, quantity, unit_price, total_price, purchase_date
+                    FROM items
+                    WHERE id > $1 AND {tag_column} IS NULL AND btrim(item_name) <> ''
+                    ORDER BY id
+                    LIMIT $2
+                    """,
+                    self._backfill_cursor,
+                    limit,
+                )
+        except asyncpg.UndefinedColumnError:
+            # Another worker finished the re-embed and swapped the columns
+            await self._reload_embedding_columns()
+            return []
+        return [Item(**dict(row)) for row in rows]
+
+    async def _store_backfilled_embeddings(self, items: List[Item], checkpoint_id: int) -> None:
+        """Backfill writer: bulk-update vectors and record the re-embed checkpoint atomically."""
+        embedding_column, tag_column = self._embedding_columns
+        tag = embedding_tag(self._embedding_provider)
+        async with self.pool.acquire("embedding_backfill") as conn:
+            async with conn.transaction():
+                if items:
+                    await conn.executemany(
+                        f"""
+                        UPDATE items SET {embedding_column} = $1, {tag_column} = $2
+                        WHERE id = $3 AND {tag_column} IS NULL
+                        """,
+                        [
+                            (np.array(item.item_name_embedding, dtype=np.float32), tag, item.id)
+                            for item in items
+                        ],
+                    )
+                if self._reembedding:
+                    await conn.execute(
+                        """
+                        UPDATE embedding_jobs
+                        SET last_id = GREATEST(last_id, $2),
+                            rows_embedded = rows_embedded + $3,
+                            updated_at = NOW()
+                        WHERE job_id = $1
+                        """,
+                        self._reembed_job_id(),
+                        checkpoint_id,
+                        len(items),
+                    )
+        self._backfill_cursor = checkpoint_id
+        if self._similarity_index is not None and items:
+            await self._similarity_index.add_items(items)
+
+    async def _lead_embedding_backfill(self) -> bool:
+        """
+        Backfill leader election: only the worker holding a session advisory lock
+        runs passes. The lock lives on a dedicated connection, so it is released
+        if this worker dies and another one takes over at its next interval.
+        """
+        if self._backfill_leader is not None and not self._backfill_leader.is_closed():
+            return True
+        self._backfill_leader = None
+        conn = await asyncpg.connect(self.database_url, statement_cache_size=0)
+        try:
+            if await conn.fetchval("SELECT pg_try_advisory_lock(hashtext('items_embedding_backfill'))"):
+                self._backfill_leader = conn
+                logger.info("This worker now runs the embedding backfill.")
+                return True
+        except Exception:
+            await conn.close()
+            raise
+        await conn.close()
+        return False
+
+    async def _finish_embedding_pass(self) -> None:
+        """
+        Backfill pass complete: rewind the cursor so skipped items are retried, and
+        after a re-embed swap the shadow columns in.
+
+        The whole step runs under a session advisory lock, so two workers never build
+        the shadow indexes or swap at the same time. Indexes for the shadow columns are
+        built concurrently first; the swap itself only renames columns and indexes, so
+        reads and writes are blocked only briefly.
+        """
+        self._backfill_cursor = 0
+        if not self._reembedding:
+            return
+        await self._reload_embedding_columns()
+        if not self._reembedding:
+            return
+
+        indexes = dict(EMBEDDING_TAG_INDEXES)
+        index_name, definition = EMBEDDING_INDEXES[self._storage_mode]
+        indexes[index_name] = definition
+        async with self.pool.acquire("embedding_swap") as conn:
+            if not await conn.fetchval("SELECT pg_try_advisory_lock(hashtext('items_embedding_swap'))"):
+                logger.info("Another worker is swapping in re-embedded columns.")
+                return
+            try:
+                # Another worker may have completed the swap before we got the lock
+                if await self._current_column_type(conn, "item_name_embedding_next") is None:
+                    logger.info("Re-embedded columns were swapped in by another worker.")
+                else:
+                    await self._swap_in_shadow_columns(conn, indexes)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock(hashtext('items_embedding_swap'))")
+
+        self._embedding_columns = ACTIVE_EMBEDDING_COLUMNS
+
+    async def _swap_in_shadow_columns(self, conn: asyncpg.Connection, indexes: Dict[str, str]) -> None:
+        """Build the shadow columns' indexes concurrently, then rename everything into place."""
+        for name, definition in indexes.items():
+            column = "embedding_model_next" if name in EMBEDDING_TAG_INDEXES else "item_name_embedding_next"
+            # Drop first: an interrupted concurrent build leaves an invalid index behind
+            await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}_next")
+            await conn.execute(
+                f"CREATE INDEX CONCURRENTLY {name}_next ON items "
+                f"{definition.format(column=column, dim=self._embedding_dimension)}"
+            )
+
+        async with conn.transaction():
+            await conn.execute(
+                "ALTER TABLE items DROP COLUMN item_name_embedding, DROP COLUMN embedding_model"
+            )
+            await conn.execute("ALTER TABLE items RENAME COLUMN item_name_embedding_next TO item_name_embedding")
+            await conn.execute("ALTER TABLE items RENAME COLUMN embedding_model_next TO embedding_model")
+            for name in indexes:
+                await conn.execute(f"ALTER INDEX {name}_next RENAME TO {name}")
+            await conn.execute(
+                "UPDATE embedding_jobs SET completed = TRUE, updated_at = NOW() WHERE job_id = $1",
+                self._reembed_job_id(),
+            )
+        logger.info(f"Re-embedding complete; swapped in {embedding_tag(self._embedding_provider)} embeddings.")
+
+    async def _reload_embedding_columns(self) -> None:
+        """Follow a column swap made by another worker."""
+        async with self.pool.acquire("embedding_swap") as conn:
+            shadow_type = await self._current_column_type(conn, "item_name_embedding_next")
+        if shadow_type is None and self._reembedding:
+            logger.info("Re-embedded columns were swapped in by another worker.")
+            self._embedding_columns = ACTIVE_EMBEDDING_COLUMNS
+            self._backfill_cursor = 0
+
     async def search_similar_items(
         self,
         query_embedding: List[float],
@@ -276,29 +1086,39 @@ class PostgresAdapter(AsyncDatabasePort):
         Search for items with similar name embeddings using pgvector cosine distance.
 
         Returns distinct item names with their similarity scores.
+        Served by the in-process similarity index when one is configured.
         """
+        if self._similarity_index is not None:
+            return await self._similarity_index.search(query_embedding, limit)
+
         if not self.pool:
             raise RuntimeError("Database pool not initialized. Call connect() first.")
 
         try:
             embedding_np = np.array(query_embedding, dtype=np.float32)
+            embedding_column, _ = self._embedding_columns
 
-            async with self.pool.acquire() as conn:
-                rows = await conn.fetch(
-                    """
-                    SELECT DISTINCT ON (item_name)
-                        item_name,
-                        1 - (item_name_embedding <=> $1) AS similarity_score,
-                        total_price,
-                        purchase_date
-                    FROM items
-                    WHERE item_name_embedding IS NOT NULL
-                    ORDER BY item_name, item_name_embedding <=> $1
-                    LIMIT $2
-                    """,
-                    embedding_np,
-                    limit,
-                )
+            # Shadow columns have no index; they are scanned exactly until swapped in
+            mode = "exact" if self._reembedding else self._storage_mode
+            sql = similar_items_sql(
+                mode,
+                embedding_column,
+                self._embedding_dimension,
+                (
+                    settings.EMBEDDING_BINARY_RERANK_FACTOR
+                    if mode == "binary"
+                    else settings.EMBEDDING_SEARCH_CANDIDATE_FACTOR
+                ),
+            )
+
+            async with self._read_pool().acquire("search_similar_items") as conn:
+                if mode == "float32":
+                    # ivfflat searches a single list by default; SET LOCAL also holds behind a transaction pooler
+                    async with conn.transaction():
+                        await conn.execute(f"SET LOCAL ivfflat.probes = {int(settings.EMBEDDING_IVFFLAT_PROBES)}")
+                        rows = await conn.fetch(sql, embedding_np, limit)
+                else:
+                    rows = await conn.fetch(sql, embedding_np, limit)
 
                 return [
                     {
@@ -0,0 +1,31 @@
+"""
+Read-Only Query Guard
+
+Shared validation for analyst SQL executed through AsyncDatabasePort.execute_read_query().
+"""
+
+DANGEROUS_KEYWORDS = ["DROP", "DELETE", "INSERT", "UPDATE", "ALTER", "TRUNCATE", "GRANT", "REVOKE"]
+
+
+def validate_read_only_query(sql: str) -> None:
+    """
+    Reject anything that isn't a plain SELECT.
+
+    Raises:
+        ValueError: If the query is not a SELECT or contains a forbidden keyword
+    """
+    # Safety: only allow SELECT statements
+    cleaned = sql.strip().upper()
+    if not cleaned.startswith("SELECT"):
+        raise ValueError(
+            "Only SELECT queries are allowed. "
+            f"Received query starting with: {cleaned[:20]}"
+        )
+
+    # Block dangerous keywords
+    for keyword in DANGEROUS_KEYWORDS:
+        # Check for keyword as a standalone word
+        if f" {keyword} " in f" {cleaned} ":
+            raise ValueError(
+                f"Query contains forbidden keyword: {keyword}"
+            )
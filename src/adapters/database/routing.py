@@ -0,0 +1,97 @@
+"""
+Read Replica Routing
+
+Chooses which pool serves a read: replicas by round-robin or least-loaded
+selection, falling back to the primary while the current session is inside
+its read-your-writes window after a save. The same write tracking lets the
+analytics mirror decline reads it has not caught up with yet.
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from src.observability.pool_metrics import InstrumentedPool, unregister_pool
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_current_session: ContextVar[str | None] = ContextVar("database_session", default=None)
+
+# Writes made outside any session are tracked under this key
+_ANONYMOUS_SESSION = "__anonymous__"
+
+
+@contextmanager
+def database_session(session_id: str | None) -> Iterator[None]:
+    """Scope database calls to a conversation session for read-your-writes."""
+    token = _current_session.set(session_id)
+    try:
+        yield
+    finally:
+        _current_session.reset(token)
+
+
+class ReplicaRouter:
+    """Routes reads to replica pools while keeping recent writers on the primary."""
+
+    def __init__(
+        self,
+        replicas: list[InstrumentedPool] | None = None,
+        *,
+        selection: str | None = None,
+        sticky_window_seconds: float | None = None,
+    ) -> None:
+        self._replicas = replicas or []
+        self._selection = (selection or settings.DATABASE_REPLICA_SELECTION).lower()
+        self._sticky_window = (
+            settings.READ_YOUR_WRITES_WINDOW_SECONDS
+            if sticky_window_seconds is None
+            else sticky_window_seconds
+        )
+        self._round_robin = itertools.cycle(range(len(self._replicas))) if self._replicas else None
+        self._last_write: dict[str, float] = {}
+
+    @property
+    def replicas(self) -> list[InstrumentedPool]:
+        return self._replicas
+
+    def mark_write(self) -> None:
+        """Pin the current session to the primary for the sticky window."""
+        now = time.monotonic()
+        self._last_write[_current_session.get() or _ANONYMOUS_SESSION] = now
+        # Drop expired entries so the map doesn't grow with every session ever seen
+        if len(self._last_write) > 1024:
+            cutoff = now - self._sticky_window
+            self._last_write = {key: ts for key, ts in self._last_write.items() if ts >= cutoff}
+
+    def last_write_at(self) -> float | None:
+        """time.monotonic() of the current session's last write, if within the sticky window."""
+        last_write = self._last_write.get(_current_session.get() or _ANONYMOUS_SESSION)
+        if last_write is None or time.monotonic() - last_write >= self._sticky_window:
+            return None
+        return last_write
+
+    def read_pool(self, primary: InstrumentedPool) -> InstrumentedPool:
+        """Return the pool that should serve a read for the current session."""
+        if not self._replicas:
+            return primary
+
+        if self.last_write_at() is not None:
+            return primary
+
+        if self._selection == "least_loaded":
+            return min(self._replicas, key=lambda pool: pool.in_use)
+        return self._replicas[next(self._round_robin)]
+
+    async def close(self) -> None:
+        for replica in self._replicas:
+            await replica.close()
+            unregister_pool(replica.name)
+        self._replicas = []
+        self._round_robin = None
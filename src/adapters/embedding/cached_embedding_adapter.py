@@ -0,0 +1,360 @@
+"""
+Cached Embedding Adapter
+
+EmbeddingPort decorator that avoids re-embedding text it has seen before:
+  - In-memory LRU of float32 vectors in front of an on-disk SQLite store
+  - Keyed by model, dimension and normalized text (NFKC, case-folded,
+    whitespace-collapsed), so a model or dimension change never serves stale vectors
+  - Both tiers are size-bounded; the disk tier evicts least recently used rows
+  - The disk tier is opened on first use; recency updates for disk hits are
+    buffered and written in batches rather than one UPDATE per hit
+  - Concurrent misses for the same text share one provider call
+  - Failed embeddings (zero vectors) are never cached
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.observability.cache_metrics import register_cache
+from src.ports.embedding_port import EmbeddingPort
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Buffered disk-hit recency updates are written once this many are pending or this old
+_TOUCH_FLUSH_SIZE = 256
+_TOUCH_FLUSH_SECONDS = 30.0
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class CachedEmbeddingAdapter(EmbeddingPort):
+    """Two-tier (memory + SQLite) cache around another embedding provider."""
+
+    def __init__(
+        self,
+        provider: EmbeddingPort,
+        memory_size: Optional[int] = None,
+        disk_path: Optional[str] = None,
+        disk_max_entries: Optional[int] = None,
+    ):
+        """
+        Initialize cached embedding adapter.
+
+        Args:
+            provider: Embedding provider to call on a miss
+            memory_size: Max vectors kept in memory.
+                         Defaults to settings.EMBEDDING_CACHE_MEMORY_SIZE
+            disk_path: SQLite file for the persistent tier; empty disables it.
+                       Defaults to settings.EMBEDDING_CACHE_PATH
+            disk_max_entries: Max vectors kept on disk.
+                              Defaults to settings.EMBEDDING_CACHE_DISK_MAX_ENTRIES
+        """
+        self._provider = provider
+        self._memory_size = memory_size or settings.EMBEDDING_CACHE_MEMORY_SIZE
+        self._disk_path = settings.EMBEDDING_CACHE_PATH if disk_path is None else disk_path
+        self._disk_max_entries = disk_max_entries or settings.EMBEDDING_CACHE_DISK_MAX_ENTRIES
+
+        self._memory: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        self._stats = register_cache("embeddings")
+
+        self._disk: Optional[sqlite3.Connection] = None
+        # Opened by the first disk access; False once opening failed (memory only from then on)
+        self._disk_enabled = bool(self._disk_path)
+        self._disk_entries = 0
+        # Disk hits not yet written to last_used, flushed in one batch
+        self._touched: Dict[bytes, float] = {}
+        self._touched_since = 0.0
+        # One thread owns the SQLite connection, so disk access is serialized without locks
+        self._disk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-cache")
+
+    # ── Disk tier ────────────────────────────────────────────────────────────
+
+    def _open_disk(self) -> None:
+        Path(self._disk_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self._disk_path, check_same_thread=False, isolation_level=None)
+        # Several workers may share the file; wait for their writes instead of failing
+        conn.execute("PRAGMA busy_timeout = 5000")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key BLOB PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._disk_entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self._disk = conn
+        self._stats.set_entries("disk", self._disk_entries)
+        logger.info(f"Embedding disk cache '{self._disk_path}' opened with {self._disk_entries} entries.")
+
+    def _disk_get(self, key: bytes) -> Optional[bytes]:
+        row = self._disk.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._touch([key])
+        return row[0]
+
+    def _disk_get_many(self, keys: List[bytes]) -> Dict[bytes, bytes]:
+        found: Dict[bytes, bytes] = {}
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(
+                self._disk.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+            )
+        self._touch(list(found))
+        return found
+
+    def _touch(self, keys: List[bytes]) -> None:
+        if not keys:
+            return
+        now = time.time()
+        if not self._touched:
+            self._touched_since = now
+        for key in keys:
+            self._touched[key] = now
+        if len(self._touched) >= _TOUCH_FLUSH_SIZE or now - self._touched_since >= _TOUCH_FLUSH_SECONDS:
+            self._flush_touches()
+
+    def _flush_touches(self) -> None:
+        if not self._touched:
+            return
+        touched, self._touched = self._touched, {}
+        self._disk.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE key = ?",
+            [(used, key) for key, used in touched.items()],
+        )
+
+    def _disk_put(self, key: bytes, vector: bytes) -> None:
+        self._disk_put_many([(key, vector)])
+
+    def _disk_put_many(self, entries: List[Tuple[bytes, bytes]]) -> None:
+        now = time.time()
+        added = 0
+        self._disk.execute("BEGIN")
+        try:
+            for key, vector in entries:
+                # Only genuinely new keys grow the table
+                exists = self._disk.execute("SELECT 1 FROM embeddings WHERE key = ?", (key,)).fetchone()
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                    (key, vector, now),
+                )
+                added += 0 if exists else 1
+            self._disk.execute("COMMIT")
+        except Exception:
+            self._disk.execute("ROLLBACK")
+            raise
+        self._disk_entries += added
+        if self._disk_entries > self._disk_max_entries:
+            # Recent hits must count before choosing the least recently used rows
+            self._flush_touches()
+            # Trim 10% below the bound so eviction runs rarely, not on every insert
+            excess = self._disk_entries - int(self._disk_max_entries * 0.9)
+            self._disk.execute(
+                """
+                DELETE FROM embeddings WHERE key IN (
+                    SELECT key FROM embeddings ORDER BY last_used LIMIT ?
+                )
+                """,
+                (excess,),
+            )
+            self._disk_entries = self._disk.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._stats.evicted("disk", excess)
+        self._stats.set_entries("disk", self._disk_entries)
+
+    def _with_disk(self, fn, *args):
+        if self._disk is None:
+            try:
+                self._open_disk()
+            except Exception as e:
+                logger.error(f"Embedding disk cache unavailable, using memory only: {e}")
+                self._disk_enabled = False
+                return None
+        return fn(*args)
+
+    async def _on_disk(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._disk_executor, self._with_disk, fn, *args)
+
+    # ── Memory tier ──────────────────────────────────────────────────────────
+
+    def _memory_put(self, key: bytes, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+            self._stats.evicted("memory")
+        self._stats.set_entries("memory", len(self._memory))
+
+    def _key(self, text: str) -> bytes:
+        model = self._provider.get_model_name()
+        dimension = self._provider.get_embedding_dimension()
+        return hashlib.sha256(f"{model}\x00{dimension}\x00{normalize_text(text)}".encode()).digest()
+
+    # ── EmbeddingPort ────────────────────────────────────────────────────────
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        """
+        Return the cached embedding for ``text``, calling the provider on a miss.
+
+        Falls back to the provider's own failure behaviour (a zero vector) on errors.
+        """
+        key = self._key(text)
+
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self._stats.hit("memory")
+            return vector.tolist()
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                vector = await asyncio.shield(pending)
+                self._stats.hit("inflight")
+                return vector.tolist()
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # This caller was cancelled
+                # The call we joined was cancelled; make our own below
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            vector = await self._lookup_or_embed(key, text)
+            future.set_result(vector)
+            return vector.tolist()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so a failure nobody joined isn't logged
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _lookup_or_embed(self, key: bytes, text: str) -> np.ndarray:
+        if self._disk_enabled:
+            try:
+                blob = await self._on_disk(self._disk_get, key)
+            except Exception as e:
+                logger.warning(f"Embedding disk cache read failed: {e}")
+                blob = None
+            if blob is not None:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                self._stats.hit("disk")
+                self._memory_put(key, vector)
+                return vector
+
+        self._stats.miss()
+        vector = np.asarray(await self._provider.generate_embedding(text), dtype=np.float32)
+        if not vector.any():
+            return vector  # Provider failure; let the next call retry
+
+        self._memory_put(key, vector)
+        if self._disk_enabled:
+            try:
+                await self._on_disk(self._disk_put, key, vector.tobytes())
+            except Exception as e:
+                logger.warning(f"Embedding disk cache write failed: {e}")
+        return vector
+
+    async def generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Batch variant of generate_embedding(): cached texts are served from memory
+        or disk; the remaining distinct texts go to the provider in one batch call.
+        """
+        keys = [self._key(text) for text in texts]
+        vectors: Dict[bytes, Optional[np.ndarray]] = {}
+
+        for key in keys:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._stats.hit("memory")
+                vectors[key] = vector
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing and self._disk_enabled:
+            try:
+                found = await self._on_disk(self._disk_get_many, missing) or {}
+            except Exception as e:
+                logger.warning(f"Embedding disk cache read failed: {e}")
+                found = {}
+            for key, blob in found.items():
+                vector = np.frombuffer(blob, dtype=np.float32)
+                self._stats.hit("disk")
+                self._memory_put(key, vector)
+                vectors[key] = vector
+            missing = [key for key in missing if key not in vectors]
+
+        if missing:
+            first_text = {}
+            for key, text in zip(keys, texts):
+                first_text.setdefault(key, text)
+            for _ in missing:
+                self._stats.miss()
+
+            embedded = await self._provider.generate_embeddings([first_text[key] for key in missing])
+            to_store: List[Tuple[bytes, bytes]] = []
+            for key, values in zip(missing, embedded):
+                vector = np.asarray(values, dtype=np.float32) if values is not None else None
+                if vector is None or not vector.any():
+                    vectors[key] = None  # Failed; not cached so the next call retries
+                    continue
+                vectors[key] = vector
+                self._memory_put(key, vector)
+                to_store.append((key, vector.tobytes()))
+
+            if to_store and self._disk_enabled:
+                try:
+                    await self._on_disk(self._disk_put_many, to_store)
+                except Exception as e:
+                    logger.warning(f"Embedding disk cache write failed: {e}")
+
+        return [vectors[key].tolist() if vectors[key] is not None else None for key in keys]
+
+    def get_model_name(self) -> str:
+        """Get the current embedding model name"""
+        return self._provider.get_model_name()
+
+    def get_embedding_dimension(self) -> int:
+        """Get the dimension of the embedding vector"""
+        return self._provider.get_embedding_dimension()
+
+    def close(self) -> None:
+        """Write pending recency updates and close the disk tier."""
+        if self._disk is not None:
+            self._disk_executor.submit(self._close_disk).result()
+        self._disk_executor.shutdown(wait=True)
+
+    def _close_disk(self) -> None:
+        try:
+            self._flush_touches()
+        except Exception as e:
+            logger.warning(f"Embedding disk cache recency update failed: {e}")
+        self._disk.close()
+        self._disk = None
@@ -0,0 +1,141 @@
+"""
+Coalescing Embedding Adapter
+
+EmbeddingPort decorator that turns concurrent generate_embedding() calls into
+batched provider requests:
+  - Requests arriving within a short window (or until max_batch distinct texts)
+    are flushed together through the provider's generate_embeddings()
+  - Identical texts in a window share one slot in the batch
+  - A cancelled caller simply drops out; a text is only sent while someone waits for it
+  - Each request has a deadline; on expiry the caller gets the zero-vector fallback
+  - Requests vs provider calls are reported under "embeddings" on /health and /metrics
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from src.observability.embedding_metrics import get_coalescing_stats
+from src.ports.embedding_port import EmbeddingPort
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class CoalescingEmbeddingAdapter(EmbeddingPort):
+    """Micro-batches single-text embedding requests."""
+
+    def __init__(
+        self,
+        provider: EmbeddingPort,
+        window_ms: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        request_timeout: Optional[float] = None,
+    ):
+        """
+        Initialize coalescing embedding adapter.
+
+        Args:
+            provider: Embedding provider whose generate_embeddings() receives the batches
+            window_ms: How long the first request of a batch waits for company.
+                       Defaults to settings.EMBEDDING_COALESCE_WINDOW_MS
+            max_batch: Distinct texts that trigger an immediate flush.
+                       Defaults to settings.EMBEDDING_COALESCE_MAX_BATCH
+            request_timeout: Default per-request deadline in seconds.
+                             Defaults to settings.EMBEDDING_REQUEST_TIMEOUT_SECONDS
+        """
+        self._provider = provider
+        self._window = (window_ms if window_ms is not None else settings.EMBEDDING_COALESCE_WINDOW_MS) / 1000
+        self._max_batch = max_batch or settings.EMBEDDING_COALESCE_MAX_BATCH
+        self._request_timeout = request_timeout or settings.EMBEDDING_REQUEST_TIMEOUT_SECONDS
+
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches: set[asyncio.Task] = set()
+        self._stats = get_coalescing_stats()
+
+    async def generate_embedding(self, text: str, timeout: Optional[float] = None) -> List[float]:
+        """
+        Queue ``text`` for the next batch and wait for its vector.
+
+        Args:
+            text: Input text to embed
+            timeout: Deadline in seconds for this request (default: request_timeout)
+
+        Returns:
+            The embedding vector, or a zero vector if it failed or missed its deadline
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(text, []).append(future)
+        self._stats.requests += 1
+
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+
+        try:
+            # Cancellation or timeout cancels the future, which takes it out of its batch
+            vector = await asyncio.wait_for(future, timeout or self._request_timeout)
+        except asyncio.TimeoutError:
+            self._stats.timeouts += 1
+            logger.warning(f"Embedding request timed out after {timeout or self._request_timeout}s.")
+            vector = None
+        except Exception as e:
+            logger.error(f"Batched embedding request failed: {e}")
+            vector = None
+
+        if vector is None:
+            return [0.0] * self._provider.get_embedding_dimension()
+        return vector
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+
+        # Skip texts every caller has given up on
+        live = {text: futures for text, futures in batch.items() if any(not f.done() for f in futures)}
+        if not live:
+            return
+        task = asyncio.create_task(self._run_batch(live))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: Dict[str, List[asyncio.Future]]) -> None:
+        texts = list(batch)
+        self._stats.provider_calls += 1
+        self._stats.texts_sent += len(texts)
+        try:
+            vectors = await self._provider.generate_embeddings(texts)
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for text, vector in zip(texts, vectors):
+            for future in batch[text]:
+                if not future.done():
+                    future.set_result(vector)
+        logger.debug(
+            f"Embedded batch of {len(texts)} texts for "
+            f"{sum(len(futures) for futures in batch.values())} requests."
+        )
+
+    async def generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Already batched; passed straight to the provider."""
+        self._stats.provider_calls += 1
+        self._stats.texts_sent += len(texts)
+        return await self._provider.generate_embeddings(texts)
+
+    def get_model_name(self) -> str:
+        """Get the current embedding model name"""
+        return self._provider.get_model_name()
+
+    def get_embedding_dimension(self) -> int:
+        """Get the dimension of the embedding vector"""
+        return self._provider.get_embedding_dimension()
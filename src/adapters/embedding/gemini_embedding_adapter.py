@@ -3,19 +3,41 @@ Gemini Embedding Adapter
 
 Implements EmbeddingPort using Google Gemini embedding models.
 Supports both gemini-embedding-001 and text-embedding-004 models.
+Batch requests are chunked to the API's per-request limit and sent concurrently;
+rate-limited and server-failed chunks are retried whole with exponential backoff.
 """
 
+import asyncio
 import logging
-from typing import List
+import random
+from typing import List, Optional
 
+import httpx
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
 from src.ports.embedding_port import EmbeddingPort
 from src.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# embed_content accepts at most this many contents per request
+MAX_BATCH_SIZE = 100
+
+# Statuses where the same request can succeed later
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+
+def _is_invalid_input(error: Exception) -> bool:
+    # 400 INVALID_ARGUMENT: some content in the request was rejected
+    return isinstance(error, errors.ClientError) and error.code == 400
+
 
 class GeminiEmbeddingAdapter(EmbeddingPort):
     """Gemini embedding adapter implementing EmbeddingPort"""
@@ -24,6 +46,10 @@ class GeminiEmbeddingAdapter(EmbeddingPort):
         self,
         model_name: str = "gemini-embedding-001",
         output_dimensionality: int = 768,
+        batch_size: Optional[int] = None,
+        batch_concurrency: Optional[int] = None,
+        retry_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
     ):
         """
         Initialize Gemini embedding adapter.
@@ -31,9 +57,23 @@ class GeminiEmbeddingAdapter(EmbeddingPort):
         Args:
             model_name: Gemini embedding model to use
             output_dimensionality: Dimension of output embedding vector
+            batch_size: Texts per embed_content request (capped at MAX_BATCH_SIZE).
+                        Defaults to settings.EMBEDDING_BATCH_SIZE
+            batch_concurrency: Max requests in flight for one generate_embeddings() call.
+                               Defaults to settings.EMBEDDING_BATCH_CONCURRENCY
+            retry_attempts: Tries per batch request on 429/5xx/network errors.
+                            Defaults to settings.EMBEDDING_RETRY_ATTEMPTS
+            retry_base_seconds: First backoff delay, doubled on each retry.
+                                Defaults to settings.EMBEDDING_RETRY_BASE_SECONDS
         """
         self._model_name = model_name
         self._output_dimensionality = output_dimensionality
+        self._batch_size = min(batch_size or settings.EMBEDDING_BATCH_SIZE, MAX_BATCH_SIZE)
+        self._batch_concurrency = batch_concurrency or settings.EMBEDDING_BATCH_CONCURRENCY
+        self._retry_attempts = max(1, retry_attempts or settings.EMBEDDING_RETRY_ATTEMPTS)
+        self._retry_base_seconds = (
+            settings.EMBEDDING_RETRY_BASE_SECONDS if retry_base_seconds is None else retry_base_seconds
+        )
         self._client = genai.Client(api_key=settings.GEMINI_API_KEY)
 
     async def generate_embedding(self, text: str) -> List[float]:
@@ -65,6 +105,94 @@ class GeminiEmbeddingAdapter(EmbeddingPort):
             )
             return [0.0] * self._output_dimensionality
 
+    async def generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed many texts with as few embed_content requests as possible.
+
+        Texts are split into chunks of batch_size sent batch_concurrency at a time.
+        Rate limits and server errors are retried on the whole chunk with exponential
+        backoff. Only when the API rejects a chunk's input is it split and its texts
+        sent one by one, so a single bad input only fails itself. Empty texts are not sent.
+
+        Args:
+            texts: Input texts to embed
+
+        Returns:
+            Vectors in input order, with None for texts that failed
+        """
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        positions = [i for i, text in enumerate(texts) if text and text.strip()]
+        chunks = [
+            positions[start:start + self._batch_size]
+            for start in range(0, len(positions), self._batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self._batch_concurrency)
+
+        async def embed_chunk(chunk: List[int]) -> None:
+            async with semaphore:
+                try:
+                    vectors = await self._embed_with_retry([texts[i] for i in chunk])
+                except Exception as e:
+                    if not _is_invalid_input(e) or len(chunk) == 1:
+                        logger.error(
+                            f"Embedding of {len(chunk)} texts failed for model '{self._model_name}': {e}"
+                        )
+                        return
+                    logger.warning(
+                        f"Batch embedding of {len(chunk)} texts was rejected, retrying individually: {e}"
+                    )
+                    vectors = None
+
+            if vectors is not None:
+                for i, vector in zip(chunk, vectors):
+                    results[i] = vector
+                return
+
+            async def embed_one(i: int) -> None:
+                async with semaphore:
+                    try:
+                        results[i] = (await self._embed_with_retry([texts[i]]))[0]
+                    except Exception as e:
+                        logger.error(f"Embedding generation failed for model '{self._model_name}': {e}")
+
+            await asyncio.gather(*(embed_one(i) for i in chunk))
+
+        await asyncio.gather(*(embed_chunk(chunk) for chunk in chunks))
+
+        failed = len(texts) - sum(vector is not None for vector in results)
+        if failed:
+            logger.warning(f"{failed} of {len(texts)} texts could not be embedded.")
+        return results
+
+    async def _embed_with_retry(self, contents: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                return await self._embed_contents(contents)
+            except Exception as e:
+                attempt += 1
+                if not _is_retryable(e) or attempt >= self._retry_attempts:
+                    raise
+                # Jitter keeps concurrent chunks from retrying in lockstep
+                delay = self._retry_base_seconds * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+                logger.warning(
+                    f"Embedding request for {len(contents)} texts failed ({e}), "
+                    f"retry {attempt} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def _embed_contents(self, contents: List[str]) -> List[List[float]]:
+        result = await self._client.aio.models.embed_content(
+            model=self._model_name,
+            contents=contents,
+            config=types.EmbedContentConfig(
+                output_dimensionality=self._output_dimensionality,
+            ),
+        )
+        if len(result.embeddings) != len(contents):
+            raise ValueError(f"Expected {len(contents)} embeddings, got {len(result.embeddings)}")
+        return [embedding.values for embedding in result.embeddings]
+
     def get_model_name(self) -> str:
         """Get the current embedding model name"""
         return self._model_name
@@ -0,0 +1,128 @@
+"""
+Local Embedding Adapter
+
+Implements EmbeddingPort entirely on CPU with no network or model download,
+for air-gapped and test deployments:
+  - Features: character n-grams of the normalized text (with word-boundary
+    markers) plus whole words, weighted by 1 + log(count)
+  - Signed feature hashing projects them straight to the configured dimension
+  - Vectors are L2-normalized, so cosine similarity reflects shared spelling
+    ("tomato" ~ "tomatoes"), not meaning ("milk" !~ "dairy")
+  - Batches are vectorized with NumPy and split across a thread pool
+
+Vectors live in a different space from any remote model's, so switching to or
+from this provider requires re-embedding stored items.
+"""
+
+import asyncio
+import hashlib
+import math
+import unicodedata
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.ports.embedding_port import EmbeddingPort
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MODEL_NAME = "local-hashed-ngrams-v2"
+
+# Texts handed to one worker per executor hop
+_CHUNK_SIZE = 256
+
+
+class LocalEmbeddingAdapter(EmbeddingPort):
+    """Hashed character n-gram embeddings computed in-process."""
+
+    def __init__(
+        self,
+        output_dimensionality: Optional[int] = None,
+        ngram_range: Tuple[int, int] = (2, 4),
+        workers: Optional[int] = None,
+    ):
+        """
+        Initialize local embedding adapter.
+
+        Args:
+            output_dimensionality: Dimension of output embedding vector.
+                                   Defaults to settings.EMBEDDING_DIMENSION
+            ngram_range: Smallest and largest character n-gram length
+            workers: Threads used for batches. Defaults to settings.LOCAL_EMBEDDING_WORKERS
+        """
+        self._dimension = output_dimensionality or settings.EMBEDDING_DIMENSION
+        self._ngram_range = ngram_range
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or settings.LOCAL_EMBEDDING_WORKERS,
+            thread_name_prefix="local-embedding",
+        )
+
+    def _features(self, text: str) -> Counter:
+        normalized = " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+        features: Counter = Counter()
+        low, high = self._ngram_range
+        for word in normalized.split():
+            features[f"w:{word}"] += 1
+            padded = f"<{word}>"
+            for n in range(low, high + 1):
+                for start in range(len(padded) - n + 1):
+                    features[padded[start:start + n]] += 1
+        return features
+
+    def _embed_chunk(self, texts: List[str]) -> np.ndarray:
+        rows, columns, values = [], [], []
+        for row, text in enumerate(texts):
+            for feature, count in self._features(text).items():
+                # Bucket and sign come from disjoint bytes of one digest, so they are
+                # independent and colliding features cancel out on average
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                rows.append(row)
+                columns.append(int.from_bytes(digest[:4], "little") % self._dimension)
+                sign = 1.0 if digest[4] & 1 else -1.0
+                values.append(sign * (1.0 + math.log(count)))
+
+        matrix = np.zeros((len(texts), self._dimension), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(columns, dtype=np.intp)), values)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        """
+        Embed a single text.
+
+        Returns a zero vector for text without any characters to hash.
+        """
+        loop = asyncio.get_running_loop()
+        matrix = await loop.run_in_executor(self._executor, self._embed_chunk, [text])
+        return matrix[0].tolist()
+
+    async def generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed many texts, split across the thread pool.
+
+        Returns:
+            Vectors in input order, with None for blank texts
+        """
+        loop = asyncio.get_running_loop()
+        chunks = [texts[start:start + _CHUNK_SIZE] for start in range(0, len(texts), _CHUNK_SIZE)]
+        matrices = await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self._embed_chunk, chunk) for chunk in chunks)
+        )
+        results: List[Optional[List[float]]] = []
+        for matrix in matrices:
+            for vector in matrix:
+                results.append(vector.tolist() if vector.any() else None)
+        return results
+
+    def get_model_name(self) -> str:
+        """Get the current embedding model name"""
+        return MODEL_NAME
+
+    def get_embedding_dimension(self) -> int:
+        """Get the dimension of the embedding vector"""
+        return self._dimension
@@ -0,0 +1,156 @@
+"""
+Turn-Scoped Embedding Adapter
+
+EmbeddingPort decorator that embeds any text at most once per conversation turn:
+  - A turn is opened with embedding_turn() around the request handler; its
+    vectors live in a contextvar, so memory, the analyst and the database
+    adapter share them without passing anything around
+  - Tasks spawned inside the turn see the same vectors (contextvars are copied
+    by reference into child tasks)
+  - Concurrent requests for the same text within a turn share one provider call
+  - turn_embedding() hands a vector already computed this turn to work that
+    runs after the turn (e.g. queued memory writes) without re-embedding
+  - Outside a turn, calls pass straight through to the wrapped provider
+"""
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from src.adapters.embedding.cached_embedding_adapter import normalize_text
+from src.observability.cache_metrics import register_cache
+from src.ports.embedding_port import EmbeddingPort
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_turn_embeddings: ContextVar[Optional[Dict[str, asyncio.Future]]] = ContextVar("turn_embeddings", default=None)
+
+
+@contextmanager
+def embedding_turn() -> Iterator[None]:
+    """Share embeddings across everything running in this turn (nested turns reuse the outer one)."""
+    if _turn_embeddings.get() is not None:
+        yield
+        return
+    token = _turn_embeddings.set({})
+    try:
+        yield
+    finally:
+        _turn_embeddings.reset(token)
+
+
+def turn_embedding(text: str) -> Optional[List[float]]:
+    """The vector computed for ``text`` earlier in this turn, or None (never calls a provider)."""
+    turn = _turn_embeddings.get()
+    pending = turn.get(normalize_text(text)) if turn is not None else None
+    if pending is None or not pending.done() or pending.cancelled() or pending.exception() is not None:
+        return None
+    return pending.result()
+
+
+class TurnScopedEmbeddingAdapter(EmbeddingPort):
+    """Reuses embeddings computed earlier in the current turn."""
+
+    def __init__(self, provider: EmbeddingPort):
+        """
+        Initialize turn-scoped embedding adapter.
+
+        Args:
+            provider: Embedding provider to call for texts not yet embedded this turn
+        """
+        self._provider = provider
+        self._stats = register_cache("turn_embeddings")
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        """Embed ``text``, or return the vector already computed for it this turn."""
+        turn = _turn_embeddings.get()
+        if turn is None:
+            return await self._provider.generate_embedding(text)
+
+        key = normalize_text(text)
+        pending = turn.get(key)
+        if pending is not None:
+            try:
+                vector = await asyncio.shield(pending)
+                self._stats.hit("turn")
+                return vector
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # This caller was cancelled
+            except Exception:
+                pass  # The earlier attempt failed; try again below
+
+        self._stats.miss()
+        future = asyncio.get_running_loop().create_future()
+        turn[key] = future
+        try:
+            vector = await self._provider.generate_embedding(text)
+        except asyncio.CancelledError:
+            future.cancel()
+            self._forget(turn, key, future)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so a failure nobody joined isn't logged
+            self._forget(turn, key, future)
+            raise
+
+        future.set_result(vector)
+        if not any(vector):
+            self._forget(turn, key, future)  # Failed embedding; let a later call retry
+        return vector
+
+    async def generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Batch variant: texts embedded earlier this turn are reused, the rest go out in one call."""
+        turn = _turn_embeddings.get()
+        if turn is None:
+            return await self._provider.generate_embeddings(texts)
+
+        keys = [normalize_text(text) for text in texts]
+        vectors: Dict[str, Optional[List[float]]] = {}
+        for key in dict.fromkeys(keys):
+            pending = turn.get(key)
+            if pending is None:
+                continue
+            try:
+                vectors[key] = await asyncio.shield(pending)
+                self._stats.hit("turn")
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+            except Exception:
+                pass  # Failed earlier this turn; embedded again below
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing:
+            first_text = {}
+            for key, text in zip(keys, texts):
+                first_text.setdefault(key, text)
+            for _ in missing:
+                self._stats.miss()
+
+            embedded = await self._provider.generate_embeddings([first_text[key] for key in missing])
+            loop = asyncio.get_running_loop()
+            for key, vector in zip(missing, embedded):
+                vectors[key] = vector
+                if vector is not None and any(vector):
+                    future = loop.create_future()
+                    future.set_result(vector)
+                    turn[key] = future
+
+        return [vectors[key] for key in keys]
+
+    @staticmethod
+    def _forget(turn: Dict[str, asyncio.Future], key: str, future: asyncio.Future) -> None:
+        if turn.get(key) is future:
+            del turn[key]
+
+    def get_model_name(self) -> str:
+        """Get the current embedding model name"""
+        return self._provider.get_model_name()
+
+    def get_embedding_dimension(self) -> int:
+        """Get the dimension of the embedding vector"""
+        return self._provider.get_embedding_dimension()
@@ -0,0 +1,337 @@
+"""
+Cached Short-Term Memory Adapter
+
+ShortTermMemoryPort decorator keeping each active session's recent messages
+in process:
+  - One ring buffer (deque of MemoryRecord, SHORT_TERM_MEMORY_LIMIT long) per
+    session, LRU over sessions; a session unused for the TTL is dropped
+  - Populated by the first read of a session, appended to on every write
+    (write-through: the wrapped store is written first), so a burst of
+    messages from one user reads the database once
+  - Records older than the TTL are filtered out on read, as the database does
+  - Other workers' writes are picked up through an optional invalidation
+    channel (Postgres LISTEN/NOTIFY); without one, run a single worker. While
+    the channel is not receiving (disconnected, or its URL cannot LISTEN),
+    reads bypass the cache instead of serving what may be stale
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable
+from urllib.parse import urlparse
+
+import asyncpg
+
+from src.domain.models import MemoryRecord, SessionSummary
+from src.observability.cache_metrics import register_cache
+from src.observability.pool_metrics import InstrumentedPool, create_instrumented_pool, unregister_pool
+from src.ports.memory_port import ShortTermMemoryPort
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Called with the session ids another worker wrote to, or None to drop everything
+InvalidationCallback = Callable[[list[str] | None], None]
+
+# NOTIFY payloads must stay under 8000 bytes
+_MAX_NOTIFY_SESSIONS = 50
+
+
+def _is_transaction_pooler(url: str) -> bool:
+    """Transaction-mode poolers (PgBouncer, Supavisor on 6543) cannot hold a LISTEN."""
+    parsed = urlparse(url)
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    return port == 6543 or "pgbouncer=true" in parsed.query.lower()
+
+
+class PostgresSessionInvalidation:
+    """Broadcasts written session ids to other workers over LISTEN/NOTIFY."""
+
+    def __init__(
+        self,
+        database_url: str | None = None,
+        listen_url: str | None = None,
+        channel: str | None = None,
+        reconnect_seconds: float = 5.0,
+    ) -> None:
+        """
+        Initialize session invalidation channel.
+
+        Args:
+            database_url: Postgres DSN notifications are published through (a pooler is fine).
+                          Defaults to settings.DATABASE_URL
+            listen_url: Direct or session-mode Postgres DSN to LISTEN on; a transaction
+                        pooler URL is rejected. Defaults to settings.SHORT_TERM_CACHE_LISTEN_URL,
+                        then database_url
+            channel: Notification channel. Defaults to settings.SHORT_TERM_CACHE_CHANNEL
+            reconnect_seconds: Pause before re-listening after the connection drops
+        """
+        self._database_url = database_url or settings.DATABASE_URL
+        self._listen_url = listen_url or settings.SHORT_TERM_CACHE_LISTEN_URL or self._database_url
+        if self._listen_url and _is_transaction_pooler(self._listen_url):
+            raise ValueError(
+                "SHORT_TERM_CACHE_INVALIDATION=postgres needs a direct or session-mode connection "
+                "to LISTEN on, but the URL points at a transaction pooler. Set "
+                "SHORT_TERM_CACHE_LISTEN_URL to a direct connection string, or use "
+                "SHORT_TERM_CACHE_INVALIDATION=none with a single worker."
+            )
+        self._channel = channel or settings.SHORT_TERM_CACHE_CHANNEL
+        self._reconnect_seconds = reconnect_seconds
+        self._origin = uuid.uuid4().hex
+        self._connection: asyncpg.Connection | None = None
+        self._publisher: InstrumentedPool | None = None
+        self._publisher_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._probes: dict[str, asyncio.Event] = {}
+        self._listening = False
+
+    @property
+    def listening(self) -> bool:
+        """Whether other workers' writes are currently being received."""
+        return self._listening
+
+    def start(self, on_invalidate: InvalidationCallback) -> None:
+        """Listen in the background (no-op while already listening)."""
+        if self._listen_url and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._listen(on_invalidate), context=contextvars.Context())
+
+    async def _listen(self, on_invalidate: InvalidationCallback) -> None:
+        def handle(_connection, _pid, _channel, payload: str) -> None:
+            try:
+                message = json.loads(payload)
+            except ValueError:
+                return
+            probe = self._probes.get(message.get("probe") or "")
+            if probe is not None:
+                probe.set()
+            elif message.get("origin") != self._origin:
+                on_invalidate(message.get("sessions") or [])
+
+        while True:
+            lost = asyncio.Event()
+            try:
+                self._connection = await asyncpg.connect(self._listen_url)
+                self._connection.add_termination_listener(lambda _connection: lost.set())
+                await self._connection.add_listener(self._channel, handle)
+                if not await self._probe():
+                    logger.error(
+                        f"LISTEN on '{self._channel}' receives no notifications (is the listen URL behind "
+                        "a transaction pooler?). The short-term memory cache is bypassed; set "
+                        "SHORT_TERM_CACHE_LISTEN_URL to a direct connection."
+                    )
+                    return
+                self._listening = True
+                logger.info(f"Listening for short-term memory invalidations on '{self._channel}'")
+                await lost.wait()
+                logger.warning("Short-term memory invalidation listener disconnected.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Short-term memory invalidation listener failed: {e}")
+            finally:
+                self._listening = False
+                if self._connection is not None and not self._connection.is_closed():
+                    await self._connection.close()
+                self._connection = None
+            # Notifications may have been missed while disconnected
+            on_invalidate(None)
+            await asyncio.sleep(self._reconnect_seconds)
+
+    async def _probe(self, timeout: float = 5.0) -> bool:
+        """Send a notification through the publish path and wait for the listener to receive it."""
+        token = uuid.uuid4().hex
+        received = self._probes[token] = asyncio.Event()
+        try:
+            await self._notify(json.dumps({"origin": self._origin, "probe": token}))
+            await asyncio.wait_for(received.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            del self._probes[token]
+
+    async def _notify(self, payload: str) -> None:
+        # Published from a pooled connection: the listener's connection is busy
+        # delivering notifications and must not be shared with request tasks
+        if self._publisher is None:
+            async with self._publisher_lock:
+                if self._publisher is None:
+                    self._publisher = await create_instrumented_pool(
+                        self._database_url,
+                        name="short_term_invalidation",
+                        min_size=1,
+                        max_size=2,
+                        statement_cache_size=0,
+                    )
+        async with self._publisher.acquire("publish_invalidation") as conn:
+            await conn.execute("SELECT pg_notify($1, $2)", self._channel, payload)
+
+    async def publish(self, session_ids: Iterable[str]) -> None:
+        """Tell other workers these sessions were written to."""
+        sessions = list(dict.fromkeys(session_ids))
+        for start in range(0, len(sessions), _MAX_NOTIFY_SESSIONS):
+            await self._notify(
+                json.dumps({"origin": self._origin, "sessions": sessions[start:start + _MAX_NOTIFY_SESSIONS]})
+            )
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._publisher is not None:
+            await self._publisher.close()
+            unregister_pool(self._publisher.name)
+            self._publisher = None
+
+
+class _SessionBuffer:
+    __slots__ = ("records", "expires_at")
+
+    def __init__(self, records: Iterable[MemoryRecord], capacity: int, expires_at: float) -> None:
+        self.records: deque[MemoryRecord] = deque(records, maxlen=capacity)
+        self.expires_at = expires_at
+
+
+class CachedShortTermMemory(ShortTermMemoryPort):
+    """Per-session ring buffers in front of a short-term memory store."""
+
+    def __init__(
+        self,
+        memory: ShortTermMemoryPort,
+        capacity: int | None = None,
+        max_sessions: int | None = None,
+        ttl_hours: int | None = None,
+        invalidation: PostgresSessionInvalidation | None = None,
+    ) -> None:
+        """
+        Initialize cached short-term memory.
+
+        Args:
+            memory: Store that owns the messages
+            capacity: Messages kept per session. Defaults to settings.SHORT_TERM_MEMORY_LIMIT;
+                      reads asking for more go to the store
+            max_sessions: Sessions kept before the least recently used is dropped.
+                          Defaults to settings.SHORT_TERM_CACHE_MAX_SESSIONS
+            ttl_hours: Message TTL and idle session lifetime. Defaults to settings.SHORT_TERM_MEMORY_TTL_HOURS
+            invalidation: Channel announcing writes made by other workers
+        """
+        self._memory = memory
+        self._capacity = capacity or settings.SHORT_TERM_MEMORY_LIMIT
+        self._max_sessions = max_sessions or settings.SHORT_TERM_CACHE_MAX_SESSIONS
+        self._ttl = timedelta(hours=ttl_hours or settings.SHORT_TERM_MEMORY_TTL_HOURS)
+        self._invalidation = invalidation
+        self._sessions: OrderedDict[str, _SessionBuffer] = OrderedDict()
+        # Reads in flight per session; a write or invalidation clears the token so
+        # a read that started before it does not cache what it fetched
+        self._loading: dict[str, object] = {}
+        self._stats = register_cache("short_term_sessions")
+
+    async def initialize(self) -> None:
+        await self._memory.initialize()
+        if self._invalidation is not None:
+            self._invalidation.start(self._invalidate)
+
+    async def add_message(self, record: MemoryRecord) -> None:
+        await self.add_messages([record])
+
+    async def add_messages(self, records: list[MemoryRecord]) -> None:
+        if not records:
+            return
+        await self._memory.add_messages(records)
+
+        expires_at = time.monotonic() + self._ttl.total_seconds()
+        for record in records:
+            self._loading.pop(record.session_id, None)
+            buffer = self._sessions.get(record.session_id)
+            if buffer is not None:
+                buffer.records.append(record)
+                buffer.expires_at = expires_at
+
+        if self._invalidation is not None:
+            try:
+                await self._invalidation.publish(record.session_id for record in records)
+            except Exception as e:
+                logger.warning(f"Failed to publish short-term memory invalidation: {e}")
+
+    async def get_recent_messages(
+        self,
+        session_id: str,
+        *,
+        limit: int,
+    ) -> list[MemoryRecord]:
+        if limit > self._capacity or (self._invalidation is not None and not self._invalidation.listening):
+            return await self._memory.get_recent_messages(session_id, limit=limit)
+
+        buffer = self._sessions.get(session_id)
+        if buffer is not None and buffer.expires_at > time.monotonic():
+            self._sessions.move_to_end(session_id)
+            self._stats.hit("memory")
+            cutoff = datetime.now(timezone.utc) - self._ttl
+            fresh = [record for record in buffer.records if record.created_at >= cutoff]
+            return fresh[-limit:] if limit > 0 else []
+
+        self._stats.miss()
+        token = object()
+        self._loading[session_id] = token
+        try:
+            records = await self._memory.get_recent_messages(session_id, limit=self._capacity)
+        finally:
+            current = self._loading.get(session_id)
+            if current is token:
+                del self._loading[session_id]
+
+        if current is token:
+            self._store(session_id, records)
+        return records[-limit:] if limit > 0 else []
+
+    async def get_summary(self, session_id: str) -> SessionSummary | None:
+        return await self._memory.get_summary(session_id)
+
+    async def save_summary(self, summary: SessionSummary) -> None:
+        await self._memory.save_summary(summary)
+
+    def _store(self, session_id: str, records: list[MemoryRecord]) -> None:
+        self._sessions[session_id] = _SessionBuffer(
+            records,
+            self._capacity,
+            time.monotonic() + self._ttl.total_seconds(),
+        )
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self._max_sessions:
+            self._sessions.popitem(last=False)
+            self._stats.evicted("memory")
+        self._stats.set_entries("memory", len(self._sessions))
+
+    def _invalidate(self, session_ids: list[str] | None) -> None:
+        if session_ids is None:
+            self._stats.evicted("invalidated", len(self._sessions))
+            self._sessions.clear()
+            self._loading.clear()
+        else:
+            for session_id in session_ids:
+                self._loading.pop(session_id, None)
+                if self._sessions.pop(session_id, None) is not None:
+                    self._stats.evicted("invalidated")
+        self._stats.set_entries("memory", len(self._sessions))
+
+    async def close(self) -> None:
+        if self._invalidation is not None:
+            await self._invalidation.close()
+        self._sessions.clear()
+        self._loading.clear()
+        await self._memory.close()
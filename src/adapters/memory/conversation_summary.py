@@ -0,0 +1,210 @@
+"""
+Rolling Conversation Summary
+
+Keeps prompt history constant-size as sessions grow:
+  - The prompt gets the session's summary plus the raw messages newer than
+    it (keep_messages to keep_messages + fold_messages of them)
+  - Once fold_messages messages older than the newest keep_messages are not
+    yet in the summary, they are folded into it with one LLM call that
+    rewrites the previous summary; this runs in the background after the
+    turn is written, never while a reply is being built
+  - Summaries are stored through the short-term memory port and cached in
+    process (LRU, short TTL so folds made by other workers show up)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict
+
+from src.domain.models import ChatRequest, MemoryRecord, Message, SessionSummary
+from src.observability.cache_metrics import register_cache
+from src.observability.memory_metrics import record_summary_fold
+from src.ports.llm_port import LLMPort
+from src.ports.memory_port import ShortTermMemoryPort
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SUMMARY_PROMPT = (
+    "You maintain the running summary of a chat between a user and a personal finance assistant. "
+    "Rewrite the current summary so it also covers the new messages. Keep concrete facts the "
+    "conversation may come back to (items, stores, amounts, dates, user preferences, open "
+    "questions); collapse long listings such as saved receipts into totals and notable items. "
+    "Reply with the summary only, in at most {max_chars} characters."
+)
+
+# Long messages (e.g. saved-receipt listings) are clipped before summarizing
+_MAX_MESSAGE_CHARS = 2000
+
+
+class ConversationSummarizer:
+    """Folds a session's older messages into a cached rolling summary."""
+
+    def __init__(
+        self,
+        short_term_memory: ShortTermMemoryPort,
+        llm_provider: LLMPort,
+        *,
+        keep_messages: int | None = None,
+        fold_messages: int | None = None,
+        max_chars: int | None = None,
+        max_sessions: int | None = None,
+        cache_ttl_seconds: float | None = None,
+    ) -> None:
+        """
+        Initialize conversation summarizer.
+
+        Args:
+            short_term_memory: Store holding the messages and their summaries
+            llm_provider: Writes the summaries
+            keep_messages: Newest messages always sent raw. Defaults to settings.SHORT_TERM_SUMMARY_KEEP_MESSAGES
+            fold_messages: Older messages folded per LLM call. Defaults to settings.SHORT_TERM_SUMMARY_FOLD_MESSAGES
+            max_chars: Summary length cap. Defaults to settings.SHORT_TERM_SUMMARY_MAX_CHARS
+            max_sessions: Summaries cached before the least recently used is dropped.
+                          Defaults to settings.SHORT_TERM_CACHE_MAX_SESSIONS
+            cache_ttl_seconds: How long a cached summary is trusted.
+                               Defaults to settings.SHORT_TERM_SUMMARY_CACHE_SECONDS
+        """
+        self._short_term_memory = short_term_memory
+        self._llm_provider = llm_provider
+        self._keep = keep_messages or settings.SHORT_TERM_SUMMARY_KEEP_MESSAGES
+        self._fold = fold_messages or settings.SHORT_TERM_SUMMARY_FOLD_MESSAGES
+        self._max_chars = max_chars or settings.SHORT_TERM_SUMMARY_MAX_CHARS
+        self._max_sessions = max_sessions or settings.SHORT_TERM_CACHE_MAX_SESSIONS
+        self._ttl = (
+            settings.SHORT_TERM_SUMMARY_CACHE_SECONDS if cache_ttl_seconds is None else cache_ttl_seconds
+        )
+        # Session -> (summary or None, expires_at); None is cached too so short sessions read once
+        self._summaries: OrderedDict[str, tuple[SessionSummary | None, float]] = OrderedDict()
+        self._folding: dict[str, asyncio.Task] = {}
+        # Sessions written to while their fold was running; folded again afterwards
+        self._dirty: set[str] = set()
+        self._stats = register_cache("session_summaries")
+
+    async def context(self, session_id: str) -> tuple[SessionSummary | None, list[MemoryRecord]]:
+        """The session's summary and the raw messages it does not cover yet, oldest first."""
+        summary, records = await asyncio.gather(
+            self._cached_summary(session_id),
+            self._short_term_memory.get_recent_messages(session_id, limit=self._keep + self._fold),
+        )
+        if summary is not None:
+            records = [record for record in records if record.created_at > summary.covered_until]
+        return summary, records
+
+    async def _cached_summary(self, session_id: str) -> SessionSummary | None:
+        cached = self._summaries.get(session_id)
+        if cached is not None and cached[1] > time.monotonic():
+            self._summaries.move_to_end(session_id)
+            self._stats.hit("memory")
+            return cached[0]
+
+        self._stats.miss()
+        summary = await self._short_term_memory.get_summary(session_id)
+        self._remember(session_id, summary)
+        return summary
+
+    def _remember(self, session_id: str, summary: SessionSummary | None) -> None:
+        self._summaries[session_id] = (summary, time.monotonic() + self._ttl)
+        self._summaries.move_to_end(session_id)
+        while len(self._summaries) > self._max_sessions:
+            self._summaries.popitem(last=False)
+            self._stats.evicted("memory")
+        self._stats.set_entries("memory", len(self._summaries))
+
+    def schedule(self, session_ids: set[str]) -> None:
+        """Fold the sessions in the background if they have enough unsummarized messages."""
+        for session_id in session_ids:
+            if session_id in self._folding:
+                self._dirty.add(session_id)
+                continue
+            # Fresh context: the fold must not keep the turn's state (e.g. shared embeddings) alive
+            task = asyncio.create_task(self._fold_loop(session_id), context=contextvars.Context())
+            self._folding[session_id] = task
+
+    async def _fold_loop(self, session_id: str) -> None:
+        try:
+            while True:
+                self._dirty.discard(session_id)
+                try:
+                    await self.fold(session_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Conversation summary for session {session_id} failed, keeping raw history: {e}")
+                if session_id not in self._dirty:
+                    return
+        finally:
+            self._folding.pop(session_id, None)
+            self._dirty.discard(session_id)
+
+    async def fold(self, session_id: str) -> bool:
+        """
+        Fold the session's unsummarized older messages into its summary.
+
+        Returns:
+            Whether a new summary was written
+        """
+        # Build on the stored summary, which may be newer than the cached one
+        summary = await self._short_term_memory.get_summary(session_id)
+        # Two folds' worth of backlog; anything older is left out of the summary
+        records = await self._short_term_memory.get_recent_messages(
+            session_id,
+            limit=self._keep + 2 * self._fold,
+        )
+        older = records[: -self._keep] if len(records) > self._keep else []
+        if summary is not None:
+            older = [record for record in older if record.created_at > summary.covered_until]
+        if len(older) < self._fold:
+            self._remember(session_id, summary)
+            return False
+
+        started = time.perf_counter()
+        try:
+            content = await self._summarize(summary, older)
+        except Exception:
+            record_summary_fold(len(older), time.perf_counter() - started, "error")
+            raise
+        record_summary_fold(len(older), time.perf_counter() - started, "ok")
+
+        updated = SessionSummary(
+            session_id=session_id,
+            content=content[: self._max_chars],
+            covered_until=older[-1].created_at,
+        )
+        await self._short_term_memory.save_summary(updated)
+        self._remember(session_id, updated)
+        logger.debug(f"Folded {len(older)} messages into the summary of session {session_id}")
+        return True
+
+    async def _summarize(self, summary: SessionSummary | None, records: list[MemoryRecord]) -> str:
+        transcript = "\n".join(
+            f"{record.role}: {record.content[:_MAX_MESSAGE_CHARS]}" for record in records
+        )
+        request = ChatRequest(
+            messages=[
+                Message(role="system", content=SUMMARY_PROMPT.format(max_chars=self._max_chars)),
+                Message(
+                    role="user",
+                    content=f"Current summary:\n{summary.content if summary else '(none)'}\n\nNew messages:\n{transcript}",
+                ),
+            ],
+            model=self._llm_provider.get_model_name(),
+        )
+        # LLM adapters are synchronous; keep them off the event loop
+        response = await asyncio.to_thread(self._llm_provider.chat_completion, request)
+        content = (response.content or "").strip()
+        if not content:
+            raise ValueError("empty summary")
+        return content
+
+    async def close(self) -> None:
+        """Cancel folds in flight; the next turn of each session retries them."""
+        tasks = list(self._folding.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._summaries.clear()
@@ -0,0 +1,423 @@
+"""
+Local Long-Term Memory Adapter
+
+In-process LongTermMemoryPort for tests and single-process deployments:
+  - One L2-normalized float32 matrix row per memory plus payload columns;
+    user and session ids are interned to integer codes so filters are
+    vectorized masks over the matrix
+  - Search is one matmul over the rows passing the filter and an
+    argpartition top-k, in a worker thread for large stores
+  - Persistence: a snapshot (memory-mapped .npy matrix + JSON payload) and an
+    append-only JSON-lines log of every change since. Each change is appended
+    (and optionally fsynced) before it is applied; on startup the log is
+    replayed over the snapshot, ignoring a torn last line, and it is folded
+    into a new snapshot once it grows past compact_every entries. Renaming
+    the payload (which names its matrix file) commits a snapshot, so a crash
+    at any point leaves either the old or the new one
+  - The directory belongs to one process: an exclusive lock on LOCK_FILE is
+    held from initialize() to close(), and a second process fails to start
+    instead of replaying and truncating a log it does not own
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.domain.models import MemoryDocument, MemorySearchResult
+from src.ports.memory_port import LongTermMemoryPort
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MATRIX_FILE = "memories.{generation}.npy"
+PAYLOAD_FILE = "memories.json"
+LOG_FILE = "memories.log"
+LOCK_FILE = "memories.lock"
+
+# Stores with more rows are searched in a worker thread
+_INLINE_MAX_ROWS = 50000
+
+
+class LocalLongTermMemory(LongTermMemoryPort):
+    """Semantic memory kept in a NumPy matrix, persisted to local files."""
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        vector_size: int | None = None,
+        compact_every: int | None = None,
+        fsync: bool | None = None,
+    ) -> None:
+        """
+        Initialize local long-term memory.
+
+        Args:
+            directory: Where the snapshot and log live. Defaults to settings.LOCAL_MEMORY_DIR
+            vector_size: Embedding dimension. Defaults to settings.MEMORY_EMBEDDING_DIMENSION
+            compact_every: Log entries that trigger a new snapshot. Defaults to settings.LOCAL_MEMORY_COMPACT_EVERY
+            fsync: fsync the log after every change. Defaults to settings.LOCAL_MEMORY_FSYNC
+        """
+        self._directory = Path(directory or settings.LOCAL_MEMORY_DIR)
+        self._dimension = vector_size or settings.MEMORY_EMBEDDING_DIMENSION
+        self._compact_every = compact_every or settings.LOCAL_MEMORY_COMPACT_EVERY
+        self._fsync = settings.LOCAL_MEMORY_FSYNC if fsync is None else fsync
+
+        self._matrix = np.zeros((0, self._dimension), dtype=np.float32)
+        self._writable = True  # False while the matrix is the read-only mmap
+        self._size = 0
+        self._alive = np.zeros(0, dtype=bool)
+        self._user_codes = np.zeros(0, dtype=np.int32)
+        self._session_codes = np.zeros(0, dtype=np.int32)
+        self._ids: list[str] = []
+        self._contents: list[str] = []
+        self._metadata: list[dict[str, Any]] = []
+        self._rows: dict[str, int] = {}
+        self._codes: dict[str, int] = {}
+
+        self._generation = 0
+        self._log_entries = 0
+        self._lock = asyncio.Lock()
+        self._lock_file: Any = None
+        self._initialized = False
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    async def initialize(self) -> None:
+        if self._initialized:
+            return
+        async with self._lock:
+            if self._initialized:
+                return
+            await asyncio.to_thread(self._acquire_directory)
+            try:
+                await asyncio.to_thread(self._load)
+            except Exception:
+                self._release_directory()
+                raise
+            self._initialized = True
+            logger.info(f"Local long-term memory initialized with {int(self._alive[: self._size].sum())} memories")
+
+    def _acquire_directory(self) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self._directory / LOCK_FILE, "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(
+                f"Local long-term memory in {self._directory} is in use by another process; "
+                "the local backend supports a single app process (use Qdrant for several)"
+            ) from None
+        self._lock_file = lock_file
+
+    def _release_directory(self) -> None:
+        if self._lock_file is not None:
+            # Closing the file releases the flock
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _load(self) -> None:
+        payload_path = self._directory / PAYLOAD_FILE
+        if payload_path.exists():
+            payload = json.loads(payload_path.read_text())
+            self._generation = payload["generation"]
+            matrix = np.load(self._directory / MATRIX_FILE.format(generation=self._generation), mmap_mode="r")
+            if payload.get("dimension") != self._dimension or matrix.shape != (len(payload["ids"]), self._dimension):
+                raise RuntimeError(
+                    f"Local long-term memory in {self._directory} does not match "
+                    f"MEMORY_EMBEDDING_DIMENSION={self._dimension}"
+                )
+            self._matrix = matrix
+            self._writable = False
+            self._size = matrix.shape[0]
+            self._ids = payload["ids"]
+            self._contents = payload["contents"]
+            self._metadata = payload["metadata"]
+            self._rows = {memory_id: row for row, memory_id in enumerate(self._ids)}
+            self._alive = np.ones(self._size, dtype=bool)
+            self._user_codes = np.asarray([self._code(m.get("user_id")) for m in self._metadata], dtype=np.int32)
+            self._session_codes = np.asarray([self._code(m.get("session_id")) for m in self._metadata], dtype=np.int32)
+
+        log_path = self._directory / LOG_FILE
+        if log_path.exists():
+            with open(log_path, "rb+") as log:
+                valid = 0
+                for line in log:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated entry")
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Cut the torn entry off so later appends start on a clean line
+                        logger.warning("Dropping a torn entry at the end of the local memory log.")
+                        log.truncate(valid)
+                        break
+                    self._apply(entry)
+                    self._log_entries += 1
+                    valid += len(line)
+
+    def _append(self, entries: list[dict[str, Any]]) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        with open(self._directory / LOG_FILE, "a", encoding="utf-8") as log:
+            log.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            log.flush()
+            if self._fsync:
+                os.fsync(log.fileno())
+
+    def _snapshot(self, matrix: np.ndarray, payload: dict[str, Any]) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        generation = payload["generation"]
+        with open(self._directory / MATRIX_FILE.format(generation=generation), "wb") as f:
+            np.save(f, matrix)
+            f.flush()
+            os.fsync(f.fileno())
+        payload_tmp = self._directory / f"{PAYLOAD_FILE}.tmp"
+        with open(payload_tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(payload))
+            f.flush()
+            os.fsync(f.fileno())
+        # The commit point; before it the previous payload and matrix are still intact
+        os.replace(payload_tmp, self._directory / PAYLOAD_FILE)
+        # Truncated last: replaying the log over the new snapshot is idempotent
+        open(self._directory / LOG_FILE, "w").close()
+        previous = self._directory / MATRIX_FILE.format(generation=generation - 1)
+        if previous.exists():
+            previous.unlink()
+
+    async def _write(self, entries: list[dict[str, Any]]) -> None:
+        """Log ``entries``, apply them, and compact once the log is long enough."""
+        async with self._lock:
+            await asyncio.to_thread(self._append, entries)
+            for entry in entries:
+                self._apply(entry)
+            self._log_entries += len(entries)
+            if self._log_entries >= self._compact_every:
+                await self._compact()
+
+    async def _compact(self) -> None:
+        live = np.flatnonzero(self._alive[: self._size])
+        matrix = np.array(self._matrix[live])
+        payload = {
+            "generation": self._generation + 1,
+            "dimension": self._dimension,
+            "ids": [self._ids[row] for row in live],
+            "contents": [self._contents[row] for row in live],
+            "metadata": [self._metadata[row] for row in live],
+        }
+        await asyncio.to_thread(self._snapshot, matrix, payload)
+        self._generation += 1
+        self._log_entries = 0
+
+        # Drop tombstoned rows from memory too
+        if len(live) < self._size:
+            self._matrix = matrix
+            self._writable = True
+            self._size = len(live)
+            self._ids, self._contents, self._metadata = payload["ids"], payload["contents"], payload["metadata"]
+            self._rows = {memory_id: row for row, memory_id in enumerate(self._ids)}
+            self._alive = np.ones(self._size, dtype=bool)
+            self._user_codes = self._user_codes[live]
+            self._session_codes = self._session_codes[live]
+
+    # ── Updates ──────────────────────────────────────────────────────────────
+
+    def _code(self, value: str | None) -> int:
+        if value is None:
+            return -1
+        return self._codes.setdefault(str(value), len(self._codes))
+
+    def _ensure_capacity(self, extra: int) -> None:
+        needed = self._size + extra
+        if self._writable and needed <= self._matrix.shape[0]:
+            return
+        # Grow geometrically so appends stay amortized O(1); also detaches from the mmap
+        capacity = max(needed, 2 * self._matrix.shape[0], 1024)
+        grown = np.zeros((capacity, self._dimension), dtype=np.float32)
+        grown[: self._size] = self._matrix[: self._size]
+        self._matrix = grown
+        for name in ("_alive", "_user_codes", "_session_codes"):
+            column = getattr(self, name)
+            resized = np.zeros(capacity, dtype=column.dtype) if name == "_alive" else np.full(capacity, -1, dtype=column.dtype)
+            resized[: self._size] = column[: self._size]
+            setattr(self, name, resized)
+        self._writable = True
+
+    def _apply(self, entry: dict[str, Any]) -> None:
+        op = entry["op"]
+        if op == "upsert":
+            vector = np.asarray(entry["vector"], dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if vector.shape != (self._dimension,) or norm == 0:
+                return
+            self._ensure_capacity(1)
+            row = self._rows.get(entry["id"])
+            if row is None:
+                row = self._size
+                self._size += 1
+                self._rows[entry["id"]] = row
+                self._ids.append(entry["id"])
+                self._contents.append(entry["content"])
+                self._metadata.append(entry["metadata"])
+            else:
+                self._contents[row] = entry["content"]
+                self._metadata[row] = entry["metadata"]
+            self._matrix[row] = vector / norm
+            self._alive[row] = True
+            self._user_codes[row] = self._code(entry["metadata"].get("user_id"))
+            self._session_codes[row] = self._code(entry["metadata"].get("session_id"))
+        elif op == "delete":
+            for memory_id in entry["ids"]:
+                row = self._rows.pop(memory_id, None)
+                if row is not None:
+                    self._alive[row] = False
+        elif op == "touch":
+            for memory_id in entry["ids"]:
+                row = self._rows.get(memory_id)
+                if row is not None:
+                    self._metadata[row] = {**self._metadata[row], "last_retrieved_at": entry["at"]}
+
+    async def store_memory(
+        self,
+        *,
+        memory_id: str,
+        embedding: list[float],
+        content: str,
+        metadata: dict[str, Any],
+    ) -> None:
+        await self.store_memories(
+            [MemoryDocument(memory_id=memory_id, embedding=embedding, content=content, metadata=metadata)]
+        )
+
+    async def store_memories(self, memories: list[MemoryDocument]) -> None:
+        if not memories:
+            return
+        await self.initialize()
+        await self._write(
+            [
+                {
+                    "op": "upsert",
+                    "id": memory.memory_id,
+                    "vector": memory.embedding,
+                    "content": memory.content,
+                    "metadata": memory.metadata,
+                }
+                for memory in memories
+            ]
+        )
+
+    async def delete_memories(self, memory_ids: list[str], *, user_id: str | None = None) -> None:
+        if not memory_ids:
+            return
+        await self.initialize()
+        await self._write([{"op": "delete", "ids": list(memory_ids)}])
+
+    async def mark_retrieved(self, memory_ids: list[str], *, user_id: str | None = None) -> None:
+        if not memory_ids:
+            return
+        await self.initialize()
+        await self._write([{"op": "touch", "ids": list(memory_ids), "at": time.time()}])
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def _mask(self, user_id: str | None, session_id: str | None) -> np.ndarray:
+        mask = self._alive[: self._size].copy()
+        if user_id:
+            mask &= self._user_codes[: self._size] == self._codes.get(user_id, -2)
+        elif session_id:
+            mask &= self._session_codes[: self._size] == self._codes.get(session_id, -2)
+        return mask
+
+    @staticmethod
+    def _top_k(matrix: np.ndarray, rows: np.ndarray, query: np.ndarray, limit: int) -> tuple[np.ndarray, np.ndarray]:
+        scores = matrix[rows] @ query
+        k = min(limit, scores.shape[0])
+        if k < scores.shape[0]:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(scores.shape[0])
+        order = candidates[np.argsort(-scores[candidates])]
+        return rows[order], scores[order]
+
+    async def search(
+        self,
+        *,
+        embedding: list[float],
+        session_id: str | None,
+        user_id: str | None,
+        limit: int,
+        with_vectors: bool = False,
+    ) -> list[MemorySearchResult]:
+        await self.initialize()
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if self._size == 0 or norm == 0 or limit <= 0 or query.shape != (self._dimension,):
+            return []
+        query = query / norm
+
+        rows = np.flatnonzero(self._mask(user_id, session_id))
+        if len(rows) == 0:
+            return []
+        # Row numbers are only meaningful against the columns they were taken from: a
+        # compaction during the threaded search renumbers rows into new arrays and
+        # lists, so resolve them against these references rather than self.*
+        matrix, ids, contents, metadata_column = self._matrix, self._ids, self._contents, self._metadata
+        if len(rows) > _INLINE_MAX_ROWS:
+            rows, scores = await asyncio.to_thread(self._top_k, matrix, rows, query, limit)
+        else:
+            rows, scores = self._top_k(matrix, rows, query, limit)
+
+        results = []
+        for row, score in zip(rows.tolist(), scores.tolist()):
+            metadata = metadata_column[row]
+            results.append(
+                MemorySearchResult(
+                    content=contents[row],
+                    score=float(score),
+                    memory_id=ids[row],
+                    session_id=metadata.get("session_id"),
+                    user_id=metadata.get("user_id"),
+                    source=metadata.get("source"),
+                    metadata=dict(metadata),
+                    embedding=matrix[row].tolist() if with_vectors else None,
+                )
+            )
+        return results
+
+    async def count_memories_by_user(self, *, limit: int) -> dict[str, int]:
+        await self.initialize()
+        codes = self._user_codes[: self._size][self._alive[: self._size]]
+        codes = codes[codes >= 0]
+        if len(codes) == 0:
+            return {}
+        counts = np.bincount(codes)
+        users = {code: user for user, code in self._codes.items()}
+        top = np.argsort(-counts)[:limit]
+        return {users[int(code)]: int(counts[code]) for code in top if counts[code] > 0}
+
+    async def list_memories(self, *, user_id: str) -> list[MemoryDocument]:
+        await self.initialize()
+        return [
+            MemoryDocument(
+                memory_id=self._ids[row],
+                embedding=self._matrix[row].tolist(),
+                content=self._contents[row],
+                metadata=dict(self._metadata[row]),
+            )
+            for row in np.flatnonzero(self._mask(user_id, None)).tolist()
+        ]
+
+    async def close(self) -> None:
+        if self._initialized and self._log_entries:
+            async with self._lock:
+                await self._compact()
+        self._release_directory()
+        self._initialized = False
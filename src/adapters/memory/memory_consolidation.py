@@ -0,0 +1,291 @@
+"""
+Long-Term Memory Consolidation
+
+Background job bounding how many long-term memories each user accumulates:
+  - Memories older than min_age are clustered per user by cosine similarity
+    (greedy leader clustering over the stored vectors, computed with NumPy)
+  - Each cluster of near-duplicates becomes one memory: the cluster's most
+    central snippet ("extractive"), or an LLM-written summary with several
+    clusters per request ("llm", falling back to extractive on failure)
+  - The merged memory is stored before its originals are deleted, so an
+    interrupted run leaves duplicates for the next run rather than losing data
+  - Users over max_per_user lose their least recently retrieved memories
+  - Runs and memories merged/created/evicted are reported under
+    "memory_consolidation" on /health and /metrics
+
+Run it on one worker only (MEMORY_CONSOLIDATION_ENABLED); concurrent runs
+would merge the same clusters twice.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import time
+from typing import Any
+from uuid import uuid4
+
+import numpy as np
+
+from src.domain.models import ChatRequest, MemoryDocument, Message
+from src.observability.memory_metrics import record_memory_consolidation
+from src.ports.embedding_port import EmbeddingPort
+from src.ports.llm_port import LLMPort
+from src.ports.memory_port import LongTermMemoryPort
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SUMMARIZERS = ("extractive", "llm")
+
+SUMMARY_PROMPT = (
+    "You maintain a personal finance assistant's long-term memory. Each numbered group below "
+    "holds near-duplicate memories of past conversations with the same user. Merge every group "
+    "into one short memory that keeps all concrete facts (items, amounts, dates, preferences). "
+    'Reply with JSON only: {"summaries": ["<memory for group 1>", "<memory for group 2>", ...]}'
+)
+
+# Leaders whose similarities are computed together; bounds the similarity
+# block to _LEADER_BLOCK x n floats instead of n x n
+_LEADER_BLOCK = 256
+
+
+def cluster_memories(vectors: np.ndarray, threshold: float) -> list[list[int]]:
+    """
+    Group rows whose cosine similarity to a cluster's first member is at least ``threshold``.
+
+    Returns:
+        Clusters as lists of row indexes, in order of their first member
+    """
+    if len(vectors) == 0:
+        return []
+    unit = _normalized(vectors)
+
+    unassigned = np.ones(len(vectors), dtype=bool)
+    clusters: list[list[int]] = []
+    for start in range(0, len(vectors), _LEADER_BLOCK):
+        stop = min(start + _LEADER_BLOCK, len(vectors))
+        # Rows before ``start`` are all assigned already
+        candidates = np.flatnonzero(unassigned)
+        similarity = unit[start:stop] @ unit[candidates].T
+        for offset, leader in enumerate(range(start, stop)):
+            if not unassigned[leader]:
+                continue
+            members = candidates[unassigned[candidates] & (similarity[offset] >= threshold)]
+            unassigned[leader] = False
+            unassigned[members] = False
+            clusters.append(sorted({leader, *members.tolist()}))
+    return clusters
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _medoid(vectors: np.ndarray) -> int:
+    """Row with the highest total cosine similarity to the others."""
+    unit = _normalized(vectors)
+    # sum_j u_i . u_j == u_i . sum_j u_j, so no pairwise matrix is needed
+    return int(np.argmax(unit @ unit.sum(axis=0)))
+
+
+def _recency(memory: MemoryDocument) -> float:
+    return float(memory.metadata.get("last_retrieved_at") or memory.metadata.get("created_at") or 0.0)
+
+
+class MemoryConsolidationJob:
+    """Periodically merges near-duplicate long-term memories and caps memories per user."""
+
+    def __init__(
+        self,
+        long_term_memory: LongTermMemoryPort,
+        embedding_provider: EmbeddingPort,
+        llm_provider: LLMPort | None = None,
+        *,
+        summarizer: str | None = None,
+        similarity_threshold: float | None = None,
+        min_age_hours: float | None = None,
+        max_per_user: int | None = None,
+        users_per_run: int | None = None,
+        llm_batch_size: int | None = None,
+        interval_seconds: float | None = None,
+    ) -> None:
+        """
+        Initialize memory consolidation job.
+
+        Args:
+            long_term_memory: Store to consolidate
+            embedding_provider: Embeds LLM-written summaries
+            llm_provider: Writes summaries when summarizer is "llm"
+            summarizer: "extractive" or "llm". Defaults to settings.MEMORY_CONSOLIDATION_SUMMARIZER
+            similarity_threshold: Cosine similarity that makes two memories near-duplicates.
+                                  Defaults to settings.MEMORY_CONSOLIDATION_SIMILARITY
+            min_age_hours: Memories younger than this are left alone.
+                           Defaults to settings.MEMORY_CONSOLIDATION_MIN_AGE_HOURS
+            max_per_user: Memories kept per user after merging. Defaults to settings.MEMORY_MAX_PER_USER
+            users_per_run: Users (most memories first) visited per run.
+                           Defaults to settings.MEMORY_CONSOLIDATION_USERS_PER_RUN
+            llm_batch_size: Clusters summarized per LLM call. Defaults to settings.MEMORY_CONSOLIDATION_LLM_BATCH
+            interval_seconds: Pause between runs. Defaults to settings.MEMORY_CONSOLIDATION_INTERVAL_SECONDS
+        """
+        self._long_term_memory = long_term_memory
+        self._embedding_provider = embedding_provider
+        self._llm_provider = llm_provider
+        self._summarizer = (summarizer or settings.MEMORY_CONSOLIDATION_SUMMARIZER).lower()
+        if self._summarizer not in SUMMARIZERS:
+            raise ValueError(f"Unknown MEMORY_CONSOLIDATION_SUMMARIZER '{self._summarizer}', expected one of {SUMMARIZERS}")
+        self._threshold = similarity_threshold or settings.MEMORY_CONSOLIDATION_SIMILARITY
+        self._min_age = 3600 * (settings.MEMORY_CONSOLIDATION_MIN_AGE_HOURS if min_age_hours is None else min_age_hours)
+        self._max_per_user = max_per_user or settings.MEMORY_MAX_PER_USER
+        self._users_per_run = users_per_run or settings.MEMORY_CONSOLIDATION_USERS_PER_RUN
+        self._llm_batch_size = llm_batch_size or settings.MEMORY_CONSOLIDATION_LLM_BATCH
+        self._interval = interval_seconds or settings.MEMORY_CONSOLIDATION_INTERVAL_SECONDS
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Run consolidation in the background: one run now, then every interval_seconds."""
+        if self._task is None or self._task.done():
+            # Fresh context: don't keep the state of whichever request happened to start it
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Memory consolidation run failed, retrying in {self._interval}s: {e}")
+            await asyncio.sleep(self._interval)
+
+    async def run_once(self) -> dict[str, int]:
+        """
+        Consolidate every user with more than one memory (up to users_per_run).
+
+        Returns:
+            Memories merged away, merged memories created and memories evicted in this run
+        """
+        counts = await self._long_term_memory.count_memories_by_user(limit=self._users_per_run)
+        totals = {"merged": 0, "created": 0, "evicted": 0}
+        for user_id, count in counts.items():
+            if count < 2:
+                continue
+            try:
+                result = await self.consolidate_user(user_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Memory consolidation failed for user {user_id}: {e}")
+                continue
+            for key, value in result.items():
+                totals[key] += value
+
+        record_memory_consolidation(totals)
+        if any(totals.values()):
+            logger.info(
+                f"Memory consolidation: {totals['merged']} memories merged into {totals['created']}, "
+                f"{totals['evicted']} evicted across {len(counts)} users."
+            )
+        return totals
+
+    async def consolidate_user(self, user_id: str) -> dict[str, int]:
+        memories = [memory for memory in await self._long_term_memory.list_memories(user_id=user_id) if memory.embedding]
+        cutoff = time.time() - self._min_age
+        old = sorted(
+            (memory for memory in memories if float(memory.metadata.get("created_at") or 0.0) < cutoff),
+            key=lambda memory: float(memory.metadata.get("created_at") or 0.0),
+        )
+
+        merged: list[MemoryDocument] = []
+        removed: list[str] = []
+        if len(old) > 1:
+            vectors = np.asarray([memory.embedding for memory in old], dtype=np.float32)
+            clusters = [
+                cluster for cluster in cluster_memories(vectors, self._threshold) if len(cluster) > 1
+            ]
+            if clusters:
+                merged = await self._merge_clusters([[old[i] for i in cluster] for cluster in clusters])
+                removed = [old[i].memory_id for cluster in clusters for i in cluster]
+                await self._long_term_memory.store_memories(merged)
+                await self._long_term_memory.delete_memories(removed, user_id=user_id)
+
+        removed_ids = set(removed)
+        remaining = [memory for memory in memories if memory.memory_id not in removed_ids] + merged
+        evicted: list[str] = []
+        if len(remaining) > self._max_per_user:
+            remaining.sort(key=_recency)
+            evicted = [memory.memory_id for memory in remaining[: len(remaining) - self._max_per_user]]
+            await self._long_term_memory.delete_memories(evicted, user_id=user_id)
+
+        return {"merged": len(removed), "created": len(merged), "evicted": len(evicted)}
+
+    async def _merge_clusters(self, clusters: list[list[MemoryDocument]]) -> list[MemoryDocument]:
+        merged = [self._extractive(cluster) for cluster in clusters]
+        if self._summarizer != "llm" or self._llm_provider is None:
+            return merged
+
+        for start in range(0, len(clusters), self._llm_batch_size):
+            batch = clusters[start:start + self._llm_batch_size]
+            try:
+                summaries = await self._summarize(batch)
+                embeddings = await self._embedding_provider.generate_embeddings(summaries)
+            except Exception as e:
+                logger.warning(f"LLM memory summaries failed, keeping extractive merges: {e}")
+                continue
+            for offset, (summary, embedding) in enumerate(zip(summaries, embeddings)):
+                if summary and embedding is not None and any(embedding):
+                    merged[start + offset] = merged[start + offset].model_copy(
+                        update={"content": summary, "embedding": embedding}
+                    )
+        return merged
+
+    async def _summarize(self, clusters: list[list[MemoryDocument]]) -> list[str]:
+        assert self._llm_provider is not None
+        groups = "\n\n".join(
+            f"Group {number}:\n" + "\n".join(f"- {memory.content}" for memory in cluster)
+            for number, cluster in enumerate(clusters, start=1)
+        )
+        request = ChatRequest(
+            messages=[Message(role="system", content=SUMMARY_PROMPT), Message(role="user", content=groups)],
+            model=self._llm_provider.get_model_name(),
+        )
+        # LLM adapters are synchronous; keep them off the event loop
+        response = await asyncio.to_thread(self._llm_provider.chat_completion, request)
+        text = (response.content or "").strip()
+        text = text[text.find("{"): text.rfind("}") + 1]
+        summaries = json.loads(text).get("summaries")
+        if not isinstance(summaries, list) or len(summaries) != len(clusters):
+            raise ValueError(f"expected {len(clusters)} summaries, got {summaries!r:.200}")
+        return [str(summary).strip() for summary in summaries]
+
+    @staticmethod
+    def _extractive(cluster: list[MemoryDocument]) -> MemoryDocument:
+        """The cluster's most central memory, carrying the cluster's newest timestamps."""
+        vectors = np.asarray([memory.embedding for memory in cluster], dtype=np.float32)
+        representative = cluster[_medoid(vectors)]
+        metadata: dict[str, Any] = {
+            **representative.metadata,
+            "created_at": max(float(memory.metadata.get("created_at") or 0.0) for memory in cluster),
+            "last_retrieved_at": max(_recency(memory) for memory in cluster),
+            "consolidated_from": sum(int(memory.metadata.get("consolidated_from") or 1) for memory in cluster),
+        }
+        return MemoryDocument(
+            memory_id=str(uuid4()),
+            embedding=representative.embedding,
+            content=representative.content,
+            metadata=metadata,
+        )
+
+    async def close(self) -> None:
+        """Stop the background loop; an interrupted run is picked up by the next one."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -6,9 +6,19 @@ Coordinates short-term conversational state and long-term semantic memory.
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import time
+from typing import Any, Awaitable, TypeVar
 from uuid import uuid4
 
-from src.domain.models import MemoryRecord, Message
+from src.adapters.embedding.turn_scoped_embedding_adapter import turn_embedding
+from src.adapters.memory.conversation_summary import ConversationSummarizer
+from src.adapters.memory.memory_consolidation import MemoryConsolidationJob
+from src.adapters.memory.memory_ranking import rank_memories
+from src.adapters.memory.memory_write_queue import MemoryWriteQueue
+from src.domain.models import MemoryDocument, MemoryRecord, MemorySearchResult, Message
+from src.observability.memory_metrics import record_context_branch, record_memory_recall
 from src.ports.embedding_port import EmbeddingPort
 from src.ports.memory_port import LongTermMemoryPort, ShortTermMemoryPort
 from src.settings import settings
@@ -16,6 +26,27 @@ from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+
+class PendingTurn:
+    """
+    A finished turn waiting to be written: short-term records and an optional
+    long-term memory, with the memory's vector if the turn already computed it.
+    """
+
+    __slots__ = ("records", "memory", "embedding")
+
+    def __init__(
+        self,
+        records: list[MemoryRecord],
+        memory: tuple[str, str, dict[str, Any]] | None,
+        embedding: list[float] | None = None,
+    ) -> None:
+        self.records = records
+        self.memory = memory
+        self.embedding = embedding
+
 
 class MemoryManager:
     """Combines Supabase and Qdrant memory for the main agent."""
@@ -30,6 +61,16 @@ class MemoryManager:
         long_term_top_k: int | None = None,
         min_content_length: int | None = None,
         enabled: bool | None = None,
+        short_term_timeout: float | None = None,
+        long_term_timeout: float | None = None,
+        write_queue: MemoryWriteQueue[PendingTurn] | None = None,
+        consolidation: MemoryConsolidationJob | None = None,
+        min_score: float | None = None,
+        mmr_lambda: float | None = None,
+        recency_weight: float | None = None,
+        recency_half_life_days: float | None = None,
+        candidate_factor: int | None = None,
+        summarizer: ConversationSummarizer | None = None,
     ) -> None:
         self._short_term_memory = short_term_memory
         self._long_term_memory = long_term_memory
@@ -38,15 +79,47 @@ class MemoryManager:
         self._long_term_top_k = long_term_top_k or settings.MEMORY_TOP_K
         self._min_content_length = min_content_length or settings.MEMORY_MIN_CONTENT_LENGTH
         self._enabled = settings.MEMORY_ENABLED if enabled is None else enabled
-        self._initialized = False
+        self._short_term_timeout = short_term_timeout or settings.MEMORY_SHORT_TERM_TIMEOUT_SECONDS
+        self._long_term_timeout = long_term_timeout or settings.MEMORY_LONG_TERM_TIMEOUT_SECONDS
+        self._min_score = settings.MEMORY_MIN_SIMILARITY if min_score is None else min_score
+        self._mmr_lambda = settings.MEMORY_MMR_LAMBDA if mmr_lambda is None else mmr_lambda
+        self._recency_weight = settings.MEMORY_RECENCY_WEIGHT if recency_weight is None else recency_weight
+        self._recency_half_life_days = recency_half_life_days or settings.MEMORY_RECENCY_HALF_LIFE_DAYS
+        self._candidate_factor = candidate_factor or settings.MEMORY_CANDIDATE_FACTOR
+        self._write_queue = write_queue
+        self._consolidation = consolidation
+        self._summarizer = summarizer
+        self._background: set[asyncio.Task] = set()
+        self._short_term_ready = False
+        self._long_term_ready = False
 
     async def initialize(self) -> None:
-        if not self._enabled or self._initialized:
+        """
+        Open both stores ahead of the first turn (called at startup).
+
+        A store that cannot be opened now is retried by the first turn that needs
+        it, inside that turn's branch timeout.
+        """
+        if not self._enabled:
             return
+        if self._write_queue is not None:
+            self._write_queue.start(self._write_turns)
+        results = await asyncio.gather(self._ensure_short_term(), self._ensure_long_term(), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def _ensure_short_term(self) -> None:
+        if not self._short_term_ready:
+            await self._short_term_memory.initialize()
+            self._short_term_ready = True
 
-        await self._short_term_memory.initialize()
-        await self._long_term_memory.initialize()
-        self._initialized = True
+    async def _ensure_long_term(self) -> None:
+        if not self._long_term_ready:
+            await self._long_term_memory.initialize()
+            self._long_term_ready = True
+            if self._consolidation is not None:
+                self._consolidation.start()
 
     async def build_context(
         self,
@@ -59,34 +132,119 @@ class MemoryManager:
         if not self._enabled or not session_id:
             return [], None
 
-        await self.initialize()
-        recent_records = await self._short_term_memory.get_recent_messages(
-            session_id,
-            limit=self._short_term_limit,
+        # Short-term history and the embed + long-term search chain run side by side,
+        # each opening its store if startup could not; a branch that is slow or
+        # failing is dropped rather than delaying the reply
+        context_messages, long_term_context = await asyncio.gather(
+            self._run_branch(
+                "short_term",
+                self._recent_context(session_id),
+                self._short_term_timeout,
+                default=[],
+            ),
+            self._run_branch(
+                "long_term",
+                self._long_term_context(session_id, user_id, user_input),
+                self._long_term_timeout,
+                default=None,
+            ),
         )
-        context_messages = [
+        return context_messages, long_term_context
+
+    async def _recent_context(self, session_id: str) -> list[Message]:
+        await self._ensure_short_term()
+        summary = None
+        if self._summarizer is not None:
+            summary, recent_records = await self._summarizer.context(session_id)
+        else:
+            recent_records = await self._short_term_memory.get_recent_messages(
+                session_id,
+                limit=self._short_term_limit,
+            )
+        messages = [
             Message(role=record.role, content=record.content)
             for record in recent_records
             if record.content
         ]
-
-        long_term_context = None
-        if self._is_memorable(user_input):
-            embedding = await self._embedding_provider.generate_embedding(user_input)
-            related_memories = await self._long_term_memory.search(
-                embedding=embedding,
-                session_id=session_id,
-                user_id=user_id,
-                limit=self._long_term_top_k,
+        if summary is not None:
+            messages.insert(
+                0,
+                Message(role="system", content=f"Summary of the earlier conversation:\n{summary.content}"),
             )
-            if related_memories:
-                memory_lines = [f"- {memory.content}" for memory in related_memories]
-                long_term_context = (
-                    "Relevant past memories that may help with this reply:\n"
-                    + "\n".join(memory_lines)
-                )
+        return messages
 
-        return context_messages, long_term_context
+    async def _long_term_context(self, session_id: str, user_id: str | None, user_input: str) -> str | None:
+        if not self._is_memorable(user_input):
+            return None
+
+        await self._ensure_long_term()
+        embedding = await self._embedding_provider.generate_embedding(user_input)
+        # Over-fetch so the threshold and MMR have alternatives to the raw top-k
+        candidates = await self._long_term_memory.search(
+            embedding=embedding,
+            session_id=session_id,
+            user_id=user_id,
+            limit=self._long_term_top_k * self._candidate_factor,
+            with_vectors=self._mmr_lambda < 1.0,
+        )
+        related_memories, below_threshold, redundant = rank_memories(
+            candidates,
+            limit=self._long_term_top_k,
+            min_score=self._min_score,
+            diversity_lambda=self._mmr_lambda,
+            recency_weight=self._recency_weight,
+            recency_half_life_days=self._recency_half_life_days,
+        )
+        memory_lines = [f"- {memory.content}" for memory in related_memories]
+        unfiltered_chars = sum(len(f"- {memory.content}") + 1 for memory in candidates[: self._long_term_top_k])
+        record_memory_recall(
+            candidates=len(candidates),
+            kept=len(related_memories),
+            below_threshold=below_threshold,
+            redundant=redundant,
+            chars_saved=unfiltered_chars - sum(len(line) + 1 for line in memory_lines),
+        )
+        if not related_memories:
+            return None
+        self._mark_retrieved(related_memories, user_id)
+        return (
+            "Relevant past memories that may help with this reply:\n"
+            + "\n".join(memory_lines)
+        )
+
+    def _mark_retrieved(self, memories: list[MemorySearchResult], user_id: str | None) -> None:
+        """Stamp recalled memories in the background; consolidation evicts the least recently retrieved."""
+        memory_ids = [memory.memory_id for memory in memories if memory.memory_id]
+        if not memory_ids:
+            return
+        # Fresh context: the task must not keep the turn's state (e.g. shared embeddings) alive
+        task = asyncio.create_task(self._mark_retrieved_safe(memory_ids, user_id), context=contextvars.Context())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _mark_retrieved_safe(self, memory_ids: list[str], user_id: str | None) -> None:
+        try:
+            await self._long_term_memory.mark_retrieved(memory_ids, user_id=user_id)
+        except Exception as exc:
+            logger.debug(f"Failed to mark memories retrieved: {exc}")
+
+    async def _run_branch(self, name: str, branch: Awaitable[T], timeout: float, *, default: T) -> T:
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            return await asyncio.wait_for(branch, timeout)
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            logger.warning(f"Memory {name} context timed out after {timeout}s, continuing without it.")
+            return default
+        except Exception as exc:
+            outcome = "error"
+            logger.warning(f"Memory {name} context failed, continuing without it: {exc}")
+            return default
+        finally:
+            elapsed = time.perf_counter() - started
+            record_context_branch(name, elapsed, outcome)
+            logger.debug(f"Memory {name} context: {outcome} in {elapsed * 1000:.1f} ms")
 
     async def store_turn(
         self,
@@ -97,32 +255,131 @@ class MemoryManager:
         user_input: str,
         assistant_response: str,
     ) -> None:
+        """
+        Persist a finished turn to short-term and long-term memory.
+
+        With a write queue the turn is only enqueued here (waiting just when the
+        queue is full) and written in the background; otherwise it is written inline.
+        """
         if not self._enabled or not session_id:
             return
 
-        await self.initialize()
-
-        await self._store_short_term(
-            session_id=session_id,
-            user_id=user_id,
-            source=source,
-            user_input=user_input,
-            assistant_response=assistant_response,
-        )
-        await self._store_long_term(
-            session_id=session_id,
-            user_id=user_id,
-            source=source,
-            user_input=user_input,
-            assistant_response=assistant_response,
+        turn = PendingTurn(
+            records=self._short_term_records(
+                session_id=session_id,
+                user_id=user_id,
+                source=source,
+                user_input=user_input,
+                assistant_response=assistant_response,
+            ),
+            memory=self._long_term_memory_entry(
+                session_id=session_id,
+                user_id=user_id,
+                source=source,
+                user_input=user_input,
+                assistant_response=assistant_response,
+            ),
         )
+        if not turn.records and turn.memory is None:
+            return
+        if turn.memory is not None:
+            # build_context() embedded the same text for the long-term search; the
+            # background writer runs outside this turn and cannot look it up itself
+            turn.embedding = turn_embedding(turn.memory[0])
+
+        if self._write_queue is None:
+            if await self._write_turns([turn]):
+                raise RuntimeError("Memory write failed")
+            return
+        # Normally started by initialize() at startup
+        self._write_queue.start(self._write_turns)
+        await self._write_queue.put(turn)
 
     async def close(self) -> None:
+        if self._consolidation is not None:
+            await self._consolidation.close()
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self._write_queue is not None:
+            await self._write_queue.close()
+        if self._summarizer is not None:
+            await self._summarizer.close()
         await self._short_term_memory.close()
         await self._long_term_memory.close()
-        self._initialized = False
+        self._short_term_ready = self._long_term_ready = False
+
+    async def _write_turns(self, turns: list[PendingTurn]) -> list[PendingTurn]:
+        """
+        Write a batch of turns: one ordered short-term insert and one embed + upsert for long-term.
+
+        Returns:
+            Turns with a part that could not be written. Written parts are cleared
+            from them, so writing them again does not duplicate anything.
+        """
+        records = [record for turn in turns for record in turn.records]
+        memories = [(turn.memory, turn.embedding) for turn in turns if turn.memory is not None]
+
+        # The two stores are independent; a failure in one does not hold back the other
+        short_term, long_term = await asyncio.gather(
+            self._write_short_term(records),
+            self._write_long_term(memories),
+            return_exceptions=True,
+        )
+        for result in (short_term, long_term):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+
+        if isinstance(short_term, BaseException):
+            logger.warning(f"Short-term memory write of {len(records)} messages failed: {short_term}")
+        else:
+            for turn in turns:
+                turn.records = []
+        if isinstance(long_term, BaseException):
+            logger.warning(f"Long-term memory write of {len(memories)} memories failed: {long_term}")
+        else:
+            for turn in turns:
+                turn.memory = None
+        return [turn for turn in turns if turn.records or turn.memory is not None]
+
+    async def _write_short_term(self, records: list[MemoryRecord]) -> None:
+        if not records:
+            return
+        await self._ensure_short_term()
+        await self._short_term_memory.add_messages(records)
+        if self._summarizer is not None:
+            self._summarizer.schedule({record.session_id for record in records})
+
+    async def _write_long_term(
+        self,
+        memories: list[tuple[tuple[str, str, dict[str, Any]], list[float] | None]],
+    ) -> None:
+        if not memories:
+            return
 
-    async def _store_short_term(
+        await self._ensure_long_term()
+        # Only memories whose turn did not embed their text go to the provider
+        missing = [index for index, (_, embedding) in enumerate(memories) if embedding is None]
+        embeddings = [embedding for _, embedding in memories]
+        if missing:
+            embedded = await self._embedding_provider.generate_embeddings([memories[index][0][0] for index in missing])
+            for index, embedding in zip(missing, embedded):
+                embeddings[index] = embedding
+        documents = [
+            MemoryDocument(
+                memory_id=str(uuid4()),
+                embedding=embedding,
+                content=content,
+                metadata=metadata,
+            )
+            for ((_, content, metadata), _), embedding in zip(memories, embeddings)
+            if embedding is not None and any(embedding)
+        ]
+        if len(documents) < len(memories):
+            logger.warning(f"Skipped {len(memories) - len(documents)} long-term memories without an embedding.")
+        if documents:
+            await self._long_term_memory.store_memories(documents)
+
+    def _short_term_records(
         self,
         *,
         session_id: str,
@@ -130,7 +387,7 @@ class MemoryManager:
         source: str,
         user_input: str,
         assistant_response: str,
-    ) -> None:
+    ) -> list[MemoryRecord]:
         records = [
             MemoryRecord(
                 session_id=session_id,
@@ -149,12 +406,9 @@ class MemoryManager:
                 metadata={"channel": source},
             ),
         ]
+        return [record for record in records if self._is_memorable(record.content)]
 
-        for record in records:
-            if self._is_memorable(record.content):
-                await self._short_term_memory.add_message(record)
-
-    async def _store_long_term(
+    def _long_term_memory_entry(
         self,
         *,
         session_id: str,
@@ -162,10 +416,11 @@ class MemoryManager:
         source: str,
         user_input: str,
         assistant_response: str,
-    ) -> None:
+    ) -> tuple[str, str, dict[str, Any]] | None:
+        """Text to embed, content and metadata of the turn's long-term memory, if it has one."""
         content_parts = [part.strip() for part in [user_input, assistant_response] if self._is_memorable(part)]
         if not content_parts:
-            return
+            return None
 
         content = "\n".join(
             [
@@ -173,17 +428,13 @@ class MemoryManager:
                 f"Assistant: {assistant_response.strip()}",
             ]
         )
-        embedding = await self._embedding_provider.generate_embedding(user_input)
-        await self._long_term_memory.store_memory(
-            memory_id=str(uuid4()),
-            embedding=embedding,
-            content=content,
-            metadata={
-                "session_id": session_id,
-                "user_id": user_id,
-                "source": source,
-            },
-        )
+        metadata = {
+            "session_id": session_id,
+            "user_id": user_id,
+            "source": source,
+            "created_at": time.time(),
+        }
+        return user_input, content, metadata
 
     def _is_memorable(self, content: str | None) -> bool:
         return bool(content and len(content.strip()) >= self._min_content_length)
@@ -203,6 +454,12 @@ def get_memory_manager() -> MemoryManager:
     return _memory_manager
 
 
+async def start_memory_manager() -> None:
+    """Open the memory stores at startup instead of on the first turn."""
+    if _memory_manager is not None:
+        await _memory_manager.initialize()
+
+
 async def close_memory_manager() -> None:
     if _memory_manager is not None:
         await _memory_manager.close()
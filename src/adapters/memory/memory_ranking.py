@@ -0,0 +1,121 @@
+"""
+Long-Term Memory Ranking
+
+Picks which recalled memories go into the prompt, from an over-fetched
+candidate list:
+  - Candidates below a minimum cosine similarity are dropped
+  - Optional recency weighting scales each score towards an exponential
+    decay of the memory's age (half-life in days)
+  - Maximal marginal relevance, computed with NumPy over the candidates'
+    vectors, trades relevance against similarity to memories already picked,
+    so near-duplicates don't take several prompt slots
+"""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from src.domain.models import MemorySearchResult
+
+
+def recency_weighted(
+    memories: list[MemorySearchResult],
+    *,
+    weight: float,
+    half_life_days: float,
+    now: float | None = None,
+) -> list[float]:
+    """
+    Scores scaled by ``(1 - weight) + weight * 0.5 ** (age / half_life)``.
+
+    Memories without a created_at timestamp are treated as very old.
+    """
+    scores = [memory.score for memory in memories]
+    if weight <= 0 or half_life_days <= 0:
+        return scores
+    now = time.time() if now is None else now
+    weighted = []
+    for memory, score in zip(memories, scores):
+        created_at = memory.metadata.get("created_at")
+        decay = 0.5 ** (max(0.0, now - float(created_at)) / (86400 * half_life_days)) if created_at else 0.0
+        weighted.append(score * ((1 - weight) + weight * decay))
+    return weighted
+
+
+def mmr_select(
+    vectors: np.ndarray,
+    relevance: np.ndarray,
+    limit: int,
+    diversity_lambda: float,
+) -> list[int]:
+    """
+    Greedy maximal marginal relevance.
+
+    Args:
+        vectors: Candidate embeddings, one row each
+        relevance: Candidate relevance scores
+        limit: Rows to pick
+        diversity_lambda: 1.0 ranks by relevance only, lower values penalize redundancy more
+
+    Returns:
+        Picked row indexes, best first
+    """
+    count = len(relevance)
+    if count == 0 or limit <= 0:
+        return []
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    unit = vectors / norms
+    similarity = unit @ unit.T
+
+    selected = [int(np.argmax(relevance))]
+    # Highest similarity of each candidate to anything selected so far
+    redundancy = similarity[selected[0]].copy()
+    available = np.ones(count, dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < min(limit, count):
+        marginal = diversity_lambda * relevance - (1 - diversity_lambda) * redundancy
+        marginal[~available] = -np.inf
+        pick = int(np.argmax(marginal))
+        selected.append(pick)
+        available[pick] = False
+        redundancy = np.maximum(redundancy, similarity[pick])
+    return selected
+
+
+def rank_memories(
+    candidates: list[MemorySearchResult],
+    *,
+    limit: int,
+    min_score: float,
+    diversity_lambda: float,
+    recency_weight: float,
+    recency_half_life_days: float,
+) -> tuple[list[MemorySearchResult], int, int]:
+    """
+    Choose up to ``limit`` memories from ``candidates`` (best first).
+
+    Returns:
+        The chosen memories, how many candidates fell below min_score, and how
+        many memories of the relevance-ordered top ``limit`` MMR replaced
+    """
+    relevant = [memory for memory in candidates if memory.score >= min_score]
+    below_threshold = len(candidates) - len(relevant)
+    if not relevant:
+        return [], below_threshold, 0
+
+    scores = np.asarray(
+        recency_weighted(relevant, weight=recency_weight, half_life_days=recency_half_life_days),
+        dtype=np.float32,
+    )
+    dimension = len(relevant[0].embedding or [])
+    by_relevance = np.argsort(-scores)[:limit].tolist()
+    if diversity_lambda >= 1.0 or not dimension or any(len(memory.embedding or []) != dimension for memory in relevant):
+        order = by_relevance
+    else:
+        vectors = np.asarray([memory.embedding for memory in relevant], dtype=np.float32)
+        order = mmr_select(vectors, scores, limit, diversity_lambda)
+    redundant = len(set(by_relevance) - set(order))
+    return [relevant[row] for row in order], below_threshold, redundant
@@ -0,0 +1,184 @@
+"""
+Memory Write-Behind Queue
+
+Takes conversation memory writes off the reply path:
+  - store_turn() enqueues the finished turn and returns; a background worker
+    persists it after the reply has gone out
+  - The worker drains whatever has queued up (up to batch_size, waiting at most
+    linger_ms for more) and hands it to the flush callback as one batch, so
+    busy periods cost one bulk write per store instead of several per turn
+  - A single worker flushes batches in FIFO order, so each session's turns are
+    written in the order they happened
+  - Entries the flush could not write are retried with exponential backoff
+    before being dropped; outcomes are counted per entry
+  - The worker runs in a fresh context, so it never holds on to the request
+    context (e.g. a turn's shared embeddings) it happened to be started from
+  - The queue is bounded: when the stores fall behind, enqueuing waits for
+    space instead of letting memory grow without limit
+  - close() drains what is queued (bounded by drain_timeout) before shutdown
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from src.observability.memory_metrics import (
+    record_memory_enqueue,
+    record_memory_write,
+    register_write_queue,
+)
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Persist one batch of queued entries (in enqueue order); returns the entries that
+# could not be written, with their written parts cleared so a retry does not repeat them
+FlushBatch = Callable[[list[T]], Awaitable[list[T]]]
+
+
+class MemoryWriteQueue(Generic[T]):
+    """Bounded in-process queue with one background worker flushing batches."""
+
+    def __init__(
+        self,
+        max_size: int | None = None,
+        batch_size: int | None = None,
+        linger_ms: float | None = None,
+        drain_timeout: float | None = None,
+        retry_attempts: int | None = None,
+        retry_base_seconds: float | None = None,
+    ) -> None:
+        """
+        Initialize memory write queue.
+
+        Args:
+            max_size: Entries held before enqueuing waits for the worker.
+                      Defaults to settings.MEMORY_WRITE_QUEUE_SIZE
+            batch_size: Max entries per flush. Defaults to settings.MEMORY_WRITE_BATCH_SIZE
+            linger_ms: How long the worker waits for more entries before flushing a partial batch.
+                       Defaults to settings.MEMORY_WRITE_LINGER_MS
+            drain_timeout: Max seconds close() spends flushing what is left.
+                           Defaults to settings.MEMORY_WRITE_DRAIN_TIMEOUT_SECONDS
+            retry_attempts: Flush attempts per batch before failed entries are dropped.
+                            Defaults to settings.MEMORY_WRITE_RETRY_ATTEMPTS
+            retry_base_seconds: First retry delay, doubled after each failed attempt.
+                                Defaults to settings.MEMORY_WRITE_RETRY_BASE_SECONDS
+        """
+        self._max_size = max_size or settings.MEMORY_WRITE_QUEUE_SIZE
+        self._batch_size = batch_size or settings.MEMORY_WRITE_BATCH_SIZE
+        self._linger = (settings.MEMORY_WRITE_LINGER_MS if linger_ms is None else linger_ms) / 1000
+        self._drain_timeout = drain_timeout or settings.MEMORY_WRITE_DRAIN_TIMEOUT_SECONDS
+        self._retry_attempts = max(1, retry_attempts or settings.MEMORY_WRITE_RETRY_ATTEMPTS)
+        self._retry_base = (
+            settings.MEMORY_WRITE_RETRY_BASE_SECONDS if retry_base_seconds is None else retry_base_seconds
+        )
+        self._queue: asyncio.Queue[T] | None = None
+        self._task: asyncio.Task | None = None
+        register_write_queue(lambda: self.depth)
+
+    def start(self, flush: FlushBatch[T]) -> None:
+        """Start the background worker (no-op while it is running)."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._max_size)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(flush), context=contextvars.Context())
+
+    async def put(self, entry: T) -> None:
+        """
+        Queue ``entry`` for the background worker.
+
+        Waits for space when the queue is full (backpressure on the caller).
+        """
+        if self._queue is None:
+            raise RuntimeError("Memory write queue has not been started.")
+        blocked = self._queue.full()
+        if blocked:
+            logger.warning(f"Memory write queue is full ({self._max_size}); waiting for the worker.")
+        await self._queue.put(entry)
+        record_memory_enqueue(blocked)
+
+    async def _run(self, flush: FlushBatch[T]) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = time.monotonic() + self._linger
+            while len(batch) < self._batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            started = time.perf_counter()
+            try:
+                outcomes = await self._flush_with_retry(flush, batch)
+                record_memory_write(time.perf_counter() - started, outcomes)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _flush_with_retry(self, flush: FlushBatch[T], batch: list[T]) -> dict[str, int]:
+        """Flush ``batch``, retrying what failed; returns entry counts by outcome."""
+        pending = batch
+        for attempt in range(self._retry_attempts):
+            if attempt:
+                delay = self._retry_base * 2 ** (attempt - 1)
+                logger.warning(f"Retrying {len(pending)} memory writes in {delay:.1f}s (attempt {attempt + 1}).")
+                await asyncio.sleep(delay)
+            try:
+                remaining = await flush(pending)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Memory write batch of {len(pending)} failed: {e}")
+                remaining = pending
+            if attempt == 0:
+                first_try = len(batch) - len(remaining)
+            pending = remaining
+            if not pending:
+                break
+        if pending:
+            logger.error(f"Dropping {len(pending)} memory writes after {self._retry_attempts} attempts.")
+        return {
+            "ok": first_try,
+            "retried": len(batch) - first_try - len(pending),
+            "error": len(pending),
+        }
+
+    @property
+    def depth(self) -> int:
+        """Entries waiting for the worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def close(self) -> None:
+        """Flush everything queued (up to drain_timeout), then stop the worker."""
+        if self._task is None:
+            return
+        assert self._queue is not None
+        if not self._task.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), self._drain_timeout)
+            except asyncio.TimeoutError:
+                logger.error(
+                    f"Memory write queue not drained after {self._drain_timeout}s; "
+                    f"dropping {self._queue.qsize()} queued turns."
+                )
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
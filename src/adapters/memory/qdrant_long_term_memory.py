@@ -1,21 +1,46 @@
 """
 Qdrant Long-Term Memory Adapter
 
-Stores semantic memory snippets for cross-session recall.
+Stores semantic memory snippets for cross-session recall:
+  - AsyncQdrantClient, so searches and upserts don't block the event loop;
+    REST by default, gRPC when QDRANT_PREFER_GRPC is set (the gRPC port must
+    then be reachable; calls are not retried over REST)
+  - Keyword payload indexes on user_id and session_id keep filtered search
+    from scanning the whole collection as it grows
+  - store_memories() upserts a batch of points per request
+  - Collection layout comes from Settings: scalar (int8) or binary
+    quantization with rescoring, HNSW m/ef_construct, on-disk vectors and
+    payload, a tenant index on user_id, and optional custom sharding that
+    hashes users onto a fixed set of shard keys. On startup, settings that
+    differ from an existing collection are applied in place where Qdrant
+    allows it (indexes are rebuilt in the background); the rest is reported
 """
 
+import asyncio
+import time
+import zlib
 from typing import Any
 
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models as rest
 
-from src.domain.models import MemorySearchResult
+from src.domain.models import MemoryDocument, MemorySearchResult
 from src.ports.memory_port import LongTermMemoryPort
 from src.settings import settings
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Payload fields searches filter on
+PAYLOAD_INDEXES = ("user_id", "session_id")
+
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+
+
+def tenant_shard_key(tenant: str, shard_keys: int) -> str:
+    """Shard key a user (or session, for anonymous memories) is stored under."""
+    return f"tenant-{zlib.crc32(tenant.encode()) % shard_keys}"
+
 
 class QdrantLongTermMemory(LongTermMemoryPort):
     """Semantic memory storage backed by Qdrant."""
@@ -26,40 +51,214 @@ class QdrantLongTermMemory(LongTermMemoryPort):
         api_key: str | None = None,
         collection_name: str | None = None,
         vector_size: int | None = None,
+        prefer_grpc: bool | None = None,
+        grpc_port: int | None = None,
+        upsert_batch_size: int | None = None,
+        quantization: str | None = None,
+        on_disk: bool | None = None,
+        hnsw_m: int | None = None,
+        hnsw_ef_construct: int | None = None,
+        tenant_shard_keys: int | None = None,
     ) -> None:
+        """
+        Initialize Qdrant long-term memory.
+
+        Args:
+            url: Qdrant URL; long-term memory is disabled without one. Defaults to settings.QDRANT_URL
+            api_key: Defaults to settings.QDRANT_API_KEY
+            collection_name: Defaults to settings.QDRANT_COLLECTION_NAME
+            vector_size: Defaults to settings.MEMORY_EMBEDDING_DIMENSION
+            prefer_grpc: Talk gRPC (on grpc_port) instead of REST. Defaults to settings.QDRANT_PREFER_GRPC
+            grpc_port: Defaults to settings.QDRANT_GRPC_PORT
+            upsert_batch_size: Points per upsert request. Defaults to settings.QDRANT_UPSERT_BATCH_SIZE
+            quantization: "none", "scalar" (int8) or "binary". Defaults to settings.QDRANT_QUANTIZATION
+            on_disk: Keep original vectors on disk (quantized ones stay in RAM).
+                     Defaults to settings.QDRANT_ON_DISK_VECTORS
+            hnsw_m: Defaults to settings.QDRANT_HNSW_M
+            hnsw_ef_construct: Defaults to settings.QDRANT_HNSW_EF_CONSTRUCT
+            tenant_shard_keys: Custom sharding over this many shard keys (0 for automatic sharding).
+                               Defaults to settings.QDRANT_TENANT_SHARD_KEYS
+        """
         self._collection_name = collection_name or settings.QDRANT_COLLECTION_NAME
         self._vector_size = vector_size or settings.MEMORY_EMBEDDING_DIMENSION
+        self._upsert_batch_size = upsert_batch_size or settings.QDRANT_UPSERT_BATCH_SIZE
+        self._quantization = (quantization or settings.QDRANT_QUANTIZATION).lower()
+        if self._quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown QDRANT_QUANTIZATION '{self._quantization}', expected one of {QUANTIZATION_MODES}")
+        self._on_disk = settings.QDRANT_ON_DISK_VECTORS if on_disk is None else on_disk
+        self._hnsw_m = hnsw_m or settings.QDRANT_HNSW_M
+        self._hnsw_ef_construct = hnsw_ef_construct or settings.QDRANT_HNSW_EF_CONSTRUCT
+        self._shard_keys = settings.QDRANT_TENANT_SHARD_KEYS if tenant_shard_keys is None else tenant_shard_keys
         resolved_url = url or settings.QDRANT_URL
         self._client = (
-            QdrantClient(
+            AsyncQdrantClient(
                 url=resolved_url,
                 api_key=api_key or settings.QDRANT_API_KEY or None,
+                prefer_grpc=settings.QDRANT_PREFER_GRPC if prefer_grpc is None else prefer_grpc,
+                grpc_port=grpc_port or settings.QDRANT_GRPC_PORT,
             )
             if resolved_url
             else None
         )
+        self._init_lock = asyncio.Lock()
         self._initialized = False
 
     async def initialize(self) -> None:
         if self._initialized:
             return
 
-        if self._client is None:
-            logger.warning("Qdrant URL is not configured. Long-term memory is disabled.")
+        async with self._init_lock:
+            if self._initialized:
+                return
+
+            if self._client is None:
+                logger.warning(
+                    "Qdrant URL is not configured. Long-term memory is disabled "
+                    "(set LONG_TERM_MEMORY_PROVIDER=local for the file-backed store)."
+                )
+                self._initialized = True
+                return
+
+            exists = await self._client.collection_exists(collection_name=self._collection_name)
+            if exists:
+                await self._migrate_collection()
+            else:
+                await self._create_collection()
+            await self._ensure_payload_indexes()
             self._initialized = True
-            return
+            logger.info("Qdrant long-term memory initialized")
+
+    def _hnsw_config(self) -> rest.HnswConfigDiff:
+        return rest.HnswConfigDiff(
+            m=self._hnsw_m,
+            ef_construct=self._hnsw_ef_construct,
+            # Per-tenant links so user-filtered searches stay on the graph
+            payload_m=self._hnsw_m if settings.QDRANT_TENANT_INDEX else None,
+        )
+
+    def _quantization_config(self) -> rest.ScalarQuantization | rest.BinaryQuantization | None:
+        always_ram = settings.QDRANT_QUANTIZATION_ALWAYS_RAM
+        if self._quantization == "scalar":
+            return rest.ScalarQuantization(
+                scalar=rest.ScalarQuantizationConfig(type=rest.ScalarType.INT8, quantile=0.99, always_ram=always_ram)
+            )
+        if self._quantization == "binary":
+            return rest.BinaryQuantization(binary=rest.BinaryQuantizationConfig(always_ram=always_ram))
+        return None
 
-        collections = self._client.collection_exists(collection_name=self._collection_name)
-        if not collections:
-            self._client.create_collection(
+    def _search_params(self) -> rest.SearchParams | None:
+        quantization = (
+            rest.QuantizationSearchParams(
+                rescore=settings.QDRANT_SEARCH_RESCORE,
+                oversampling=settings.QDRANT_SEARCH_OVERSAMPLING,
+            )
+            if self._quantization != "none"
+            else None
+        )
+        hnsw_ef = settings.QDRANT_SEARCH_HNSW_EF or None
+        if quantization is None and hnsw_ef is None:
+            return None
+        return rest.SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+
+    def _shard_key(self, user_id: str | None, session_id: str | None) -> str | None:
+        tenant = user_id or session_id
+        if not self._shard_keys or not tenant:
+            return None
+        return tenant_shard_key(tenant, self._shard_keys)
+
+    async def _create_collection(self) -> None:
+        assert self._client is not None
+        await self._client.create_collection(
+            collection_name=self._collection_name,
+            vectors_config=rest.VectorParams(
+                size=self._vector_size,
+                distance=rest.Distance.COSINE,
+                on_disk=self._on_disk,
+            ),
+            hnsw_config=self._hnsw_config(),
+            quantization_config=self._quantization_config(),
+            on_disk_payload=settings.QDRANT_ON_DISK_PAYLOAD,
+            shard_number=settings.QDRANT_SHARD_NUMBER or None,
+            sharding_method=rest.ShardingMethod.CUSTOM if self._shard_keys else None,
+        )
+        for bucket in range(self._shard_keys):
+            await self._client.create_shard_key(self._collection_name, shard_key=f"tenant-{bucket}")
+        logger.info(
+            f"Created Qdrant collection '{self._collection_name}' | quantization: {self._quantization} | "
+            f"on-disk vectors: {self._on_disk} | hnsw m={self._hnsw_m} ef_construct={self._hnsw_ef_construct} | "
+            f"tenant shard keys: {self._shard_keys or 'off'}"
+        )
+
+    async def _migrate_collection(self) -> None:
+        """Bring an existing collection in line with the configured layout where Qdrant can do so in place."""
+        assert self._client is not None
+        info = await self._client.get_collection(collection_name=self._collection_name)
+        params = info.config.params
+        vectors = params.vectors
+        if isinstance(vectors, dict):
+            vectors = vectors.get("")
+        if vectors is not None and vectors.size != self._vector_size:
+            logger.error(
+                f"Qdrant collection '{self._collection_name}' stores {vectors.size}-dim vectors but "
+                f"MEMORY_EMBEDDING_DIMENSION is {self._vector_size}; recreate the collection to change it."
+            )
+
+        custom_sharding = params.sharding_method == rest.ShardingMethod.CUSTOM
+        if custom_sharding != bool(self._shard_keys):
+            logger.warning(
+                f"Qdrant collection '{self._collection_name}' sharding cannot change in place "
+                f"(QDRANT_TENANT_SHARD_KEYS={self._shard_keys}); recreate the collection to apply it."
+            )
+            self._shard_keys = 0 if not custom_sharding else self._shard_keys
+
+        changes: dict[str, Any] = {}
+        hnsw = info.config.hnsw_config
+        wanted_hnsw = self._hnsw_config()
+        if (hnsw.m, hnsw.ef_construct, hnsw.payload_m if wanted_hnsw.payload_m else None) != (
+            wanted_hnsw.m,
+            wanted_hnsw.ef_construct,
+            wanted_hnsw.payload_m,
+        ):
+            changes["hnsw_config"] = wanted_hnsw
+        if vectors is not None and bool(vectors.on_disk) != self._on_disk:
+            changes["vectors_config"] = {"": rest.VectorParamsDiff(on_disk=self._on_disk)}
+        if self._current_quantization(info.config.quantization_config) != self._quantization:
+            changes["quantization_config"] = self._quantization_config() or rest.Disabled.DISABLED
+        if bool(params.on_disk_payload) != settings.QDRANT_ON_DISK_PAYLOAD:
+            changes["collection_params"] = rest.CollectionParamsDiff(on_disk_payload=settings.QDRANT_ON_DISK_PAYLOAD)
+
+        if changes:
+            await self._client.update_collection(collection_name=self._collection_name, **changes)
+            logger.info(f"Updated Qdrant collection '{self._collection_name}': {', '.join(changes)}")
+
+    @staticmethod
+    def _current_quantization(config: Any) -> str:
+        if isinstance(config, rest.ScalarQuantization):
+            return "scalar"
+        if isinstance(config, rest.BinaryQuantization):
+            return "binary"
+        return "none"
+
+    async def _ensure_payload_indexes(self) -> None:
+        assert self._client is not None
+        collection = await self._client.get_collection(collection_name=self._collection_name)
+        existing = collection.payload_schema or {}
+        for field_name in PAYLOAD_INDEXES:
+            is_tenant = settings.QDRANT_TENANT_INDEX and field_name == "user_id"
+            current = existing.get(field_name)
+            if current is not None and bool(getattr(current.params, "is_tenant", False)) == is_tenant:
+                continue
+            await self._client.create_payload_index(
                 collection_name=self._collection_name,
-                vectors_config=rest.VectorParams(
-                    size=self._vector_size,
-                    distance=rest.Distance.COSINE,
+                field_name=field_name,
+                field_schema=(
+                    rest.KeywordIndexParams(type=rest.KeywordIndexType.KEYWORD, is_tenant=True)
+                    if is_tenant
+                    else rest.PayloadSchemaType.KEYWORD
                 ),
+                wait=True,
             )
-        self._initialized = True
-        logger.info("Qdrant long-term memory initialized")
+            logger.info(f"Created Qdrant payload index on '{field_name}'{' (tenant)' if is_tenant else ''}")
 
     async def store_memory(
         self,
@@ -69,19 +268,111 @@ class QdrantLongTermMemory(LongTermMemoryPort):
         content: str,
         metadata: dict[str, Any],
     ) -> None:
+        await self.store_memories(
+            [MemoryDocument(memory_id=memory_id, embedding=embedding, content=content, metadata=metadata)]
+        )
+
+    async def store_memories(self, memories: list[MemoryDocument]) -> None:
+        """Upsert ``memories`` in requests of up to upsert_batch_size points."""
+        if not memories:
+            return
         await self.initialize()
         if self._client is None:
             return
-        payload = {"content": content, **metadata}
-        self._client.upsert(
-            collection_name=self._collection_name,
-            points=[
+
+        # Custom sharding: each request goes to one shard key
+        groups: dict[str | None, list[rest.PointStruct]] = {}
+        for memory in memories:
+            shard_key = self._shard_key(memory.metadata.get("user_id"), memory.metadata.get("session_id"))
+            groups.setdefault(shard_key, []).append(
                 rest.PointStruct(
-                    id=memory_id,
-                    vector=embedding,
-                    payload=payload,
+                    id=memory.memory_id,
+                    vector=memory.embedding,
+                    payload={"content": memory.content, **memory.metadata},
+                )
+            )
+        for shard_key, points in groups.items():
+            for start in range(0, len(points), self._upsert_batch_size):
+                await self._client.upsert(
+                    collection_name=self._collection_name,
+                    points=points[start:start + self._upsert_batch_size],
+                    shard_key_selector=shard_key,
+                )
+
+    async def count_memories_by_user(self, *, limit: int) -> dict[str, int]:
+        await self.initialize()
+        if self._client is None:
+            return {}
+        # Served from the user_id keyword index
+        response = await self._client.facet(
+            collection_name=self._collection_name,
+            key="user_id",
+            limit=limit,
+            exact=True,
+        )
+        return {str(hit.value): hit.count for hit in response.hits}
+
+    async def list_memories(self, *, user_id: str) -> list[MemoryDocument]:
+        await self.initialize()
+        if self._client is None:
+            return []
+
+        user_filter = rest.Filter(must=[rest.FieldCondition(key="user_id", match=rest.MatchValue(value=user_id))])
+        memories: list[MemoryDocument] = []
+        offset = None
+        while True:
+            points, offset = await self._client.scroll(
+                collection_name=self._collection_name,
+                scroll_filter=user_filter,
+                limit=self._upsert_batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+                shard_key_selector=self._shard_key(user_id, None),
+            )
+            for point in points:
+                payload = dict(point.payload or {})
+                memories.append(
+                    MemoryDocument(
+                        memory_id=str(point.id),
+                        embedding=self._point_vector(point.vector) or [],
+                        content=payload.pop("content", ""),
+                        metadata=payload,
+                    )
                 )
-            ],
+            if offset is None:
+                return memories
+
+    @staticmethod
+    def _point_vector(vector: Any) -> list[float] | None:
+        if isinstance(vector, dict):
+            vector = vector.get("")
+        return list(vector) if vector else None
+
+    async def delete_memories(self, memory_ids: list[str], *, user_id: str | None = None) -> None:
+        if not memory_ids:
+            return
+        await self.initialize()
+        if self._client is None:
+            return
+        await self._client.delete(
+            collection_name=self._collection_name,
+            points_selector=rest.PointIdsList(points=memory_ids),
+            shard_key_selector=self._shard_key(user_id, None),
+        )
+
+    async def mark_retrieved(self, memory_ids: list[str], *, user_id: str | None = None) -> None:
+        if not memory_ids:
+            return
+        await self.initialize()
+        if self._client is None:
+            return
+        await self._client.set_payload(
+            collection_name=self._collection_name,
+            payload={"last_retrieved_at": time.time()},
+            points=memory_ids,
+            wait=False,
+            shard_key_selector=self._shard_key(user_id, None),
         )
 
     async def search(
@@ -91,6 +382,7 @@ class QdrantLongTermMemory(LongTermMemoryPort):
         session_id: str | None,
         user_id: str | None,
         limit: int,
+        with_vectors: bool = False,
     ) -> list[MemorySearchResult]:
         await self.initialize()
         if self._client is None:
@@ -103,28 +395,34 @@ class QdrantLongTermMemory(LongTermMemoryPort):
             filters.append(rest.FieldCondition(key="session_id", match=rest.MatchValue(value=session_id)))
 
         query_filter = rest.Filter(must=filters) if filters else None
-        hits = self._client.search(
+        response = await self._client.query_points(
             collection_name=self._collection_name,
-            query_vector=embedding,
+            query=embedding,
             query_filter=query_filter,
+            search_params=self._search_params(),
+            # Without a user the memory may sit on any shard key
+            shard_key_selector=self._shard_key(user_id, None),
             limit=limit,
             with_payload=True,
+            with_vectors=with_vectors,
         )
 
         return [
             MemorySearchResult(
                 content=(hit.payload or {}).get("content", ""),
                 score=hit.score,
+                memory_id=str(hit.id),
                 session_id=(hit.payload or {}).get("session_id"),
                 user_id=(hit.payload or {}).get("user_id"),
                 source=(hit.payload or {}).get("source"),
                 metadata={k: v for k, v in (hit.payload or {}).items() if k != "content"},
+                embedding=self._point_vector(hit.vector) if with_vectors else None,
             )
-            for hit in hits
+            for hit in response.points
             if (hit.payload or {}).get("content")
         ]
 
     async def close(self) -> None:
         if self._client is not None:
-            self._client.close()
+            await self._client.close()
         self._initialized = False
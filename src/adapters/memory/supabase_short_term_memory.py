@@ -1,14 +1,20 @@
 """
 Supabase Short-Term Memory Adapter
 
-Stores recent conversation turns in a Supabase PostgreSQL table.
+Stores recent conversation turns in a Supabase PostgreSQL table:
+  - add_messages() writes any number of messages with one multi-row INSERT
+  - Reads ignore rows older than the TTL; a background sweeper deletes them
+    in bounded batches instead of every write running its own DELETE
+  - Rolling session summaries live in a companion ``<table>_summaries``
+    table, one row per session, expiring with the messages
 """
 
+import asyncio
+import contextvars
 import json
 
-import asyncpg
-
-from src.domain.models import MemoryRecord
+from src.domain.models import MemoryRecord, SessionSummary
+from src.observability.pool_metrics import InstrumentedPool, create_instrumented_pool, unregister_pool
 from src.ports.memory_port import ShortTermMemoryPort
 from src.settings import settings
 from src.utils.logging_config import get_logger
@@ -24,30 +30,54 @@ class SupabaseShortTermMemory(ShortTermMemoryPort):
         database_url: str | None = None,
         table_name: str | None = None,
         ttl_hours: int | None = None,
+        sweep_interval_seconds: float | None = None,
+        sweep_batch_size: int | None = None,
     ) -> None:
         self._database_url = database_url or settings.DATABASE_URL
         self._table_name = table_name or settings.SUPABASE_MEMORY_TABLE
+        self._summary_table = f"{self._table_name}_summaries"
         self._ttl_hours = ttl_hours or settings.SHORT_TERM_MEMORY_TTL_HOURS
-        self._pool: asyncpg.Pool | None = None
+        self._sweep_interval = (
+            settings.SHORT_TERM_MEMORY_SWEEP_INTERVAL_SECONDS
+            if sweep_interval_seconds is None
+            else sweep_interval_seconds
+        )
+        self._sweep_batch_size = sweep_batch_size or settings.SHORT_TERM_MEMORY_SWEEP_BATCH_SIZE
+        self._pool: InstrumentedPool | None = None
+        self._sweeper: asyncio.Task | None = None
+        self._init_lock = asyncio.Lock()
         self._initialized = False
 
     async def initialize(self) -> None:
         if self._initialized:
             return
 
-        if not self._database_url:
-            logger.warning("DATABASE_URL is not configured. Short-term memory is disabled.")
-            self._initialized = True
-            return
+        async with self._init_lock:
+            if self._initialized:
+                return
 
-        self._pool = await asyncpg.create_pool(self._database_url, min_size=1, max_size=5)
-        await self._ensure_schema()
-        self._initialized = True
-        logger.info("Supabase short-term memory initialized")
+            if not self._database_url:
+                logger.warning("DATABASE_URL is not configured. Short-term memory is disabled.")
+                self._initialized = True
+                return
+
+            if self._pool is None:
+                self._pool = await create_instrumented_pool(
+                    self._database_url,
+                    name="short_term_memory",
+                    min_size=settings.MEMORY_POOL_MIN_SIZE,
+                    max_size=settings.MEMORY_POOL_MAX_SIZE,
+                )
+            await self._ensure_schema()
+            if self._sweep_interval > 0:
+                # Not tied to the request whose first turn opened the store
+                self._sweeper = asyncio.create_task(self._sweep_loop(), context=contextvars.Context())
+            self._initialized = True
+            logger.info("Supabase short-term memory initialized")
 
     async def _ensure_schema(self) -> None:
         assert self._pool is not None
-        async with self._pool.acquire() as conn:
+        async with self._pool.acquire("ensure_schema") as conn:
             await conn.execute(
                 f"""
                 CREATE TABLE IF NOT EXISTS {self._table_name} (
@@ -68,37 +98,120 @@ class SupabaseShortTermMemory(ShortTermMemoryPort):
                 ON {self._table_name} (session_id, created_at DESC);
                 """
             )
+            # Expiry is a cross-session range on created_at, which the
+            # (session_id, created_at) index cannot serve. Built concurrently:
+            # the table may already be large and must stay writable meanwhile
+            index_name = f"idx_{self._table_name}_created_at"
+            # An interrupted concurrent build leaves an invalid index that IF NOT EXISTS would keep
+            if await conn.fetchval(
+                "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)",
+                index_name,
+            ):
+                await conn.execute(f"DROP INDEX CONCURRENTLY {index_name}")
+            await conn.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {self._table_name} (created_at)"
+            )
+            await conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self._summary_table} (
+                    session_id TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    covered_until TIMESTAMPTZ NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                );
+                """
+            )
 
     async def add_message(self, record: MemoryRecord) -> None:
+        await self.add_messages([record])
+
+    async def add_messages(self, records: list[MemoryRecord]) -> None:
+        """Insert ``records`` in order with a single multi-row INSERT."""
+        if not records:
+            return
         await self.initialize()
         if self._pool is None:
             return
         assert self._pool is not None
 
-        async with self._pool.acquire() as conn:
+        async with self._pool.acquire("add_messages") as conn:
             await conn.execute(
                 f"""
                 INSERT INTO {self._table_name}
                     (session_id, user_id, source, role, content, metadata, created_at)
-                VALUES ($1, $2, $3, $4, $5, $6::jsonb, $7);
+                SELECT session_id, user_id, source, role, content, metadata::jsonb, created_at
+                FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::text[], $6::text[], $7::timestamptz[])
+                    WITH ORDINALITY AS rows(session_id, user_id, source, role, content, metadata, created_at, position)
+                ORDER BY position;
                 """,
-                record.session_id,
-                record.user_id,
-                record.source,
-                record.role,
-                record.content,
-                json.dumps(record.metadata),
-                record.created_at,
+                [record.session_id for record in records],
+                [record.user_id for record in records],
+                [record.source for record in records],
+                [record.role for record in records],
+                [record.content for record in records],
+                [json.dumps(record.metadata) for record in records],
+                [record.created_at for record in records],
             )
+
+    async def sweep_expired(self) -> int:
+        """
+        Delete messages older than the TTL, at most sweep_batch_size rows per statement,
+        then expired session summaries.
+
+        Returns:
+            Number of rows deleted
+        """
+        await self.initialize()
+        if self._pool is None:
+            return 0
+        assert self._pool is not None
+
+        deleted = 0
+        while True:
+            async with self._pool.acquire("sweep_expired") as conn:
+                # SKIP LOCKED lets sweepers in several workers split the backlog
+                result = await conn.execute(
+                    f"""
+                    DELETE FROM {self._table_name}
+                    WHERE id IN (
+                        SELECT id FROM {self._table_name}
+                        WHERE created_at < NOW() - ($1::text || ' hours')::interval
+                        ORDER BY created_at
+                        LIMIT $2
+                        FOR UPDATE SKIP LOCKED
+                    );
+                    """,
+                    str(self._ttl_hours),
+                    self._sweep_batch_size,
+                )
+            batch = int(result.split()[-1])
+            deleted += batch
+            if batch < self._sweep_batch_size:
+                break
+            await asyncio.sleep(0)  # Let other work in between batches
+
+        # One row per session, so a single statement is enough
+        async with self._pool.acquire("sweep_expired_summaries") as conn:
             await conn.execute(
                 f"""
-                DELETE FROM {self._table_name}
-                WHERE session_id = $1
-                  AND created_at < NOW() - ($2::text || ' hours')::interval;
+                DELETE FROM {self._summary_table}
+                WHERE updated_at < NOW() - ($1::text || ' hours')::interval;
                 """,
-                record.session_id,
                 str(self._ttl_hours),
             )
+        return deleted
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                deleted = await self.sweep_expired()
+                if deleted:
+                    logger.info(f"Short-term memory sweep removed {deleted} expired messages.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Short-term memory sweep failed, retrying in {self._sweep_interval}s: {e}")
+            await asyncio.sleep(self._sweep_interval)
 
     async def get_recent_messages(
         self,
@@ -111,7 +224,7 @@ class SupabaseShortTermMemory(ShortTermMemoryPort):
             return []
         assert self._pool is not None
 
-        async with self._pool.acquire() as conn:
+        async with self._pool.acquire("get_recent_messages") as conn:
             rows = await conn.fetch(
                 f"""
                 SELECT session_id, user_id, source, role, content, metadata, created_at
@@ -140,8 +253,59 @@ class SupabaseShortTermMemory(ShortTermMemoryPort):
         ]
         return records
 
+    async def get_summary(self, session_id: str) -> SessionSummary | None:
+        await self.initialize()
+        if self._pool is None:
+            return None
+        assert self._pool is not None
+
+        async with self._pool.acquire("get_summary") as conn:
+            row = await conn.fetchrow(
+                f"""
+                SELECT session_id, content, covered_until, updated_at
+                FROM {self._summary_table}
+                WHERE session_id = $1
+                  AND updated_at >= NOW() - ($2::text || ' hours')::interval;
+                """,
+                session_id,
+                str(self._ttl_hours),
+            )
+        return SessionSummary(**dict(row)) if row else None
+
+    async def save_summary(self, summary: SessionSummary) -> None:
+        await self.initialize()
+        if self._pool is None:
+            return
+        assert self._pool is not None
+
+        async with self._pool.acquire("save_summary") as conn:
+            # Workers folding the same session race here; the summary covering more wins
+            await conn.execute(
+                f"""
+                INSERT INTO {self._summary_table} (session_id, content, covered_until, updated_at)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (session_id) DO UPDATE
+                SET content = EXCLUDED.content,
+                    covered_until = EXCLUDED.covered_until,
+                    updated_at = EXCLUDED.updated_at
+                WHERE {self._summary_table}.covered_until < EXCLUDED.covered_until;
+                """,
+                summary.session_id,
+                summary.content,
+                summary.covered_until,
+                summary.updated_at,
+            )
+
     async def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
         if self._pool is not None:
             await self._pool.close()
+            unregister_pool(self._pool.name)
             self._pool = None
         self._initialized = False
@@ -0,0 +1,5 @@
+"""
+Similarity Index Adapters
+
+In-process implementations of SimilarityIndexPort.
+"""
@@ -0,0 +1,290 @@
+"""
+NumPy Item Index
+
+In-process similarity engine for item names. Keeps one L2-normalized float32
+embedding per distinct item name in a contiguous matrix, answers queries with
+a single matmul plus argpartition top-k, and persists to a memory-mapped
+.npy file (plus a JSON sidecar) so restarts open the index instantly.
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.domain.models import Item
+from src.ports.similarity_index_port import IndexLoader, SimilarityIndexPort
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MATRIX_FILE = "item_index.npy"
+META_FILE = "item_index.json"
+
+
+class NumpyItemIndex(SimilarityIndexPort):
+    """Brute-force cosine index over distinct item names."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        dimension: Optional[int] = None,
+        model_name: Optional[str] = None,
+        refresh_seconds: Optional[float] = None,
+        overlap_ids: Optional[int] = None,
+    ):
+        """
+        Initialize NumPy item index.
+
+        Args:
+            directory: Where the .npy matrix and metadata live.
+                       Defaults to settings.SIMILARITY_INDEX_DIR
+            dimension: Embedding dimension. Defaults to settings.EMBEDDING_DIMENSION
+            model_name: Embedding model the vectors come from; a mismatch on load
+                        discards the persisted index. Defaults to settings.EMBEDDING_MODEL_NAME
+            refresh_seconds: Interval for catching up with the database (0 disables).
+                             Defaults to settings.SIMILARITY_INDEX_REFRESH_SECONDS
+            overlap_ids: Trailing id window re-read on every catch-up, so rows committed
+                         out of id order are not skipped.
+                         Defaults to settings.SIMILARITY_INDEX_SYNC_OVERLAP_IDS
+        """
+        self._directory = Path(directory or settings.SIMILARITY_INDEX_DIR)
+        self._dimension = dimension or settings.EMBEDDING_DIMENSION
+        self._model_name = model_name or settings.EMBEDDING_MODEL_NAME
+        self._refresh_seconds = (
+            settings.SIMILARITY_INDEX_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self._overlap_ids = (
+            settings.SIMILARITY_INDEX_SYNC_OVERLAP_IDS if overlap_ids is None else overlap_ids
+        )
+
+        self._matrix = np.zeros((0, self._dimension), dtype=np.float32)
+        self._size = 0
+        self._writable = True  # False while the matrix is the read-only mmap
+        self._names: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._prices: List[float] = []
+        self._dates: List[Optional[str]] = []
+        self._ids: List[int] = []  # Item id each row was last taken from (0 = unknown)
+        self._watermark = 0
+
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    async def load(self) -> None:
+        """Memory-map the persisted matrix; no copy is made until the first write."""
+        matrix_path = self._directory / MATRIX_FILE
+        meta_path = self._directory / META_FILE
+        if not matrix_path.exists() or not meta_path.exists():
+            logger.info("No persisted item index found; it will be built from the database.")
+            return
+
+        try:
+            meta = json.loads(meta_path.read_text())
+            if meta.get("model") != self._model_name or meta.get("dimension") != self._dimension:
+                logger.warning("Persisted item index was built with another embedding model; rebuilding.")
+                return
+
+            matrix = np.load(matrix_path, mmap_mode="r")
+            if matrix.shape != (len(meta["names"]), self._dimension):
+                logger.warning("Persisted item index is inconsistent; rebuilding.")
+                return
+
+            self._matrix = matrix
+            self._size = matrix.shape[0]
+            self._writable = False
+            self._names = meta["names"]
+            self._prices = meta["prices"]
+            self._dates = meta["dates"]
+            self._ids = meta.get("ids") or [0] * self._size
+            self._rows = {name: row for row, name in enumerate(self._names)}
+            self._watermark = meta.get("watermark", 0)
+            logger.info(f"Loaded item index with {self._size} names (watermark {self._watermark}).")
+
+        except Exception as e:
+            logger.error(f"Failed to load item index, rebuilding: {e}")
+
+    def _save(self, matrix: np.ndarray, meta: Dict[str, Any]) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        matrix_tmp = self._directory / f"{MATRIX_FILE}.tmp"
+        meta_tmp = self._directory / f"{META_FILE}.tmp"
+        with open(matrix_tmp, "wb") as f:
+            np.save(f, matrix)
+        meta_tmp.write_text(json.dumps(meta))
+        # Matrix first: a crash between the renames leaves a shape mismatch, which load() rejects
+        os.replace(matrix_tmp, self._directory / MATRIX_FILE)
+        os.replace(meta_tmp, self._directory / META_FILE)
+
+    async def flush(self) -> None:
+        """Write the index to disk if it changed."""
+        async with self._lock:
+            if not self._dirty:
+                return
+            matrix = np.array(self._matrix[: self._size])
+            meta = {
+                "model": self._model_name,
+                "dimension": self._dimension,
+                "watermark": self._watermark,
+                "names": list(self._names),
+                "prices": list(self._prices),
+                "dates": list(self._dates),
+                "ids": list(self._ids),
+            }
+            self._dirty = False
+        await asyncio.to_thread(self._save, matrix, meta)
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(settings.SIMILARITY_INDEX_FLUSH_SECONDS)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to persist item index: {e}")
+
+    # ── Updates ──────────────────────────────────────────────────────────────
+
+    def _ensure_capacity(self, extra: int) -> None:
+        needed = self._size + extra
+        if self._writable and needed <= self._matrix.shape[0]:
+            return
+        # Grow geometrically so appends stay amortized O(1); also detaches from the mmap
+        capacity = max(needed, 2 * self._matrix.shape[0], 1024)
+        grown = np.zeros((capacity, self._dimension), dtype=np.float32)
+        grown[: self._size] = self._matrix[: self._size]
+        self._matrix = grown
+        self._writable = True
+
+    def _upsert(self, items: List[Item]) -> int:
+        # Rows re-read by the overlap window must not overwrite a newer row for the same name
+        items = [
+            item for item in items
+            if item.item_name_embedding is not None
+            and (item.id is None or item.item_name not in self._rows or item.id > self._ids[self._rows[item.item_name]])
+        ]
+        if not items:
+            return 0
+
+        vectors = np.asarray([item.item_name_embedding for item in items], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        keep = norms[:, 0] > 0  # zero vectors are failed embeddings
+        vectors = vectors[keep] / norms[keep]
+        items = [item for item, ok in zip(items, keep) if ok]
+
+        self._ensure_capacity(len(items))
+        for item, vector in zip(items, vectors):
+            date = item.purchase_date.isoformat() if item.purchase_date else None
+            item_id = item.id or 0
+            row = self._rows.get(item.item_name)
+            if row is None:
+                row = self._size
+                self._size += 1
+                self._rows[item.item_name] = row
+                self._names.append(item.item_name)
+                self._prices.append(item.total_price)
+                self._dates.append(date)
+                self._ids.append(item_id)
+            else:
+                self._prices[row] = item.total_price
+                self._dates[row] = date
+                self._ids[row] = max(self._ids[row], item_id)
+            self._matrix[row] = vector
+        return len(items)
+
+    async def add_items(self, items: List[Item]) -> None:
+        """Insert or refresh entries for the items' names."""
+        async with self._lock:
+            if self._upsert(items):
+                self._dirty = True
+        self._schedule_flush()
+
+    async def sync(self, loader: IndexLoader) -> None:
+        """Catch up from the database now, then every refresh_seconds."""
+        await self._catch_up(loader)
+        if self._refresh_seconds > 0 and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh_loop(loader))
+
+    async def _catch_up(self, loader: IndexLoader) -> None:
+        # Ids are assigned at insert but become visible at commit, so a row below the
+        # watermark can appear late; re-read a trailing window and skip rows already held
+        watermark, items = await loader(max(0, self._watermark - self._overlap_ids))
+        async with self._lock:
+            added = self._upsert(items)
+            if watermark > self._watermark or added:
+                self._watermark = max(self._watermark, watermark)
+                self._dirty = True
+        if added:
+            logger.info(f"Item index caught up: {added} names updated, {self._size} total.")
+        self._schedule_flush()
+
+    async def _refresh_loop(self, loader: IndexLoader) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_seconds)
+            try:
+                await self._catch_up(loader)
+            except Exception as e:
+                logger.warning(f"Item index refresh failed: {e}")
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _top_k(matrix: np.ndarray, query: np.ndarray, limit: int) -> tuple[np.ndarray, np.ndarray]:
+        scores = matrix @ query
+        k = min(limit, scores.shape[0])
+        if k < scores.shape[0]:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(scores.shape[0])
+        order = candidates[np.argsort(-scores[candidates])]
+        return order, scores[order]
+
+    async def search(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """Cosine top-k over all indexed names."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if self._size == 0 or norm == 0 or limit <= 0:
+            return []
+        query = query / norm
+
+        # Snapshot: later appends write past _size and growth swaps in a new array
+        matrix = self._matrix[: self._size]
+        names, prices, dates = self._names, self._prices, self._dates
+        if self._size > settings.SIMILARITY_INDEX_INLINE_MAX_ROWS:
+            rows, scores = await asyncio.to_thread(self._top_k, matrix, query, limit)
+        else:
+            rows, scores = self._top_k(matrix, query, limit)
+
+        return [
+            {
+                "item_name": names[row],
+                "similarity_score": float(score),
+                "total_price": float(prices[row]),
+                "purchase_date": dates[row],
+            }
+            for row, score in zip(rows.tolist(), scores.tolist())
+        ]
+
+    async def close(self) -> None:
+        for task in (self._refresh_task, self._flush_task):
+            if task is not None:
+                task.cancel()
+        self._refresh_task = self._flush_task = None
+        await self.flush()
+
+    @property
+    def size(self) -> int:
+        return self._size
@@ -2,43 +2,35 @@
 Database Analyst Agent 
 """
 
+import asyncio
 import json
 import time
 
 from src.utils.logging_config import get_logger
 from src.config.containers import get_llm_provider, get_async_database, get_embedding_provider
 from src.domain.models import Message, ChatRequest
+from src.ports.database_port import SQLDialect
 from src.observability.langfuse import observe, trace_attributes
 
 logger = get_logger(__name__)
 
-ITEMS_TABLE_SCHEMA = """
-TABLE: items
-  - id              SERIAL PRIMARY KEY
-  - receipt_id      INTEGER NOT NULL
-  - item_name       TEXT NOT NULL
-  - quantity        REAL NOT NULL
-  - unit_price      REAL NOT NULL
-  - total_price     REAL NOT NULL
-  - purchase_date   TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-  - item_name_embedding  vector(768)
-"""
+ANALYST_SYSTEM_PROMPT = """You are a database analyst. Answer spending questions by using your tools.
 
-ANALYST_SYSTEM_PROMPT = f"""You are a database analyst. Answer spending questions by using your tools.
+SQL dialect: {dialect.name}
 
 Schema:
-{ITEMS_TABLE_SCHEMA}
+{dialect.items_schema}
 
 QUESTION TYPES and how to handle each:
 
 1. ITEM LOOKUP — "How much did I spend on rice?"
    → Call search_similar_items first to find the exact DB spelling.
-   → Then execute_sql_query using those exact names with ILIKE.
+   → Then execute_sql_query using those exact names with {dialect.text_match}.
 
 2. AGGREGATION — "What is my total spending this month?" / "How much did I spend last week?"
    → Skip search_similar_items. Go directly to execute_sql_query.
-   → Use date functions: DATE_TRUNC, CURRENT_DATE, intervals.
-   → Example: WHERE purchase_date >= DATE_TRUNC('month', CURRENT_DATE)
+   → Use date functions: {dialect.date_functions}.
+   → Example: {dialect.this_month_filter}
 
 3. TOP-N / RANKING — "What are my 5 most expensive items?" / "Which item do I buy most often?"
    → Skip search_similar_items. Go directly to execute_sql_query.
@@ -50,7 +42,7 @@ QUESTION TYPES and how to handle each:
 
 5. TREND / TIME-SERIES — "How has my grocery spending changed over the past 3 months?"
    → Skip search_similar_items. Go directly to execute_sql_query.
-   → Use DATE_TRUNC('month', purchase_date) and GROUP BY month.
+   → Use {dialect.month_bucket} and GROUP BY month.
 
 6. CATEGORY BROWSE — "Show me all dairy items I bought."
    → Call search_similar_items with the category name to find related items.
@@ -58,12 +50,19 @@ QUESTION TYPES and how to handle each:
 
 RULES:
 - Only SELECT queries. Never INSERT, UPDATE, DELETE.
+- Write {dialect.name} SQL; other dialects' functions will fail.
 - No fabricated data. Only return what the DB contains.
-- For date ranges, always use parameterised intervals, not hardcoded dates.
+- For date ranges, always use relative date expressions, not hardcoded dates.
 - Return amounts formatted as currency where relevant.
 - If no results found, say so clearly — do not guess.
 """
 
+
+def analyst_system_prompt(dialect: SQLDialect) -> str:
+    """The analyst's system prompt for the database's SQL dialect."""
+    return ANALYST_SYSTEM_PROMPT.format(dialect=dialect)
+
+
 ANALYST_TOOLS = [
     {
         "type": "function",
@@ -100,7 +99,7 @@ ANALYST_TOOLS = [
             "description": (
                 "Execute a read-only SQL SELECT query against the 'items' table. "
                 "Supports all SELECT features: GROUP BY, ORDER BY, LIMIT, date functions, "
-                "SUM, COUNT, AVG, MIN, MAX, CASE expressions, DATE_TRUNC, intervals. "
+                "SUM, COUNT, AVG, MIN, MAX, CASE expressions, in the dialect named in the system prompt. "
                 "Use exact item names from search_similar_items when querying by name, "
                 "or write aggregation/trend queries directly without a prior search."
             ),
@@ -152,44 +151,30 @@ ANALYST_TOOLS = [
 ]
 
 
-PERIOD_SQL = {
-    "today":       "purchase_date::date = CURRENT_DATE",
-    "this_week":   "purchase_date >= DATE_TRUNC('week', CURRENT_DATE)",
-    "this_month":  "purchase_date >= DATE_TRUNC('month', CURRENT_DATE)",
-    "last_month":  (
-        "purchase_date >= DATE_TRUNC('month', CURRENT_DATE - INTERVAL '1 month') "
-        "AND purchase_date < DATE_TRUNC('month', CURRENT_DATE)"
-    ),
-    "this_year":   "purchase_date >= DATE_TRUNC('year', CURRENT_DATE)",
-    "last_7_days": "purchase_date >= CURRENT_DATE - INTERVAL '7 days'",
-    "last_30_days":"purchase_date >= CURRENT_DATE - INTERVAL '30 days'",
-}
-
-GROUP_BY_SQL = {
-    "none":      ("SUM(total_price) AS total_spent, COUNT(*) AS item_count", ""),
-    "day":       ("DATE_TRUNC('day', purchase_date) AS period, SUM(total_price) AS total_spent", "GROUP BY period ORDER BY period"),
-    "week":      ("DATE_TRUNC('week', purchase_date) AS period, SUM(total_price) AS total_spent", "GROUP BY period ORDER BY period"),
-    "month":     ("DATE_TRUNC('month', purchase_date) AS period, SUM(total_price) AS total_spent", "GROUP BY period ORDER BY period"),
-    "item_name": ("item_name, SUM(total_price) AS total_spent, COUNT(*) AS times_bought", "GROUP BY item_name ORDER BY total_spent DESC"),
-}
-
-
 async def _generate_query_embedding(text: str):
     start_time = time.time()
     try:
         embedding_provider = get_embedding_provider()
         embedding = await embedding_provider.generate_embedding(text)
         logger.debug(f"Embedding generated in {time.time() - start_time:.3f}s")
-        return embedding
+        # Providers fall back to a zero vector on failure; it matches nothing meaningfully
+        return embedding if any(embedding) else None
     except Exception as e:
         logger.error(f"Embedding failed: {e}")
-        return [0.0] * 768
+        return None
     
 async def _handle_search_similar_items(db, args: dict, start_time: float) -> str:
     query = args.get("query", "")
     limit = args.get("limit", 5)
 
     embedding = await _generate_query_embedding(query)
+    if embedding is None:
+        logger.warning(f"search_similar_items: no embedding for '{query}', similarity search unavailable")
+        return json.dumps({
+            "status": "error",
+            "message": "Similarity search is unavailable right now. "
+                       f"Match item names with {db.sql_dialect.text_match} '%{query}%' in execute_sql_query instead.",
+        })
     results = await db.search_similar_items(query_embedding=embedding, limit=limit)
     elapsed = time.time() - start_time
 
@@ -220,11 +205,12 @@ async def _handle_get_spending_summary(db, args: dict, start_time: float) -> str
     period   = args.get("period", "this_month")
     group_by = args.get("group_by", "none")
 
-    where_clause = PERIOD_SQL.get(period)
+    dialect = db.sql_dialect
+    where_clause = dialect.periods.get(period)
     if not where_clause:
         return json.dumps({"status": "error", "message": f"Unknown period: {period}"})
 
-    select_cols, group_order = GROUP_BY_SQL.get(group_by, GROUP_BY_SQL["none"])
+    select_cols, group_order = dialect.group_by.get(group_by, dialect.group_by["none"])
     sql = f"SELECT {select_cols} FROM items WHERE {where_clause} {group_order}".strip()
 
     logger.info(f"get_spending_summary: period={period}, group_by={group_by}")
@@ -281,7 +267,7 @@ async def ask_analyst(
         metadata={"source": source, "agent": "database_analyst"},
     ):
         messages = [
-            Message(role="system", content=ANALYST_SYSTEM_PROMPT),
+            Message(role="system", content=analyst_system_prompt(get_async_database().sql_dialect)),
             Message(role="user", content=user_question),
         ]
 
@@ -296,7 +282,7 @@ async def ask_analyst(
                 tool_choice="required" if iteration == 0 else "auto",
             )
 
-            response = llm_provider.chat_completion(chat_request)
+            response = await asyncio.to_thread(llm_provider.chat_completion, chat_request)
 
             if not response.tool_calls:
                 total_elapsed = time.time() - start_time
@@ -324,7 +310,8 @@ async def ask_analyst(
 
         logger.warning("[Analyst] Max iterations reached, summarising...")
         messages.append(Message(role="user", content="Please summarise whatever results you have so far."))
-        final_response = llm_provider.chat_completion(
-            ChatRequest(messages=messages, model=llm_provider.get_model_name())
+        final_response = await asyncio.to_thread(
+            llm_provider.chat_completion,
+            ChatRequest(messages=messages, model=llm_provider.get_model_name()),
         )
         return final_response.content or "Could not complete the analysis."
@@ -7,12 +7,15 @@ The Main Agent acts as a router and communicator:
 - Formats all responses in a friendly, conversational tone
 """
 
+import asyncio
 import json
 import time
 from src.utils.logging_config import get_logger
 from src.config.containers import get_llm_provider, get_async_database, get_memory_manager
 from src.domain.models import Receipt, Message, ChatRequest
 from src.agents.database_analyst_agent import ask_analyst
+from src.adapters.database.routing import database_session
+from src.adapters.embedding.turn_scoped_embedding_adapter import embedding_turn
 from src.observability.langfuse import observe, trace_attributes, trace_url
 
 logger = get_logger(__name__)
@@ -126,7 +129,7 @@ async def process_user_input(
             user_id=user_id,
             session_id=session_id,
             metadata={"source": source, "agent": "main"},
-        ):
+        ), database_session(session_id), embedding_turn():
             return await _process_user_input_impl(
                 user_input,
                 source=source,
@@ -157,18 +160,27 @@ async def _process_user_input_impl(
 
         logger.debug(f"LLM provider: {llm_provider.get_model_name()}")
 
-        # Ensure DB connection is active
-        if db.pool is None:
-            logger.info("Database pool not initialized, connecting...")
-            await db.connect()
-
-        try:
-            memory_messages, long_term_context = await memory_manager.build_context(
+        # Memory context does not need the database; build it while the pool connects
+        context_task = asyncio.create_task(
+            memory_manager.build_context(
                 session_id=session_id,
                 user_id=user_id,
                 source=source,
                 user_input=user_input,
             )
+        )
+
+        # Ensure DB connection is active
+        try:
+            if db.pool is None:
+                logger.info("Database pool not initialized, connecting...")
+                await db.connect()
+        except BaseException:
+            context_task.cancel()
+            raise
+
+        try:
+            memory_messages, long_term_context = await context_task
         except Exception as exc:
             logger.warning(f"Memory context retrieval failed, continuing without memory: {exc}")
             memory_messages, long_term_context = [], None
@@ -198,7 +210,8 @@ async def _process_user_input_impl(
         )
 
         logger.debug("Sending request to LLM...")
-        response = llm_provider.chat_completion(chat_request)
+        # LLM adapters are synchronous; keep them off the event loop so webhooks are still acknowledged
+        response = await asyncio.to_thread(llm_provider.chat_completion, chat_request)
         current_trace_url = trace_url()
         if current_trace_url:
             logger.info(f"Langfuse trace: {current_trace_url}")
@@ -220,7 +233,7 @@ async def _process_user_input_impl(
                 logger.info(f"LLM decided to call tool: {function_name}")
 
                 if function_name == "save_data_to_db":
-                    result = await _handle_save_receipt(function_args)
+                    result = await _handle_save_receipt(function_args, user_id=user_id)
                     await _store_memory_turn_safe(
                         memory_manager,
                         session_id=session_id,
@@ -291,12 +304,14 @@ async def _store_memory_turn_safe(
         logger.warning(f"Memory persistence failed, continuing without blocking the response: {exc}")
 
 
-async def _handle_save_receipt(function_args: dict) -> str:
+async def _handle_save_receipt(function_args: dict, *, user_id: str | None = None) -> str:
     """Handle the save_data_to_db tool call using the async PostgreSQL adapter."""
     db = get_async_database()
 
     try:
         receipt = Receipt(**function_args)
+        # Ownership comes from the interface, never from the LLM's arguments
+        receipt.user_id = user_id
         logger.info(
             f"Saving receipt {receipt.receipt_id} with {len(receipt.items)} items: "
             f"{', '.join([item.item_name for item in receipt.items])}"
@@ -386,7 +401,7 @@ async def _handle_ask_analyst(
     logger.debug("Requesting LLM to format analyst response...")
     format_start = time.time()
 
-    final_response = llm_provider.chat_completion(final_request)
+    final_response = await asyncio.to_thread(llm_provider.chat_completion, final_request)
 
     format_elapsed = time.time() - format_start
     if final_response.usage:
@@ -5,6 +5,7 @@ Uses dependency-injector for professional DI management.
 Provides singleton instances of all providers based on configuration.
 """
 
+import asyncio
 import logging
 
 from dependency_injector import containers, providers
@@ -25,10 +26,23 @@ from src.adapters.tts.elevenlabs_adapter import ElevenLabsTTSAdapter
 from src.adapters.vision.groq_vision_adapter import GroqVisionAdapter
 from src.adapters.database.sqlite_adapter import SQLiteDatabaseAdapter
 from src.adapters.database.postgres_adapter import PostgresAdapter
+from src.adapters.database.async_sqlite_adapter import AsyncSQLiteAdapter
+from src.adapters.database.embedding_backfill import EmbeddingBackfillWorker
+from src.adapters.similarity.numpy_item_index import NumpyItemIndex
+from src.adapters.analytics.duckdb_items_mirror import DuckDBItemsMirror
 from src.adapters.embedding.gemini_embedding_adapter import GeminiEmbeddingAdapter
+from src.adapters.embedding.local_embedding_adapter import LocalEmbeddingAdapter
+from src.adapters.embedding.cached_embedding_adapter import CachedEmbeddingAdapter
+from src.adapters.embedding.coalescing_embedding_adapter import CoalescingEmbeddingAdapter
+from src.adapters.embedding.turn_scoped_embedding_adapter import TurnScopedEmbeddingAdapter
 from src.adapters.memory.supabase_short_term_memory import SupabaseShortTermMemory
+from src.adapters.memory.cached_short_term_memory import CachedShortTermMemory, PostgresSessionInvalidation
 from src.adapters.memory.qdrant_long_term_memory import QdrantLongTermMemory
+from src.adapters.memory.local_long_term_memory import LocalLongTermMemory
 from src.adapters.memory.memory_manager import MemoryManager, configure_memory_manager
+from src.adapters.memory.memory_write_queue import MemoryWriteQueue
+from src.adapters.memory.conversation_summary import ConversationSummarizer
+from src.adapters.memory.memory_consolidation import MemoryConsolidationJob
 
 from src.settings import settings
 
@@ -74,35 +88,220 @@ class Container(containers.DeclarativeContainer):
     )
     
     # Embedding Provider Factory
-    embedding_provider = providers.Selector(
+    base_embedding_provider = providers.Selector(
         config.embedding_provider,
         gemini=providers.Singleton(
             GeminiEmbeddingAdapter,
             model_name=settings.EMBEDDING_MODEL_NAME,
             output_dimensionality=settings.EMBEDDING_DIMENSION,
         ),
+        local=providers.Singleton(
+            LocalEmbeddingAdapter,
+            output_dimensionality=settings.EMBEDDING_DIMENSION,
+            workers=settings.LOCAL_EMBEDDING_WORKERS,
+        ),
+    )
+
+    # Micro-batching of concurrent single-text requests into batched provider calls
+    batched_embedding_provider = providers.Selector(
+        config.embedding_coalesce,
+        enabled=providers.Singleton(
+            CoalescingEmbeddingAdapter,
+            provider=base_embedding_provider,
+            window_ms=settings.EMBEDDING_COALESCE_WINDOW_MS,
+            max_batch=settings.EMBEDDING_COALESCE_MAX_BATCH,
+            request_timeout=settings.EMBEDDING_REQUEST_TIMEOUT_SECONDS,
+        ),
+        disabled=base_embedding_provider,
     )
 
-    # Async Database Provider (PostgreSQL with pgvector)
+    # Embedding cache (memory LRU + SQLite) in front of the batched provider,
+    # so only cache misses reach the coalescer
+    cached_embedding_provider = providers.Selector(
+        config.embedding_cache,
+        enabled=providers.Singleton(
+            CachedEmbeddingAdapter,
+            provider=batched_embedding_provider,
+            memory_size=settings.EMBEDDING_CACHE_MEMORY_SIZE,
+            disk_path=settings.EMBEDDING_CACHE_PATH,
+            disk_max_entries=settings.EMBEDDING_CACHE_DISK_MAX_ENTRIES,
+        ),
+        disabled=batched_embedding_provider,
+    )
+
+    # Outermost layer: a text is embedded at most once per conversation turn
+    # (memory, analyst and database adapter share vectors inside embedding_turn())
+    embedding_provider = providers.Singleton(
+        TurnScopedEmbeddingAdapter,
+        provider=cached_embedding_provider,
+    )
+
+    # Async Database Provider (PostgreSQL with pgvector, or SQLite for single-node deployments)
     # Note: embedding_provider is injected via factory below
-    async_database = providers.Singleton(
-        PostgresAdapter,
-        database_url=settings.DATABASE_URL,
+    async_database = providers.Selector(
+        config.database_provider,
+        postgres=providers.Singleton(
+            PostgresAdapter,
+            database_url=settings.DATABASE_URL,
+        ),
+        sqlite=providers.Singleton(
+            AsyncSQLiteAdapter,
+            db_path=settings.SQLITE_DATABASE_PATH,
+        ),
+    )
+
+    # Background embedding of pending items and re-embedding after model changes
+    embedding_backfill = providers.Selector(
+        config.embedding_backfill,
+        enabled=providers.Singleton(
+            EmbeddingBackfillWorker,
+            provider=embedding_provider,
+            batch_size=settings.EMBEDDING_BACKFILL_BATCH_SIZE,
+            rate_per_second=settings.EMBEDDING_BACKFILL_RATE_PER_SECOND,
+            interval_seconds=settings.EMBEDDING_BACKFILL_INTERVAL_SECONDS,
+        ),
+        disabled=providers.Object(None),
     )
 
-    short_term_memory = providers.Singleton(
+    # Similarity engine behind AsyncDatabasePort.search_similar_items
+    # ("database" keeps the adapter's own vector search)
+    similarity_index = providers.Selector(
+        config.similarity_engine,
+        database=providers.Object(None),
+        numpy=providers.Singleton(
+            NumpyItemIndex,
+            directory=settings.SIMILARITY_INDEX_DIR,
+            # The active provider's model, so switching to local embeddings rebuilds the index
+            model_name=embedding_provider.provided.get_model_name.call(),
+            refresh_seconds=settings.SIMILARITY_INDEX_REFRESH_SECONDS,
+            overlap_ids=settings.SIMILARITY_INDEX_SYNC_OVERLAP_IDS,
+        ),
+    )
+
+    # Columnar mirror serving aggregate analyst queries ("none" keeps them on the database)
+    analytics_engine = providers.Selector(
+        config.analytics_engine,
+        none=providers.Object(None),
+        duckdb=providers.Singleton(
+            DuckDBItemsMirror,
+            path=settings.ANALYTICS_DUCKDB_PATH,
+        ),
+    )
+
+    base_short_term_memory = providers.Singleton(
         SupabaseShortTermMemory,
         database_url=settings.DATABASE_URL,
         table_name=settings.SUPABASE_MEMORY_TABLE,
         ttl_hours=settings.SHORT_TERM_MEMORY_TTL_HOURS,
+        sweep_interval_seconds=settings.SHORT_TERM_MEMORY_SWEEP_INTERVAL_SECONDS,
+        sweep_batch_size=settings.SHORT_TERM_MEMORY_SWEEP_BATCH_SIZE,
+    )
+
+    # Tells other workers which sessions were written so they drop cached history
+    short_term_invalidation = providers.Selector(
+        config.short_term_cache_invalidation,
+        none=providers.Object(None),
+        postgres=providers.Singleton(
+            PostgresSessionInvalidation,
+            database_url=settings.DATABASE_URL,
+            listen_url=settings.SHORT_TERM_CACHE_LISTEN_URL,
+            channel=settings.SHORT_TERM_CACHE_CHANNEL,
+        ),
     )
 
-    long_term_memory = providers.Singleton(
-        QdrantLongTermMemory,
-        url=settings.QDRANT_URL,
-        api_key=settings.QDRANT_API_KEY,
-        collection_name=settings.QDRANT_COLLECTION_NAME,
-        vector_size=settings.MEMORY_EMBEDDING_DIMENSION,
+    # Per-session ring buffers in front of Supabase, sized to cover the summarizer's
+    # reads (keep + 2 * fold messages when folding) as well as the plain history window
+    short_term_memory = providers.Selector(
+        config.short_term_cache,
+        enabled=providers.Singleton(
+            CachedShortTermMemory,
+            memory=base_short_term_memory,
+            capacity=max(
+                settings.SHORT_TERM_MEMORY_LIMIT,
+                settings.SHORT_TERM_SUMMARY_KEEP_MESSAGES + 2 * settings.SHORT_TERM_SUMMARY_FOLD_MESSAGES
+                if settings.SHORT_TERM_SUMMARY_ENABLED
+                else 0,
+            ),
+            max_sessions=settings.SHORT_TERM_CACHE_MAX_SESSIONS,
+            ttl_hours=settings.SHORT_TERM_MEMORY_TTL_HOURS,
+            invalidation=short_term_invalidation,
+        ),
+        disabled=base_short_term_memory,
+    )
+
+    # Rolling per-session summary replacing older raw history in the prompt
+    conversation_summarizer = providers.Selector(
+        config.short_term_summary,
+        enabled=providers.Singleton(
+            ConversationSummarizer,
+            short_term_memory=short_term_memory,
+            llm_provider=llm_provider,
+            keep_messages=settings.SHORT_TERM_SUMMARY_KEEP_MESSAGES,
+            fold_messages=settings.SHORT_TERM_SUMMARY_FOLD_MESSAGES,
+            max_chars=settings.SHORT_TERM_SUMMARY_MAX_CHARS,
+            max_sessions=settings.SHORT_TERM_CACHE_MAX_SESSIONS,
+            cache_ttl_seconds=settings.SHORT_TERM_SUMMARY_CACHE_SECONDS,
+        ),
+        disabled=providers.Object(None),
+    )
+
+    # Long-term memory: Qdrant, or an in-process NumPy store persisted under LOCAL_MEMORY_DIR
+    long_term_memory = providers.Selector(
+        config.long_term_memory_provider,
+        qdrant=providers.Singleton(
+            QdrantLongTermMemory,
+            url=settings.QDRANT_URL,
+            api_key=settings.QDRANT_API_KEY,
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            vector_size=settings.MEMORY_EMBEDDING_DIMENSION,
+            prefer_grpc=settings.QDRANT_PREFER_GRPC,
+            grpc_port=settings.QDRANT_GRPC_PORT,
+            upsert_batch_size=settings.QDRANT_UPSERT_BATCH_SIZE,
+            quantization=settings.QDRANT_QUANTIZATION,
+            on_disk=settings.QDRANT_ON_DISK_VECTORS,
+            hnsw_m=settings.QDRANT_HNSW_M,
+            hnsw_ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT,
+            tenant_shard_keys=settings.QDRANT_TENANT_SHARD_KEYS,
+        ),
+        local=providers.Singleton(
+            LocalLongTermMemory,
+            directory=settings.LOCAL_MEMORY_DIR,
+            vector_size=settings.MEMORY_EMBEDDING_DIMENSION,
+            compact_every=settings.LOCAL_MEMORY_COMPACT_EVERY,
+            fsync=settings.LOCAL_MEMORY_FSYNC,
+        ),
+    )
+
+    # Background writer for finished turns ("disabled" writes them before the reply)
+    memory_write_queue = providers.Selector(
+        config.memory_write_behind,
+        enabled=providers.Singleton(
+            MemoryWriteQueue,
+            max_size=settings.MEMORY_WRITE_QUEUE_SIZE,
+            batch_size=settings.MEMORY_WRITE_BATCH_SIZE,
+            linger_ms=settings.MEMORY_WRITE_LINGER_MS,
+            drain_timeout=settings.MEMORY_WRITE_DRAIN_TIMEOUT_SECONDS,
+        ),
+        disabled=providers.Object(None),
+    )
+
+    # Merges near-duplicate long-term memories and caps memories per user
+    memory_consolidation = providers.Selector(
+        config.memory_consolidation,
+        enabled=providers.Singleton(
+            MemoryConsolidationJob,
+            long_term_memory=long_term_memory,
+            embedding_provider=embedding_provider,
+            llm_provider=llm_provider,
+            summarizer=settings.MEMORY_CONSOLIDATION_SUMMARIZER,
+            similarity_threshold=settings.MEMORY_CONSOLIDATION_SIMILARITY,
+            min_age_hours=settings.MEMORY_CONSOLIDATION_MIN_AGE_HOURS,
+            max_per_user=settings.MEMORY_MAX_PER_USER,
+            users_per_run=settings.MEMORY_CONSOLIDATION_USERS_PER_RUN,
+            llm_batch_size=settings.MEMORY_CONSOLIDATION_LLM_BATCH,
+            interval_seconds=settings.MEMORY_CONSOLIDATION_INTERVAL_SECONDS,
+        ),
+        disabled=providers.Object(None),
     )
 
     memory_manager = providers.Singleton(
@@ -114,6 +313,16 @@ class Container(containers.DeclarativeContainer):
         long_term_top_k=settings.MEMORY_TOP_K,
         min_content_length=settings.MEMORY_MIN_CONTENT_LENGTH,
         enabled=settings.MEMORY_ENABLED,
+        short_term_timeout=settings.MEMORY_SHORT_TERM_TIMEOUT_SECONDS,
+        long_term_timeout=settings.MEMORY_LONG_TERM_TIMEOUT_SECONDS,
+        write_queue=memory_write_queue,
+        consolidation=memory_consolidation,
+        min_score=settings.MEMORY_MIN_SIMILARITY,
+        mmr_lambda=settings.MEMORY_MMR_LAMBDA,
+        recency_weight=settings.MEMORY_RECENCY_WEIGHT,
+        recency_half_life_days=settings.MEMORY_RECENCY_HALF_LIFE_DAYS,
+        candidate_factor=settings.MEMORY_CANDIDATE_FACTOR,
+        summarizer=conversation_summarizer,
     )
 
 
@@ -125,10 +334,24 @@ container.config.tts_provider.from_value(settings.TTS_PROVIDER.lower())
 container.config.vision_provider.from_value(settings.VISION_PROVIDER.lower())
 container.config.database_provider.from_value(settings.DATABASE_PROVIDER.lower())
 container.config.embedding_provider.from_value(settings.EMBEDDING_PROVIDER.lower())
-
-# Wire embedding provider into PostgresAdapter
+container.config.embedding_coalesce.from_value("enabled" if settings.EMBEDDING_COALESCE_ENABLED else "disabled")
+container.config.embedding_cache.from_value("enabled" if settings.EMBEDDING_CACHE_ENABLED else "disabled")
+container.config.embedding_backfill.from_value("enabled" if settings.EMBEDDING_BACKFILL_ENABLED else "disabled")
+container.config.similarity_engine.from_value(settings.SIMILARITY_ENGINE.lower())
+container.config.analytics_engine.from_value(settings.ANALYTICS_ENGINE.lower())
+container.config.short_term_cache.from_value("enabled" if settings.SHORT_TERM_CACHE_ENABLED else "disabled")
+container.config.short_term_cache_invalidation.from_value(settings.SHORT_TERM_CACHE_INVALIDATION.lower())
+container.config.short_term_summary.from_value("enabled" if settings.SHORT_TERM_SUMMARY_ENABLED else "disabled")
+container.config.long_term_memory_provider.from_value(settings.LONG_TERM_MEMORY_PROVIDER.lower())
+container.config.memory_consolidation.from_value("enabled" if settings.MEMORY_CONSOLIDATION_ENABLED else "disabled")
+container.config.memory_write_behind.from_value("enabled" if settings.MEMORY_WRITE_BEHIND_ENABLED else "disabled")
+
+# Wire embedding provider, backfill, similarity engine and analytics mirror into the async database adapter
 _db_instance = container.async_database()
 _db_instance.set_embedding_provider(container.embedding_provider())
+_db_instance.set_embedding_backfill(container.embedding_backfill())
+_db_instance.set_similarity_index(container.similarity_index())
+_db_instance.set_analytics_engine(container.analytics_engine())
 configure_memory_manager(container.memory_manager())
 
 logger.info(
@@ -136,6 +359,7 @@ logger.info(
     f"LLM: {settings.LLM_PROVIDER} | STT: {settings.STT_PROVIDER} | "
     f"TTS: {settings.TTS_PROVIDER} | Vision: {settings.VISION_PROVIDER} | "
     f"Embedding: {settings.EMBEDDING_PROVIDER} | Database: {settings.DATABASE_PROVIDER} | "
+    f"Similarity: {settings.SIMILARITY_ENGINE} | Analytics: {settings.ANALYTICS_ENGINE} | "
     f"Memory: {'enabled' if settings.MEMORY_ENABLED else 'disabled'}"
 )
 
@@ -167,7 +391,7 @@ def get_database() -> DatabasePort:
 
 
 def get_async_database() -> AsyncDatabasePort:
-    """Get async database instance (PostgreSQL with pgvector)."""
+    """Get async database instance (PostgreSQL with pgvector, or SQLite)."""
     return container.async_database()
 
 
@@ -176,6 +400,13 @@ def get_embedding_provider() -> EmbeddingPort:
     return container.embedding_provider()
 
 
+async def close_embedding_cache() -> None:
+    """Write pending recency updates and close the embedding cache's disk tier (no-op when disabled)."""
+    if settings.EMBEDDING_CACHE_ENABLED:
+        # close() waits for the cache's disk thread to finish
+        await asyncio.to_thread(container.cached_embedding_provider().close)
+
+
 def get_short_term_memory() -> ShortTermMemoryPort:
     """Get configured short-term memory instance."""
     return container.short_term_memory()
@@ -6,6 +6,7 @@ of any external services or infrastructure concerns.
 """
 
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 from typing import List, Optional, Dict, Any
 from enum import Enum
 from datetime import datetime, timezone
@@ -13,6 +14,12 @@ from datetime import datetime, timezone
 
 class Item(BaseModel):
     """Purchase item domain model"""
+    # SkipJsonSchema keeps these out of the tool schema the LLM fills; exclude only affects dumps
+    id: SkipJsonSchema[Optional[int]] = Field(
+        default=None,
+        description="Database row id (assigned on save)",
+        exclude=True,
+    )
     item_name: str = Field(description="The name of the purchased item")
     quantity: float = Field(description="The quantity of the item purchased")
     unit_price: float = Field(description="The price of a single unit")
@@ -21,10 +28,10 @@ class Item(BaseModel):
         default=None,
         description="Timestamp of the purchase (defaults to current time on save)"
     )
-    item_name_embedding: Optional[List[float]] = Field(
+    item_name_embedding: SkipJsonSchema[Optional[List[float]]] = Field(
         default=None,
         description="768-dim embedding vector for the item name (auto-generated)",
-        exclude=True,  # Exclude from JSON schema so LLM doesn't try to fill it
+        exclude=True,
     )
 
 
@@ -32,6 +39,37 @@ class Receipt(BaseModel):
     """Receipt containing multiple items"""
     receipt_id: int = Field(description="Unique identifier for the receipt")
     items: List[Item] = Field(description="List of all items from the receipt")
+    user_id: SkipJsonSchema[Optional[str]] = Field(
+        default=None,
+        description="Owner of the receipt (set by the interface, not the LLM)",
+        exclude=True,
+    )
+
+
+class ImportCheckpoint(BaseModel):
+    """Progress marker for a resumable bulk statement import."""
+    job_id: str = Field(description="Stable identifier of the import (content hash)")
+    source: Optional[str] = None
+    user_id: Optional[str] = None
+    rows_committed: int = 0
+    completed: bool = False
+
+
+class ImportProgress(BaseModel):
+    """Progress report emitted while a statement import runs."""
+    job_id: str
+    rows_parsed: int = 0
+    rows_imported: int = 0
+    rows_skipped: int = 0
+    rows_resumed: int = 0
+    names_embedded: int = 0
+    elapsed_seconds: float = 0.0
+    completed: bool = False
+    error: Optional[str] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_imported / self.elapsed_seconds if self.elapsed_seconds else 0.0
 
 
 class Message(BaseModel):
@@ -55,15 +93,35 @@ class MemoryRecord(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class SessionSummary(BaseModel):
+    """Rolling summary of a session's older messages."""
+
+    session_id: str
+    content: str
+    covered_until: datetime  # created_at of the newest message folded into the summary
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class MemoryDocument(BaseModel):
+    """Semantic memory to be stored in long-term memory."""
+
+    memory_id: str
+    embedding: List[float]
+    content: str
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
 class MemorySearchResult(BaseModel):
     """Semantic memory search result."""
 
     content: str
     score: float
+    memory_id: Optional[str] = None
     session_id: Optional[str] = None
     user_id: Optional[str] = None
     source: Optional[str] = None
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    embedding: Optional[List[float]] = None
 
 
 class ChatRequest(BaseModel):
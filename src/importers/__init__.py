@@ -0,0 +1 @@
+"""Bulk importers for external financial data."""
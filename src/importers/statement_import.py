@@ -0,0 +1,288 @@
+"""
+Bulk Statement Import
+
+Loads CSV/OFX bank exports into the items table:
+  - Stream-parses the file in batches (constant memory)
+  - Embeds each distinct item name once, through the provider's batch API, with an LRU cache
+  - Loads rows with COPY through AsyncDatabasePort.bulk_insert_items()
+  - Records a checkpoint with every batch so an interrupted import resumes
+
+Usage:
+    python -m src.importers.statement_import statement.csv --user-id 15551234567
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+from src.domain.models import ImportCheckpoint, ImportProgress, Item
+from src.importers.statement_parsers import detect_format, iter_statement
+from src.ports.database_port import AsyncDatabasePort
+from src.ports.embedding_port import EmbeddingPort
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ProgressCallback = Callable[[ImportProgress], None]
+
+
+def compute_job_id(path: str | Path, user_id: str | None = None) -> str:
+    """Stable job id from file content and owner, so re-running the same file resumes."""
+    digest = hashlib.sha256((user_id or "").encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()[:32]
+
+
+def receipt_id_for_job(job_id: str) -> int:
+    """Map a job id onto the INTEGER receipt_id column (all rows of an import share it)."""
+    return int(job_id[:7], 16)
+
+
+class StatementImporter:
+    """Streams a statement file into the database in COPY-sized batches."""
+
+    def __init__(
+        self,
+        database: AsyncDatabasePort,
+        embedding_provider: EmbeddingPort,
+        *,
+        batch_size: int | None = None,
+        cache_size: int | None = None,
+        progress_callback: ProgressCallback | None = None,
+    ) -> None:
+        self._database = database
+        self._embedding_provider = embedding_provider
+        self._batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self._cache_size = cache_size or settings.IMPORT_EMBEDDING_CACHE_SIZE
+        self._embedding_cache: OrderedDict[str, Optional[List[float]]] = OrderedDict()
+        self._progress_callback = progress_callback
+
+    async def import_file(
+        self,
+        path: str | Path,
+        *,
+        user_id: str | None = None,
+        statement_format: str | None = None,
+        date_format: str | None = None,
+        expense_sign: str = "negative",
+        job_id: str | None = None,
+    ) -> ImportProgress:
+        """
+        Import ``path``, resuming from the last committed batch of the same job.
+
+        Returns:
+            Final ImportProgress for the job
+        """
+        path = Path(path)
+        statement_format = statement_format or detect_format(path)
+        job_id = job_id or await asyncio.to_thread(compute_job_id, path, user_id)
+        receipt_id = receipt_id_for_job(job_id)
+
+        progress = ImportProgress(job_id=job_id)
+        start_time = time.time()
+
+        existing = await self._database.get_import_checkpoint(job_id)
+        if existing and existing.completed:
+            logger.info(f"Import {job_id} already completed ({existing.rows_committed} rows); nothing to do.")
+            progress.rows_resumed = existing.rows_committed
+            progress.completed = True
+            return progress
+        resume_from = existing.rows_committed if existing else 0
+        if resume_from:
+            logger.info(f"Resuming import {job_id} after {resume_from} source rows.")
+        progress.rows_resumed = resume_from
+
+        # Parse+embed and COPY overlap: the writer loads batch N while batch N+1 is prepared
+        batches: asyncio.Queue = asyncio.Queue(maxsize=2)
+
+        with open(path, "r", encoding="utf-8-sig", newline="") as stream:
+            rows = iter_statement(
+                stream,
+                statement_format,
+                date_format=date_format,
+                expense_sign=expense_sign,
+            )
+            writer = asyncio.create_task(
+                self._write_batches(batches, progress, receipt_id, user_id, str(path), start_time)
+            )
+            try:
+                position = await asyncio.to_thread(self._skip, rows, resume_from)
+                while True:
+                    batch, consumed = await asyncio.to_thread(self._next_batch, rows)
+                    if not consumed:
+                        break
+                    position += consumed
+                    progress.rows_parsed += consumed
+                    progress.rows_skipped += consumed - len(batch)
+                    await self._attach_embeddings(batch, progress)
+                    await self._enqueue(batches, (batch, position, False), writer)
+
+                await self._enqueue(batches, ([], position, True), writer)
+                await writer
+            except BaseException:
+                writer.cancel()
+                raise
+
+        progress.completed = True
+        progress.elapsed_seconds = time.time() - start_time
+        logger.info(
+            f"Import {job_id} finished: {progress.rows_imported} rows imported, "
+            f"{progress.rows_skipped} skipped, {progress.names_embedded} names embedded "
+            f"in {progress.elapsed_seconds:.1f}s ({progress.rows_per_second:.0f} rows/s)"
+        )
+        self._report(progress)
+        return progress
+
+    @staticmethod
+    async def _enqueue(batches: asyncio.Queue, entry: tuple, writer: asyncio.Task) -> None:
+        """Queue a batch, surfacing the writer's exception instead of blocking on a dead writer."""
+        put = asyncio.ensure_future(batches.put(entry))
+        await asyncio.wait({put, writer}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            writer.result()
+
+    @staticmethod
+    def _skip(rows: Iterator[Item | None], count: int) -> int:
+        skipped = 0
+        for _ in range(count):
+            if next(rows, StopIteration) is StopIteration:
+                break
+            skipped += 1
+        return skipped
+
+    def _next_batch(self, rows: Iterator[Item | None]) -> tuple[list[Item], int]:
+        """Pull up to batch_size source rows; returns (expense items, rows consumed)."""
+        batch: list[Item] = []
+        consumed = 0
+        for row in rows:
+            consumed += 1
+            if row is not None:
+                batch.append(row)
+            if consumed >= self._batch_size:
+                break
+        return batch, consumed
+
+    async def _attach_embeddings(self, batch: list[Item], progress: ImportProgress) -> None:
+        vectors: dict[str, Optional[List[float]]] = {}
+        for name in {item.item_name for item in batch}:
+            if name in self._embedding_cache:
+                vectors[name] = self._embedding_cache[name]
+                self._embedding_cache.move_to_end(name)
+
+        missing = sorted({item.item_name for item in batch} - vectors.keys())
+        if missing:
+            embedded = await self._embedding_provider.generate_embeddings(missing)
+            for name, vector in zip(missing, embedded):
+                if vector is not None and not any(vector):
+                    vector = None  # Store NULL rather than a zero vector
+                vectors[name] = vector
+                if vector is not None:  # Failed names are retried in the next batch
+                    self._cache_put(name, vector)
+            progress.names_embedded += len(missing)
+
+        for item in batch:
+            item.item_name_embedding = vectors[item.item_name]
+
+    def _cache_put(self, name: str, vector: Optional[List[float]]) -> None:
+        self._embedding_cache[name] = vector
+        self._embedding_cache.move_to_end(name)
+        while len(self._embedding_cache) > self._cache_size:
+            self._embedding_cache.popitem(last=False)
+
+    async def _write_batches(
+        self,
+        batches: asyncio.Queue,
+        progress: ImportProgress,
+        receipt_id: int,
+        user_id: str | None,
+        source: str,
+        start_time: float,
+    ) -> None:
+        while True:
+            batch, position, done = await batches.get()
+            checkpoint = ImportCheckpoint(
+                job_id=progress.job_id,
+                source=source,
+                user_id=user_id,
+                rows_committed=position,
+                completed=done,
+            )
+            inserted = await self._database.bulk_insert_items(
+                batch,
+                receipt_id=receipt_id,
+                user_id=user_id,
+                checkpoint=checkpoint,
+            )
+            progress.rows_imported += inserted
+            progress.elapsed_seconds = time.time() - start_time
+            if done:
+                return
+            logger.info(
+                f"Import {progress.job_id}: {progress.rows_parsed + progress.rows_resumed} rows read, "
+                f"{progress.rows_imported} imported ({progress.rows_per_second:.0f} rows/s)"
+            )
+            self._report(progress)
+
+    def _report(self, progress: ImportProgress) -> None:
+        if self._progress_callback is not None:
+            try:
+                self._progress_callback(progress)
+            except Exception as exc:
+                logger.warning(f"Import progress callback failed: {exc}")
+
+
+async def _run_cli(args: argparse.Namespace) -> None:
+    from src.config.containers import get_async_database, get_embedding_provider
+
+    database = get_async_database()
+    await database.connect()
+    try:
+        importer = StatementImporter(
+            database,
+            get_embedding_provider(),
+            batch_size=args.batch_size,
+        )
+        await importer.import_file(
+            args.path,
+            user_id=args.user_id,
+            statement_format=args.format,
+            date_format=args.date_format,
+            expense_sign=args.expense_sign,
+        )
+    finally:
+        await database.disconnect()
+
+
+def main() -> None:
+    from src.utils.logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="Bulk import a CSV/OFX bank statement.")
+    parser.add_argument("path", help="Path to the statement file")
+    parser.add_argument("--user-id", help="Owner of the imported rows")
+    parser.add_argument("--format", choices=["csv", "ofx"], help="Statement format (default: from extension)")
+    parser.add_argument("--date-format", help="strptime format of CSV dates (default: auto-detect)")
+    parser.add_argument(
+        "--expense-sign",
+        choices=["negative", "positive", "any"],
+        default="negative",
+        help="Sign of expense amounts in a single signed amount column",
+    )
+    parser.add_argument("--batch-size", type=int, help="Rows per COPY batch")
+    args = parser.parse_args()
+
+    setup_logging(log_to_file=False)
+    asyncio.run(_run_cli(args))
+
+
+if __name__ == "__main__":
+    main()
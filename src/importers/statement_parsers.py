@@ -0,0 +1,328 @@
+"""
+Bank Statement Parsers
+
+Stream-parse CSV and OFX bank exports into Item domain models one
+transaction at a time, so arbitrarily large files use constant memory.
+"""
+
+from __future__ import annotations
+
+import csv
+import itertools
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, TextIO
+
+from src.domain.models import Item
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Header aliases used by common bank exports (matched case-insensitively)
+DATE_COLUMNS = ("date", "transaction date", "posted date", "posting date", "booking date", "value date")
+DESCRIPTION_COLUMNS = ("description", "payee", "name", "merchant", "narrative", "details", "memo")
+AMOUNT_COLUMNS = ("amount", "transaction amount", "value")
+DEBIT_COLUMNS = ("debit", "withdrawal", "withdrawals", "money out", "paid out")
+QUANTITY_COLUMNS = ("quantity", "qty")
+
+DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%d/%m/%Y", "%m/%d/%Y", "%d.%m.%Y", "%Y/%m/%d", "%Y%m%d")
+
+# Rows read to settle on one date format before giving up on ambiguous dates
+DATE_SNIFF_ROWS = 1000
+
+# Which sign marks an expense in a single signed amount column
+EXPENSE_SIGNS = ("negative", "positive", "any")
+
+_WHITESPACE = re.compile(r"\s+")
+# Everything but digits, separators, sign and accounting parentheses (currency symbols, spaces, ')
+_AMOUNT_NOISE = re.compile(r"[^0-9,.()+-]")
+
+
+class StatementParseError(ValueError):
+    """Raised when a statement can't be interpreted."""
+
+
+def normalize_item_name(name: str) -> str:
+    """Collapse whitespace so the same payee always embeds to the same key."""
+    return _WHITESPACE.sub(" ", name).strip()
+
+
+def _parse_amount(raw: str) -> float | None:
+    """
+    Parse an amount written with either decimal separator.
+
+    With both "," and "." present the last one is the decimal separator
+    (1,250.50 / 1.250,50). A lone separator is a thousands separator when it
+    repeats or is followed by exactly three digits (1,250 / 1.250.000), and
+    the decimal separator otherwise (12,50 / 12.5).
+    """
+    cleaned = _AMOUNT_NOISE.sub("", raw)
+    if not cleaned:
+        return None
+    # Accounting style negatives: (12.50)
+    if cleaned.startswith("(") and cleaned.endswith(")"):
+        cleaned = f"-{cleaned[1:-1]}"
+
+    if "," in cleaned and "." in cleaned:
+        decimal = "," if cleaned.rfind(",") > cleaned.rfind(".") else "."
+    elif "," in cleaned or "." in cleaned:
+        separator = "," if "," in cleaned else "."
+        integer, _, fraction = cleaned.rpartition(separator)
+        decimal = None if cleaned.count(separator) > 1 or len(fraction) == 3 else separator
+    else:
+        decimal = None
+
+    thousands = {",", "."} - {decimal}
+    for separator in thousands:
+        cleaned = cleaned.replace(separator, "")
+    if decimal == ",":
+        cleaned = cleaned.replace(",", ".")
+    return float(cleaned)
+
+
+def _parse_date(raw: str, date_format: str) -> datetime:
+    raw = raw.strip()
+    try:
+        parsed = datetime.strptime(raw, date_format)
+    except ValueError:
+        raise StatementParseError(f"Date '{raw}' does not match {date_format}") from None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _matching_formats(raw: str, formats: list[str]) -> list[str]:
+    matching = []
+    for fmt in formats:
+        try:
+            datetime.strptime(raw.strip(), fmt)
+        except ValueError:
+            continue
+        matching.append(fmt)
+    return matching
+
+
+def _settle_date_format(raw_dates: list[str], candidates: list[str], *, final: bool) -> str | None:
+    """
+    The one format to read the whole file with, or None if more rows are needed.
+
+    Day-first and month-first formats stay candidates until a row only one of
+    them can read (e.g. 13/01/2024). If that never happens, the file is only
+    accepted when the remaining formats agree on every date seen.
+
+    Raises:
+        StatementParseError: If the dates can't be read one way only
+    """
+    if len(candidates) == 1:
+        return candidates[0]
+    if not final:
+        return None
+    if not candidates:
+        raise StatementParseError("No known date format matches this statement; pass date_format")
+    # Unreadable dates (matching none of the candidates) are skipped later
+    readable = [raw.strip() for raw in raw_dates if len(_matching_formats(raw, candidates)) == len(candidates)]
+    readings = {tuple(datetime.strptime(raw, fmt) for raw in readable) for fmt in candidates}
+    if len(readings) > 1:
+        raise StatementParseError(
+            f"Dates are ambiguous between {candidates} (e.g. '{readable[0]}'); pass date_format"
+        )
+    return candidates[0]
+
+
+def _find_column(headers: dict[str, str], aliases: tuple[str, ...]) -> str | None:
+    for alias in aliases:
+        if alias in headers:
+            return headers[alias]
+    return None
+
+
+def _is_expense(amount: float, expense_sign: str) -> bool:
+    if expense_sign == "negative":
+        return amount < 0
+    if expense_sign == "positive":
+        return amount > 0
+    return amount != 0
+
+
+def parse_csv(
+    stream: TextIO,
+    *,
+    date_format: str | None = None,
+    expense_sign: str = "negative",
+) -> Iterator[Item | None]:
+    """
+    Yield one Item per expense row of a CSV export.
+
+    Rows that are not expenses (credits, blanks) or can't be parsed yield
+    ``None`` so callers can count them and keep row positions stable for
+    resumable imports.
+
+    Without ``date_format`` one format is chosen for the whole file from
+    its first DATE_SNIFF_ROWS rows; rows are held back until then.
+
+    Raises:
+        StatementParseError: If the header is unusable or the dates are ambiguous
+    """
+    reader = csv.DictReader(stream)
+    if not reader.fieldnames:
+        raise StatementParseError("CSV file has no header row")
+
+    headers = {name.strip().lower(): name for name in reader.fieldnames if name}
+    date_col = _find_column(headers, DATE_COLUMNS)
+    description_col = _find_column(headers, DESCRIPTION_COLUMNS)
+    amount_col = _find_column(headers, AMOUNT_COLUMNS)
+    debit_col = _find_column(headers, DEBIT_COLUMNS)
+    quantity_col = _find_column(headers, QUANTITY_COLUMNS)
+
+    if not date_col or not description_col or not (amount_col or debit_col):
+        raise StatementParseError(
+            f"CSV needs date, description and amount/debit columns; found {list(headers)}"
+        )
+
+    rows = enumerate(reader, start=2)
+    if date_format is None:
+        # Hold rows back until the file's date format is known
+        held: list[tuple[int, dict[str, str]]] = []
+        candidates = list(DATE_FORMATS)
+        for line_number, row in rows:
+            held.append((line_number, row))
+            raw = (row.get(date_col) or "").strip()
+            matching = _matching_formats(raw, candidates) if raw else candidates
+            if matching:  # An unreadable date is skipped later, not allowed to rule out every format
+                candidates = matching
+            date_format = _settle_date_format(
+                [row.get(date_col) or "" for _, row in held],
+                candidates,
+                final=len(held) >= DATE_SNIFF_ROWS,
+            )
+            if date_format is not None:
+                break
+        else:
+            if held:
+                date_format = _settle_date_format([row.get(date_col) or "" for _, row in held], candidates, final=True)
+        rows = itertools.chain(held, rows)
+
+    for line_number, row in rows:
+        try:
+            if debit_col:
+                amount = _parse_amount(row.get(debit_col) or "")
+                is_expense = amount is not None and amount != 0
+            else:
+                amount = _parse_amount(row.get(amount_col) or "")
+                is_expense = amount is not None and _is_expense(amount, expense_sign)
+
+            name = normalize_item_name(row.get(description_col) or "")
+            if not is_expense or not name:
+                yield None
+                continue
+
+            total = abs(amount)
+            quantity = float(row.get(quantity_col) or 1) if quantity_col else 1.0
+            yield Item(
+                item_name=name,
+                quantity=quantity,
+                unit_price=total / quantity if quantity else total,
+                total_price=total,
+                purchase_date=_parse_date(row.get(date_col) or "", date_format),
+            )
+        except (ValueError, StatementParseError) as e:
+            logger.debug(f"Skipping CSV line {line_number}: {e}")
+            yield None
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def _parse_ofx_date(raw: str) -> datetime:
+    # OFX dates look like 20240131120000.000[-5:EST]; the first 8/14 digits are enough
+    digits = re.match(r"\d+", raw.strip())
+    if not digits:
+        raise StatementParseError(f"Unrecognized OFX date '{raw}'")
+    value = digits.group(0)
+    fmt = "%Y%m%d%H%M%S" if len(value) >= 14 else "%Y%m%d"
+    return datetime.strptime(value[: 14 if len(value) >= 14 else 8], fmt).replace(tzinfo=timezone.utc)
+
+
+def parse_ofx(
+    stream: TextIO,
+    *,
+    expense_sign: str = "negative",
+    chunk_size: int = 64 * 1024,
+) -> Iterator[Item | None]:
+    """
+    Yield one Item per expense transaction (<STMTTRN>) of an OFX export.
+
+    Handles both SGML (unclosed leaf tags) and XML flavours, reading the
+    file in chunks. Non-expense transactions yield ``None``.
+    """
+    buffer = ""
+    transaction: dict[str, str] | None = None
+
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        # Only tokenize up to the last complete tag; keep the tail for the next chunk
+        cut = len(buffer) if not chunk else buffer.rfind("<")
+        if cut <= 0 and chunk:
+            continue
+        text, buffer = buffer[:cut], buffer[cut:]
+
+        for closing, tag, value in _OFX_TAG.findall(text):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if not closing:
+                    transaction = {}
+                    continue
+                if transaction is not None:
+                    yield _ofx_transaction_to_item(transaction, expense_sign)
+                transaction = None
+            elif transaction is not None and not closing and value.strip():
+                transaction[tag] = value.strip()
+
+        if not chunk:
+            break
+
+
+def _ofx_transaction_to_item(transaction: dict[str, str], expense_sign: str) -> Item | None:
+    try:
+        amount = _parse_amount(transaction.get("TRNAMT", ""))
+        name = normalize_item_name(transaction.get("NAME") or transaction.get("MEMO") or transaction.get("PAYEE", ""))
+        if amount is None or not name or not _is_expense(amount, expense_sign):
+            return None
+        total = abs(amount)
+        return Item(
+            item_name=name,
+            quantity=1.0,
+            unit_price=total,
+            total_price=total,
+            purchase_date=_parse_ofx_date(transaction.get("DTPOSTED", "")),
+        )
+    except (ValueError, StatementParseError) as e:
+        logger.debug(f"Skipping OFX transaction {transaction.get('FITID', '?')}: {e}")
+        return None
+
+
+def detect_format(path: str | Path) -> str:
+    """Guess 'csv' or 'ofx' from the file extension."""
+    suffix = Path(path).suffix.lower()
+    if suffix in (".ofx", ".qfx"):
+        return "ofx"
+    if suffix in (".csv", ".txt"):
+        return "csv"
+    raise StatementParseError(f"Can't infer statement format from '{suffix}'; pass it explicitly")
+
+
+def iter_statement(
+    stream: TextIO,
+    statement_format: str,
+    *,
+    date_format: str | None = None,
+    expense_sign: str = "negative",
+) -> Iterator[Item | None]:
+    """Dispatch to the parser for ``statement_format``."""
+    if expense_sign not in EXPENSE_SIGNS:
+        raise StatementParseError(f"expense_sign must be one of {EXPENSE_SIGNS}")
+    if statement_format == "csv":
+        return parse_csv(stream, date_format=date_format, expense_sign=expense_sign)
+    if statement_format == "ofx":
+        return parse_ofx(stream, expense_sign=expense_sign)
+    raise StatementParseError(f"Unsupported statement format '{statement_format}'")
@@ -0,0 +1,169 @@
+"""
+Statement Import API
+
+HTTP entry point for bulk statement imports:
+  - POST /import/statement streams the uploaded CSV/OFX body to a temp file
+    and starts the import in the background (202 + job id)
+  - GET /import/{job_id} reports progress
+
+Re-uploading the same file for the same user resumes the same job.
+Requires IMPORT_API_TOKEN to be set; requests must send it as a bearer token.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+import tempfile
+from collections import OrderedDict
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from src.config.containers import get_async_database, get_embedding_provider
+from src.domain.models import ImportProgress
+from src.importers.statement_import import StatementImporter
+from src.importers.statement_parsers import EXPENSE_SIGNS
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+import_router = APIRouter(prefix="/import")
+
+# Progress of imports started by this process, keyed by job id; finished jobs
+# beyond IMPORT_MAX_TRACKED_JOBS are forgotten oldest first (their checkpoint remains)
+_jobs: OrderedDict[str, ImportProgress] = OrderedDict()
+_tasks: dict[str, asyncio.Task] = {}
+
+
+def _authorize(request: Request) -> None:
+    if not settings.IMPORT_API_TOKEN:
+        raise HTTPException(status_code=403, detail="Statement import API is disabled.")
+    supplied = request.headers.get("Authorization", "").encode()
+    if not hmac.compare_digest(supplied, f"Bearer {settings.IMPORT_API_TOKEN}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid import token.")
+
+
+def _track(job_id: str) -> None:
+    _jobs[job_id] = ImportProgress(job_id=job_id)
+    _jobs.move_to_end(job_id)
+    finished = [tracked for tracked in _jobs if tracked not in _tasks and tracked != job_id]
+    for tracked in finished[: max(0, len(_jobs) - settings.IMPORT_MAX_TRACKED_JOBS)]:
+        del _jobs[tracked]
+
+
+@import_router.post("/statement")
+async def import_statement(
+    request: Request,
+    format: str,
+    user_id: str | None = None,
+    date_format: str | None = None,
+    expense_sign: str = "negative",
+) -> JSONResponse:
+    """Upload a statement as the raw request body and import it in the background."""
+    _authorize(request)
+    if format not in ("csv", "ofx"):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ofx'.")
+    if expense_sign not in EXPENSE_SIGNS:
+        raise HTTPException(status_code=400, detail=f"expense_sign must be one of {EXPENSE_SIGNS}.")
+
+    max_bytes = settings.IMPORT_MAX_UPLOAD_MB * 1024 * 1024
+    declared = request.headers.get("Content-Length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Statements are limited to {settings.IMPORT_MAX_UPLOAD_MB} MB.")
+
+    # Same hashing as compute_job_id(), done while streaming so the body is read once
+    digest = hashlib.sha256((user_id or "").encode())
+    fd, path = tempfile.mkstemp(suffix=f".{format}", prefix="statement-")
+    received = 0
+    with os.fdopen(fd, "wb") as f:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes:
+                break
+            digest.update(chunk)
+            f.write(chunk)
+    if received > max_bytes:
+        os.unlink(path)
+        raise HTTPException(status_code=413, detail=f"Statements are limited to {settings.IMPORT_MAX_UPLOAD_MB} MB.")
+    job_id = digest.hexdigest()[:32]
+
+    running = _tasks.get(job_id)
+    if running is not None and not running.done():
+        os.unlink(path)
+        return JSONResponse(status_code=202, content=_job_body(job_id))
+
+    _track(job_id)
+    _tasks[job_id] = asyncio.create_task(
+        _run_import(path, job_id, format, user_id, date_format, expense_sign)
+    )
+    logger.info(f"Statement import {job_id} queued ({format}, user={user_id})")
+    return JSONResponse(status_code=202, content=_job_body(job_id))
+
+
+@import_router.get("/{job_id}")
+async def import_status(job_id: str, request: Request) -> dict:
+    """Report progress of an import started by this process, or its stored checkpoint."""
+    _authorize(request)
+    if job_id in _jobs:
+        return _job_body(job_id)
+
+    checkpoint = await get_async_database().get_import_checkpoint(job_id)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="Unknown import job.")
+    return {
+        "job_id": job_id,
+        "status": "completed" if checkpoint.completed else "interrupted",
+        "rows_committed": checkpoint.rows_committed,
+    }
+
+
+def _job_body(job_id: str) -> dict:
+    progress = _jobs[job_id]
+    if progress.error:
+        status = "failed"
+    elif progress.completed:
+        status = "completed"
+    else:
+        status = "running"
+    return {
+        "job_id": job_id,
+        "status": status,
+        "status_url": f"/import/{job_id}",
+        **progress.model_dump(exclude={"job_id"}),
+        "rows_per_second": round(progress.rows_per_second, 1),
+    }
+
+
+async def _run_import(
+    path: str,
+    job_id: str,
+    statement_format: str,
+    user_id: str | None,
+    date_format: str | None,
+    expense_sign: str,
+) -> None:
+    def on_progress(progress: ImportProgress) -> None:
+        _jobs[job_id] = progress.model_copy()
+
+    try:
+        importer = StatementImporter(
+            get_async_database(),
+            get_embedding_provider(),
+            progress_callback=on_progress,
+        )
+        _jobs[job_id] = await importer.import_file(
+            path,
+            user_id=user_id,
+            statement_format=statement_format,
+            date_format=date_format,
+            expense_sign=expense_sign,
+            job_id=job_id,
+        )
+    except Exception as e:
+        logger.error(f"Statement import {job_id} failed: {e}", exc_info=True)
+        _jobs[job_id] = _jobs[job_id].model_copy(update={"error": str(e)})
+    finally:
+        os.unlink(path)
+        _tasks.pop(job_id, None)
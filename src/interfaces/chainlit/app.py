@@ -28,7 +28,14 @@ setup_logging()
 from src.utils.logging_config import get_logger
 from src.settings import settings
 import chainlit as cl
-from src.config.containers import get_stt_provider, get_tts_provider, get_vision_provider, get_async_database
+from src.config.containers import (
+    close_embedding_cache,
+    get_async_database,
+    get_stt_provider,
+    get_tts_provider,
+    get_vision_provider,
+)
+from src.adapters.memory.memory_manager import close_memory_manager, start_memory_manager
 from src.domain.models import TranscriptionRequest, VisionRequest, TTSRequest, AudioFormat, ImageFormat
 
 # Import the Main Agent orchestrator — this is the ONLY agent entry point
@@ -142,6 +149,12 @@ async def start():
         except Exception as e:
             logger.error(f"❌ Failed to connect to PostgreSQL on Chainlit chat start: {e}")
 
+    # Open memory stores before the first message so it is not delayed by them
+    try:
+        await start_memory_manager()
+    except Exception as e:
+        logger.error(f"Failed to initialize memory stores on Chainlit chat start: {e}")
+
     welcome_message = """
     🛒 Purchase Recording & Spending Assistant
 
@@ -165,6 +178,25 @@ async def start():
 
 
 
+@cl.on_app_shutdown
+async def shutdown():
+    """Flush memory writes and the embedding cache, then close the async database."""
+    try:
+        await close_memory_manager()
+    except Exception as e:
+        logger.error(f"Error draining memory writes: {e}")
+
+    try:
+        await close_embedding_cache()
+    except Exception as e:
+        logger.error(f"Error closing embedding cache: {e}")
+
+    try:
+        await get_async_database().disconnect()
+    except Exception as e:
+        logger.error(f"Error closing PostgreSQL pool: {e}")
+
+
 @cl.on_audio_start
 async def on_audio_start():
     cl.user_session.set("silent_duration_ms", 0)
@@ -0,0 +1,186 @@
+"""
+WhatsApp Message Workers
+
+Decouples webhook intake from message processing:
+  - submit() only checks the message id against recently seen ids and puts
+    the message on its sender's queue, so the webhook is acknowledged at
+    once and WhatsApp has no reason to redeliver it; at most max_size
+    messages wait across all senders
+  - A fixed pool of async workers (WHATSAPP_WORKER_CONCURRENCY), started
+    with the app, does the slow part: media download, STT/vision, the Main
+    Agent and the reply
+  - A sender is handed to a worker only while no other worker is processing
+    it, so a user's turns run one at a time, in arrival order, without a
+    busy sender tying up idle workers; after each message the sender goes
+    to the back of the line so a long backlog does not starve other users
+  - Redeliveries are recognized by message id (in process, so with several
+    app processes a redelivery reaching another process is not caught)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable
+
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MessageHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+class WhatsAppWorkerPool:
+    """Per-sender queues of incoming WhatsApp messages drained by a fixed number of workers."""
+
+    def __init__(
+        self,
+        handler: MessageHandler,
+        concurrency: int | None = None,
+        max_size: int | None = None,
+        dedupe_size: int | None = None,
+        drain_timeout: float | None = None,
+    ) -> None:
+        """
+        Initialize WhatsApp worker pool.
+
+        Args:
+            handler: Processes one webhook message object end to end
+            concurrency: Messages processed at once. Defaults to settings.WHATSAPP_WORKER_CONCURRENCY
+            max_size: Messages waiting before submit() refuses more. Defaults to settings.WHATSAPP_QUEUE_SIZE
+            dedupe_size: Recent message ids remembered for redelivery checks.
+                         Defaults to settings.WHATSAPP_DEDUPE_SIZE
+            drain_timeout: Seconds close() waits for queued messages. Defaults to settings.WHATSAPP_DRAIN_TIMEOUT_SECONDS
+        """
+        self._handler = handler
+        self._concurrency = concurrency or settings.WHATSAPP_WORKER_CONCURRENCY
+        self._max_size = max_size or settings.WHATSAPP_QUEUE_SIZE
+        self._dedupe_size = dedupe_size or settings.WHATSAPP_DEDUPE_SIZE
+        self._drain_timeout = (
+            settings.WHATSAPP_DRAIN_TIMEOUT_SECONDS if drain_timeout is None else drain_timeout
+        )
+        # Senders with queued messages and no worker on them, in turn order
+        self._ready: asyncio.Queue[str] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._seen: OrderedDict[str, None] = OrderedDict()
+        # A sender stays here from its first queued message until its queue is
+        # empty, so it is either in _ready or being processed, never both
+        self._senders: dict[str, deque[tuple[dict[str, Any], float]]] = {}
+        self._depth = 0
+        self._in_flight = 0
+        self._counters = {"accepted": 0, "duplicates": 0, "rejected": 0, "processed": 0, "failed": 0}
+        self._max_wait = 0.0
+
+    def start(self) -> None:
+        """Start the workers (idempotent; called from the app lifespan)."""
+        if self._workers:
+            return
+        self._ready = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"whatsapp-worker-{number}")
+            for number in range(self._concurrency)
+        ]
+        logger.info(f"Started {self._concurrency} WhatsApp message workers (queue size {self._max_size})")
+
+    def submit(self, message: dict[str, Any]) -> bool:
+        """
+        Queue a webhook message object for processing.
+
+        Returns:
+            False if the pool is not running or is full (the caller should let WhatsApp
+            retry), True otherwise, including for a redelivered message that is dropped
+        """
+        if self._ready is None:
+            logger.error("WhatsApp message workers are not running, asking WhatsApp to retry")
+            return False
+        message_id = message.get("id")
+        if message_id and message_id in self._seen:
+            self._seen.move_to_end(message_id)
+            self._counters["duplicates"] += 1
+            logger.info(f"Ignoring redelivered WhatsApp message {message_id}")
+            return True
+
+        if self._depth >= self._max_size:
+            self._counters["rejected"] += 1
+            logger.warning(f"WhatsApp message queue full ({self._max_size}), asking WhatsApp to retry")
+            return False
+
+        sender = message.get("from", "")
+        queued = self._senders.get(sender)
+        if queued is None:
+            queued = self._senders[sender] = deque()
+            self._ready.put_nowait(sender)
+        queued.append((message, time.monotonic()))
+        self._depth += 1
+
+        self._counters["accepted"] += 1
+        if message_id:
+            self._seen[message_id] = None
+            while len(self._seen) > self._dedupe_size:
+                self._seen.popitem(last=False)
+        return True
+
+    async def _work(self) -> None:
+        assert self._ready is not None
+        while True:
+            sender = await self._ready.get()
+            try:
+                queued = self._senders[sender]
+                message, queued_at = queued.popleft()
+                self._depth -= 1
+                self._max_wait = max(self._max_wait, time.monotonic() - queued_at)
+                await self._process(message)
+            finally:
+                if queued:
+                    self._ready.put_nowait(sender)
+                else:
+                    del self._senders[sender]
+                self._ready.task_done()
+
+    async def _process(self, message: dict[str, Any]) -> None:
+        self._in_flight += 1
+        try:
+            await self._handler(message)
+            self._counters["processed"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._counters["failed"] += 1
+            logger.error(f"Failed to process WhatsApp message {message.get('id')}: {e}", exc_info=True)
+        finally:
+            self._in_flight -= 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Queue depth, messages being processed and lifetime counters."""
+        return {
+            "workers": len(self._workers),
+            "depth": self._depth,
+            "senders": len(self._senders),
+            "in_flight": self._in_flight,
+            "max_wait_ms": round(1000 * self._max_wait, 2),
+            **self._counters,
+        }
+
+    async def close(self) -> None:
+        """Give queued messages up to drain_timeout to finish, then stop the workers."""
+        if not self._workers:
+            return
+        assert self._ready is not None
+        pending = self._depth + self._in_flight
+        if pending:
+            logger.info(f"Waiting up to {self._drain_timeout}s for {pending} WhatsApp messages")
+            try:
+                await asyncio.wait_for(self._ready.join(), self._drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Stopping WhatsApp workers with {self._depth + self._in_flight} messages unprocessed"
+                )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._ready = None
+        self._senders.clear()
+        self._depth = 0
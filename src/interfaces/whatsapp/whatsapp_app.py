@@ -5,9 +5,23 @@ FastAPI application for WhatsApp webhook integration with the financial assistan
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from src.utils.logging_config import get_logger
-from src.interfaces.whatsapp.whatsapp_handler import whatsapp_router
-from src.config.containers import get_async_database
+from src.interfaces.whatsapp.whatsapp_handler import message_workers, whatsapp_router
+from src.interfaces.api.import_handler import import_router
+from src.config.containers import close_embedding_cache, get_async_database
+from src.observability.pool_metrics import get_pool_snapshots, render_prometheus
+from src.observability.cache_metrics import get_cache_snapshots, render_cache_prometheus
+from src.observability.embedding_metrics import get_embedding_snapshot, render_embedding_prometheus
+from src.adapters.memory.memory_manager import close_memory_manager, start_memory_manager
+from src.observability.memory_metrics import (
+    get_memory_consolidation_snapshot,
+    get_memory_recall_snapshot,
+    get_memory_snapshots,
+    get_memory_summary_snapshot,
+    get_memory_write_snapshot,
+    render_memory_prometheus,
+)
 
 logger = get_logger(__name__)
 
@@ -23,10 +37,37 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Failed to connect to PostgreSQL on startup: {e}")
         logger.warning("The app will attempt to connect on the first request.")
+
+    try:
+        await start_memory_manager()
+        logger.info("Memory stores initialized on startup.")
+    except Exception as e:
+        logger.error(f"Failed to initialize memory stores on startup: {e}")
+        logger.warning("Memory stores will be retried on the first turn that needs them.")
+
+    message_workers.start()
     
     yield  # App runs here
     
     # ── Shutdown ──
+    # Finish queued WhatsApp messages before the stores they write to go away
+    try:
+        await message_workers.close()
+    except Exception as e:
+        logger.error(f"Error stopping WhatsApp workers: {e}")
+
+    # Flush queued memory writes while the stores are still reachable
+    try:
+        await close_memory_manager()
+        logger.info("Memory write queue drained on shutdown.")
+    except Exception as e:
+        logger.error(f"Error draining memory writes: {e}")
+
+    try:
+        await close_embedding_cache()
+    except Exception as e:
+        logger.error(f"Error closing embedding cache: {e}")
+
     try:
         await db.disconnect()
         logger.info("PostgreSQL connection pool closed on shutdown.")
@@ -43,6 +84,8 @@ app = FastAPI(
 
 # Include WhatsApp router
 app.include_router(whatsapp_router)
+# Bulk statement import API (disabled unless IMPORT_API_TOKEN is set)
+app.include_router(import_router)
 
 @app.get("/")
 async def root():
@@ -55,10 +98,30 @@ async def health_check():
     return {
         "status": "healthy",
         "database": db_status,
+        "pools": get_pool_snapshots(),
+        "caches": get_cache_snapshots(),
+        "embeddings": get_embedding_snapshot(),
+        "memory_context": get_memory_snapshots(),
+        "memory_recall": get_memory_recall_snapshot(),
+        "memory_summaries": get_memory_summary_snapshot(),
+        "memory_writes": get_memory_write_snapshot(),
+        "memory_consolidation": get_memory_consolidation_snapshot(),
+        "whatsapp_workers": message_workers.snapshot(),
         "version": "2.0.0 (multi-agent)",
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint for connection pool, cache, embedding, memory context and memory write metrics."""
+    return (
+        render_prometheus()
+        + render_cache_prometheus()
+        + render_embedding_prometheus()
+        + render_memory_prometheus()
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     import os
@@ -3,7 +3,8 @@ WhatsApp Interface Handler
 
 This is the INTERFACE layer — it handles:
   - WhatsApp webhook verification (GET)
-  - Receiving incoming messages (POST)
+  - Receiving incoming messages (POST): validated, queued and acknowledged
+    immediately; WhatsAppWorkerPool workers process them in the background
   - Multimodal input conversion (audio → text, image → text)
   - Sending responses back via WhatsApp API
 
@@ -11,6 +12,10 @@ For all AGENT LOGIC (LLM orchestration, saving purchases, querying spending),
 it delegates to `process_user_input()` from the Main Agent orchestrator
 """
 
+import asyncio
+import hashlib
+import hmac
+import json
 import logging
 import time
 from typing import Dict
@@ -21,6 +26,7 @@ from src.utils.logging_config import get_logger
 from src.settings import settings
 from src.config.containers import get_stt_provider, get_vision_provider
 from src.domain.models import TranscriptionRequest, VisionRequest, AudioFormat, ImageFormat
+from src.interfaces.whatsapp.message_workers import WhatsAppWorkerPool
 
 # Import the Main Agent orchestrator — this is the ONLY agent entry point
 from src.agents.main_agent import process_user_input
@@ -34,6 +40,7 @@ whatsapp_router = APIRouter()
 WHATSAPP_TOKEN = settings.WHATSAPP_TOKEN
 WHATSAPP_PHONE_NUMBER_ID = settings.WHATSAPP_PHONE_NUMBER_ID
 WHATSAPP_VERIFY_TOKEN = settings.WHATSAPP_VERIFY_TOKEN
+WHATSAPP_APP_SECRET = settings.WHATSAPP_APP_SECRET
 
 @whatsapp_router.api_route("/whatsapp_response", methods=["GET", "POST"])
 async def whatsapp_handler(request: Request) -> Response:
@@ -52,92 +59,123 @@ async def whatsapp_handler(request: Request) -> Response:
             logger.warning(f"WhatsApp webhook verification failed | Expected: {WHATSAPP_VERIFY_TOKEN}, Got: {verify_token}")
             return Response(content="Verification token mismatch", status_code=403)
 
+    body = await request.body()
+    if WHATSAPP_APP_SECRET and not _valid_signature(body, request.headers.get("X-Hub-Signature-256", "")):
+        logger.warning("Rejected WhatsApp webhook with a missing or invalid signature")
+        return Response(content="Invalid signature", status_code=403)
+
     try:
-        data = await request.json()
+        data = json.loads(body)
         logger.debug(f"Received WhatsApp webhook payload: {str(data)[:200]}...")
 
-        change_value = data["entry"][0]["changes"][0]["value"]
-
-        if "messages" in change_value:
-            message = change_value["messages"][0]
-            from_number = message["from"]
-            message_type = message["type"]
-
-            logger.info(f"Received {message_type} message from: {from_number}")
-
-            # Send processing indicator
-            await send_response(from_number, "Processing your request... ⏳")
-
-            content = ""
-            if message_type == "audio":
-                logger.debug("Processing audio message type")
-                content = await process_audio_message(message)
-            elif message_type == "image":
-                logger.debug("Processing image message type")
-                content = await process_image_message(message)
-            elif message_type == "text":
-                content = message["text"]["body"]
-                logger.debug(f"Text message content: '{content[:100]}{'...' if len(content) > 100 else ''}'")
-            else:
-                logger.warning(f"Unsupported message type received: {message_type}")
-                await send_response(
-                    from_number,
-                    "Sorry, I can only process text, audio, and image messages."
-                )
-                return Response(content="Unsupported message type", status_code=200)
-
-            if not content:
-                logger.warning("Message processing resulted in empty content")
-                await send_response(
-                    from_number,
-                    "Sorry, I couldn't understand your message. Please try again."
-                )
-                return Response(content="Empty content", status_code=200)
-
-            logger.info(f"Delegating WhatsApp message to Main Agent: '{content[:100]}{'...' if len(content) > 100 else ''}'")
-
-            try:
-                response_message = await process_user_input(
-                    content,
-                    session_id=f"whatsapp-{from_number}",
-                    user_id=from_number,
-                    source="whatsapp",
-                )
-                elapsed = time.time() - start_time
-
-                logger.info(f"Main Agent response received after {elapsed:.2f}s | Response preview: {response_message[:150]}...")
-
-                success = await send_response(from_number, response_message)
-
-                if not success:
-                    logger.error(f"Failed to send response to {from_number}")
-                    return Response(content="Failed to send message", status_code=500)
-
-                logger.info(f"Successfully sent response to {from_number}")
-
-            except Exception as e:
-                elapsed = time.time() - start_time
-                logger.error(f"Error from Main Agent after {elapsed:.2f}s: {e}", exc_info=True)
-                await send_response(
-                    from_number,
-                    "Sorry, I encountered an error processing your request. Please try again."
-                )
-
-            return Response(content="Message processed", status_code=200)
-
-        elif "statuses" in change_value:
+        change_values = [
+            change["value"]
+            for entry in data["entry"]
+            for change in entry["changes"]
+        ]
+        messages = [message for value in change_values for message in value.get("messages", [])]
+
+        if messages:
+            # Acknowledge right away; a slow ack makes WhatsApp redeliver the message
+            for message in messages:
+                logger.info(f"Received {message.get('type')} message from: {message.get('from')}")
+                if not message_workers.submit(message):
+                    return Response(content="Busy, retry later", status_code=503)
+
+            elapsed = time.time() - start_time
+            logger.debug(f"Queued {len(messages)} WhatsApp messages in {elapsed * 1000:.1f} ms")
+            return Response(content="Message queued", status_code=200)
+
+        elif any("statuses" in value for value in change_values):
             logger.debug("Received status update")
             return Response(content="Status update received", status_code=200)
         else:
-            logger.warning(f"Unknown event type in webhook payload: {list(change_value.keys())}")
+            logger.warning(f"Unknown event type in webhook payload: {[list(value.keys()) for value in change_values]}")
             return Response(content="Unknown event type", status_code=400)
 
     except Exception as e:
         elapsed = time.time() - start_time
-        logger.error(f"Error processing WhatsApp message after {elapsed:.2f}s: {e}", exc_info=True)
+        logger.error(f"Error reading WhatsApp webhook after {elapsed:.2f}s: {e}", exc_info=True)
         return Response(content="Internal server error", status_code=500)
 
 
+def _valid_signature(body: bytes, signature: str) -> bool:
+    """Check Meta's X-Hub-Signature-256 header (HMAC-SHA256 of the raw body with the app secret)."""
+    expected = "sha256=" + hmac.new(WHATSAPP_APP_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+async def process_whatsapp_message(message: Dict) -> None:
+    """Convert one queued message to text, run it through the Main Agent and send the reply."""
+    start_time = time.time()
+    from_number = message["from"]
+    message_type = message["type"]
+
+    # Send processing indicator
+    await send_response(from_number, "Processing your request... ⏳")
+
+    content = ""
+    if message_type == "audio":
+        logger.debug("Processing audio message type")
+        content = await process_audio_message(message)
+    elif message_type == "image":
+        logger.debug("Processing image message type")
+        content = await process_image_message(message)
+    elif message_type == "text":
+        content = message["text"]["body"]
+        logger.debug(f"Text message content: '{content[:100]}{'...' if len(content) > 100 else ''}'")
+    else:
+        logger.warning(f"Unsupported message type received: {message_type}")
+        await send_response(
+            from_number,
+            "Sorry, I can only process text, audio, and image messages."
+        )
+        return
+
+    if not content:
+        logger.warning("Message processing resulted in empty content")
+        await send_response(
+            from_number,
+            "Sorry, I couldn't understand your message. Please try again."
+        )
+        return
+
+    logger.info(f"Delegating WhatsApp message to Main Agent: '{content[:100]}{'...' if len(content) > 100 else ''}'")
+
+    try:
+        response_message = await process_user_input(
+            content,
+            session_id=f"whatsapp-{from_number}",
+            user_id=from_number,
+            source="whatsapp",
+        )
+        elapsed = time.time() - start_time
+
+        logger.info(f"Main Agent response received after {elapsed:.2f}s | Response preview: {response_message[:150]}...")
+
+        if await send_response(from_number, response_message):
+            logger.info(f"Successfully sent response to {from_number}")
+        else:
+            logger.error(f"Failed to send response to {from_number}")
+
+    except Exception as e:
+        elapsed = time.time() - start_time
+        logger.error(f"Error from Main Agent after {elapsed:.2f}s: {e}", exc_info=True)
+        await send_response(
+            from_number,
+            "Sorry, I encountered an error processing your request. Please try again."
+        )
+
+
+# Webhook intake only queues messages; these workers process them
+message_workers = WhatsAppWorkerPool(
+    process_whatsapp_message,
+    concurrency=settings.WHATSAPP_WORKER_CONCURRENCY,
+    max_size=settings.WHATSAPP_QUEUE_SIZE,
+    dedupe_size=settings.WHATSAPP_DEDUPE_SIZE,
+    drain_timeout=settings.WHATSAPP_DRAIN_TIMEOUT_SECONDS,
+)
+
 
 async def process_audio_message(message: Dict) -> str:
     """Download and transcribe audio message using STT port."""
@@ -157,7 +195,8 @@ async def process_audio_message(message: Dict) -> str:
         )
 
         logger.debug("Starting speech-to-text transcription")
-        response = stt_provider.transcribe(request)
+        # Providers are synchronous; keep them off the event loop shared with the webhook
+        response = await asyncio.to_thread(stt_provider.transcribe, request)
 
         elapsed = time.time() - start_time
         logger.info(
@@ -198,7 +237,7 @@ async def process_image_message(message: Dict) -> str:
         )
 
         logger.debug("Starting image analysis")
-        response = vision_provider.analyze_image(request)
+        response = await asyncio.to_thread(vision_provider.analyze_image, request)
         image_analysis = response.extracted_text
 
         elapsed = time.time() - start_time
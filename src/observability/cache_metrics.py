@@ -0,0 +1,92 @@
+"""
+Cache Instrumentation
+
+Hit/miss/eviction counters for in-process caches, exposed through /health
+and the Prometheus /metrics endpoint alongside the pool metrics.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+class CacheStats:
+    """Counters for one cache; tiers (e.g. "memory", "disk") are tracked separately."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.hits: dict[str, int] = {}
+        self.misses = 0
+        self.evictions: dict[str, int] = {}
+        self.entries: dict[str, int] = {}
+
+    def hit(self, tier: str) -> None:
+        self.hits[tier] = self.hits.get(tier, 0) + 1
+
+    def miss(self) -> None:
+        self.misses += 1
+
+    def evicted(self, tier: str, count: int = 1) -> None:
+        self.evictions[tier] = self.evictions.get(tier, 0) + count
+
+    def set_entries(self, tier: str, count: int) -> None:
+        self.entries[tier] = count
+
+    @property
+    def hit_rate(self) -> float:
+        hits = sum(self.hits.values())
+        lookups = hits + self.misses
+        return hits / lookups if lookups else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "evictions": dict(self.evictions),
+            "entries": dict(self.entries),
+        }
+
+
+_caches: dict[str, CacheStats] = {}
+
+
+def register_cache(name: str) -> CacheStats:
+    """Create (or return the existing) stats object for a named cache."""
+    if name not in _caches:
+        _caches[name] = CacheStats(name)
+    return _caches[name]
+
+
+def get_cache_snapshots() -> dict[str, dict[str, Any]]:
+    return {name: stats.snapshot() for name, stats in _caches.items()}
+
+
+def render_cache_prometheus() -> str:
+    """Render all registered caches in Prometheus text exposition format."""
+    lines = [
+        "# HELP cache_hits_total Cache lookups answered, per tier.",
+        "# TYPE cache_hits_total counter",
+    ]
+    for name, stats in _caches.items():
+        for tier, count in stats.hits.items():
+            lines.append(f'cache_hits_total{{cache="{name}",tier="{tier}"}} {count}')
+
+    lines.append("# HELP cache_misses_total Cache lookups that fell through to the source.")
+    lines.append("# TYPE cache_misses_total counter")
+    for name, stats in _caches.items():
+        lines.append(f'cache_misses_total{{cache="{name}"}} {stats.misses}')
+
+    lines.append("# HELP cache_evictions_total Entries evicted to stay within size bounds, per tier.")
+    lines.append("# TYPE cache_evictions_total counter")
+    for name, stats in _caches.items():
+        for tier, count in stats.evictions.items():
+            lines.append(f'cache_evictions_total{{cache="{name}",tier="{tier}"}} {count}')
+
+    lines.append("# HELP cache_entries Entries currently held, per tier.")
+    lines.append("# TYPE cache_entries gauge")
+    for name, stats in _caches.items():
+        for tier, count in stats.entries.items():
+            lines.append(f'cache_entries{{cache="{name}",tier="{tier}"}} {count}')
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,104 @@
+"""
+Embedding Instrumentation
+
+Request coalescing counters for the embedding provider and embedding
+backfill progress, exposed through /health and the Prometheus /metrics
+endpoint.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+class CoalescingStats:
+    """Single-text requests against the provider calls that served them."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.provider_calls = 0
+        self.texts_sent = 0
+        self.timeouts = 0
+
+    @property
+    def coalescing_factor(self) -> float:
+        return self.requests / self.provider_calls if self.provider_calls else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "provider_calls": self.provider_calls,
+            "texts_sent": self.texts_sent,
+            "timeouts": self.timeouts,
+            "coalescing_factor": round(self.coalescing_factor, 2),
+        }
+
+
+_coalescing = CoalescingStats()
+
+
+def get_coalescing_stats() -> CoalescingStats:
+    """The process-wide coalescing counters (one coalescer per process)."""
+    return _coalescing
+
+
+class BackfillStats:
+    """Embedding backfill passes and items, plus the checkpoint of the current pass."""
+
+    def __init__(self) -> None:
+        self.passes = 0
+        self.skipped_passes = 0
+        self.embedded = 0
+        self.failed = 0
+        self.checkpoint = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "passes": self.passes,
+            "skipped_passes": self.skipped_passes,
+            "embedded": self.embedded,
+            "failed": self.failed,
+            "checkpoint_item_id": self.checkpoint,
+        }
+
+
+_backfill = BackfillStats()
+
+
+def get_backfill_stats() -> BackfillStats:
+    """The process-wide backfill counters (one worker per process)."""
+    return _backfill
+
+
+def get_embedding_snapshot() -> dict[str, Any]:
+    return {"coalescing": _coalescing.snapshot(), "backfill": _backfill.snapshot()}
+
+
+def render_embedding_prometheus() -> str:
+    """Render embedding coalescing and backfill stats in Prometheus text exposition format."""
+    lines = [
+        "# HELP embedding_coalesce_requests_total Single-text embedding requests received by the coalescer.",
+        "# TYPE embedding_coalesce_requests_total counter",
+        f"embedding_coalesce_requests_total {_coalescing.requests}",
+        "# HELP embedding_provider_calls_total Embedding provider requests made by the coalescer.",
+        "# TYPE embedding_provider_calls_total counter",
+        f"embedding_provider_calls_total {_coalescing.provider_calls}",
+        "# HELP embedding_provider_texts_total Texts sent to the embedding provider.",
+        "# TYPE embedding_provider_texts_total counter",
+        f"embedding_provider_texts_total {_coalescing.texts_sent}",
+        "# HELP embedding_coalesce_timeouts_total Requests that missed their deadline.",
+        "# TYPE embedding_coalesce_timeouts_total counter",
+        f"embedding_coalesce_timeouts_total {_coalescing.timeouts}",
+        "# HELP embedding_backfill_passes_total Backfill passes, by outcome (skipped: another worker leads).",
+        "# TYPE embedding_backfill_passes_total counter",
+        f'embedding_backfill_passes_total{{outcome="completed"}} {_backfill.passes}',
+        f'embedding_backfill_passes_total{{outcome="skipped"}} {_backfill.skipped_passes}',
+        "# HELP embedding_backfill_items_total Items the backfill embedded or left pending after a provider failure.",
+        "# TYPE embedding_backfill_items_total counter",
+        f'embedding_backfill_items_total{{outcome="embedded"}} {_backfill.embedded}',
+        f'embedding_backfill_items_total{{outcome="failed"}} {_backfill.failed}',
+        "# HELP embedding_backfill_checkpoint_item_id Last item id the current backfill pass got through.",
+        "# TYPE embedding_backfill_checkpoint_item_id gauge",
+        f"embedding_backfill_checkpoint_item_id {_backfill.checkpoint}",
+    ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,286 @@
+"""
+Memory Context Instrumentation
+
+Latency and outcome per context-building branch (short-term history,
+long-term search), long-term recall filtering, write-behind queue activity
+and long-term consolidation, exposed through /health and the Prometheus
+/metrics endpoint.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+OUTCOMES = ("ok", "timeout", "error")
+
+
+class BranchStats:
+    """Latency summary and outcome counts for one branch."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+        self.outcomes = {outcome: 0 for outcome in OUTCOMES}
+
+    def observe(self, seconds: float, outcome: str) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.last_seconds = seconds
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": round(1000 * self.total_seconds / self.count, 2) if self.count else 0.0,
+            "max_ms": round(1000 * self.max_seconds, 2),
+            "last_ms": round(1000 * self.last_seconds, 2),
+            "outcomes": dict(self.outcomes),
+        }
+
+
+_branches: dict[str, BranchStats] = {}
+
+
+def record_context_branch(name: str, seconds: float, outcome: str) -> None:
+    """Record one run of a context branch ("ok", "timeout" or "error")."""
+    if name not in _branches:
+        _branches[name] = BranchStats(name)
+    _branches[name].observe(seconds, outcome)
+
+
+def get_memory_snapshots() -> dict[str, dict[str, Any]]:
+    return {name: stats.snapshot() for name, stats in _branches.items()}
+
+
+class RecallStats:
+    """What long-term ranking did with recalled candidates, and the prompt characters it saved."""
+
+    def __init__(self) -> None:
+        self.recalls = 0
+        self.candidates = 0
+        self.kept = 0
+        self.below_threshold = 0
+        self.redundant = 0
+        self.chars_saved = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "recalls": self.recalls,
+            "candidates": self.candidates,
+            "kept": self.kept,
+            "dropped": {"below_threshold": self.below_threshold, "redundant": self.redundant},
+            "prompt_chars_saved": self.chars_saved,
+        }
+
+
+_recalls = RecallStats()
+
+
+def record_memory_recall(
+    *,
+    candidates: int,
+    kept: int,
+    below_threshold: int,
+    redundant: int,
+    chars_saved: int,
+) -> None:
+    """
+    Record one ranked recall.
+
+    ``redundant`` counts memories of the relevance-ordered top-k that MMR
+    replaced. ``chars_saved`` compares the prompt block against the
+    unfiltered top-k and is negative when diversification swapped in longer
+    memories, so its running total is exported as a gauge.
+    """
+    _recalls.recalls += 1
+    _recalls.candidates += candidates
+    _recalls.kept += kept
+    _recalls.below_threshold += below_threshold
+    _recalls.redundant += redundant
+    _recalls.chars_saved += chars_saved
+
+
+def get_memory_recall_snapshot() -> dict[str, Any]:
+    return _recalls.snapshot()
+
+
+class SummaryStats:
+    """Rolling conversation summary folds: LLM calls, messages folded and time spent."""
+
+    def __init__(self) -> None:
+        self.folds = {"ok": 0, "error": 0}
+        self.messages = 0
+        self.total_seconds = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        folds = sum(self.folds.values())
+        return {
+            "folds": dict(self.folds),
+            "messages_folded": self.messages,
+            "avg_fold_ms": round(1000 * self.total_seconds / folds, 2) if folds else 0.0,
+        }
+
+
+_summaries = SummaryStats()
+
+
+def record_summary_fold(messages: int, seconds: float, outcome: str) -> None:
+    """Record one summary fold over ``messages`` ("ok" or "error")."""
+    _summaries.folds[outcome] = _summaries.folds.get(outcome, 0) + 1
+    _summaries.total_seconds += seconds
+    if outcome == "ok":
+        _summaries.messages += messages
+
+
+def get_memory_summary_snapshot() -> dict[str, Any]:
+    return _summaries.snapshot()
+
+
+class WriteStats:
+    """Write-behind queue activity: turns enqueued, batches flushed and each turn's outcome."""
+
+    def __init__(self) -> None:
+        self.enqueued = 0
+        self.blocked = 0
+        self.batches = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.turns = {"ok": 0, "retried": 0, "error": 0}
+        self.depth: Callable[[], int] = lambda: 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "depth": self.depth(),
+            "enqueued": self.enqueued,
+            "blocked": self.blocked,
+            "batches": self.batches,
+            "avg_batch_ms": round(1000 * self.total_seconds / self.batches, 2) if self.batches else 0.0,
+            "max_batch_ms": round(1000 * self.max_seconds, 2),
+            "turns": dict(self.turns),
+        }
+
+
+_writes = WriteStats()
+
+
+def register_write_queue(depth: Callable[[], int]) -> None:
+    """Report queue depth from ``depth`` (the most recently created queue wins)."""
+    _writes.depth = depth
+
+
+def record_memory_enqueue(blocked: bool) -> None:
+    """Record one queued turn; ``blocked`` if it had to wait for space."""
+    _writes.enqueued += 1
+    if blocked:
+        _writes.blocked += 1
+
+
+def record_memory_write(seconds: float, outcomes: dict[str, int]) -> None:
+    """
+    Record one flushed batch, retries included: turns written first time ("ok"),
+    written after a retry ("retried") or given up on ("error").
+    """
+    _writes.batches += 1
+    _writes.total_seconds += seconds
+    _writes.max_seconds = max(_writes.max_seconds, seconds)
+    for outcome, turns in outcomes.items():
+        _writes.turns[outcome] = _writes.turns.get(outcome, 0) + turns
+
+
+def get_memory_write_snapshot() -> dict[str, Any]:
+    return _writes.snapshot()
+
+
+class ConsolidationStats:
+    """Long-term consolidation runs and the memories they merged, created and evicted."""
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self.memories = {"merged": 0, "created": 0, "evicted": 0}
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"runs": self.runs, **self.memories}
+
+
+_consolidations = ConsolidationStats()
+
+
+def record_memory_consolidation(totals: dict[str, int]) -> None:
+    """Record one consolidation run's merged/created/evicted memory counts."""
+    _consolidations.runs += 1
+    for key, count in totals.items():
+        _consolidations.memories[key] = _consolidations.memories.get(key, 0) + count
+
+
+def get_memory_consolidation_snapshot() -> dict[str, Any]:
+    return _consolidations.snapshot()
+
+
+def render_memory_prometheus() -> str:
+    """Render context branch, recall, summary, write queue and consolidation stats in Prometheus text exposition format."""
+    lines = [
+        "# HELP memory_context_branch_seconds Time spent building each memory context branch.",
+        "# TYPE memory_context_branch_seconds summary",
+    ]
+    for name, stats in _branches.items():
+        lines.append(f'memory_context_branch_seconds_sum{{branch="{name}"}} {stats.total_seconds:.6f}')
+        lines.append(f'memory_context_branch_seconds_count{{branch="{name}"}} {stats.count}')
+
+    lines.append("# HELP memory_context_branch_total Context branch runs by outcome.")
+    lines.append("# TYPE memory_context_branch_total counter")
+    for name, stats in _branches.items():
+        for outcome, count in stats.outcomes.items():
+            lines.append(f'memory_context_branch_total{{branch="{name}",outcome="{outcome}"}} {count}')
+
+    lines.extend(
+        [
+            "# HELP memory_recall_candidates_total Long-term memories considered for the prompt.",
+            "# TYPE memory_recall_candidates_total counter",
+            f"memory_recall_candidates_total {_recalls.candidates}",
+            "# HELP memory_recall_kept_total Long-term memories placed in the prompt.",
+            "# TYPE memory_recall_kept_total counter",
+            f"memory_recall_kept_total {_recalls.kept}",
+            "# HELP memory_recall_dropped_total Candidates left out of the prompt, by reason.",
+            "# TYPE memory_recall_dropped_total counter",
+            f'memory_recall_dropped_total{{reason="below_threshold"}} {_recalls.below_threshold}',
+            f'memory_recall_dropped_total{{reason="redundant"}} {_recalls.redundant}',
+            "# HELP memory_recall_prompt_chars_saved Net prompt characters saved against the unfiltered top-k.",
+            "# TYPE memory_recall_prompt_chars_saved gauge",
+            f"memory_recall_prompt_chars_saved {_recalls.chars_saved}",
+            "# HELP memory_summary_folds_total Conversation summary folds, by outcome.",
+            "# TYPE memory_summary_folds_total counter",
+            f'memory_summary_folds_total{{outcome="ok"}} {_summaries.folds["ok"]}',
+            f'memory_summary_folds_total{{outcome="error"}} {_summaries.folds["error"]}',
+            "# HELP memory_summary_messages_folded_total Messages folded into conversation summaries.",
+            "# TYPE memory_summary_messages_folded_total counter",
+            f"memory_summary_messages_folded_total {_summaries.messages}",
+            "# HELP memory_write_queue_depth Turns waiting to be persisted.",
+            "# TYPE memory_write_queue_depth gauge",
+            f"memory_write_queue_depth {_writes.depth()}",
+            "# HELP memory_write_blocked_total Turns that waited for space in a full write queue.",
+            "# TYPE memory_write_blocked_total counter",
+            f"memory_write_blocked_total {_writes.blocked}",
+            "# HELP memory_write_batch_seconds Time spent persisting each batch of turns.",
+            "# TYPE memory_write_batch_seconds summary",
+            f"memory_write_batch_seconds_sum {_writes.total_seconds:.6f}",
+            f"memory_write_batch_seconds_count {_writes.batches}",
+            "# HELP memory_write_turns_total Turns persisted by the write-behind queue, by outcome.",
+            "# TYPE memory_write_turns_total counter",
+        ]
+    )
+    for outcome, count in _writes.turns.items():
+        lines.append(f'memory_write_turns_total{{outcome="{outcome}"}} {count}')
+
+    lines.append("# HELP memory_consolidation_runs_total Long-term memory consolidation runs completed.")
+    lines.append("# TYPE memory_consolidation_runs_total counter")
+    lines.append(f"memory_consolidation_runs_total {_consolidations.runs}")
+    lines.append("# HELP memory_consolidation_memories_total Long-term memories merged away, created by merging or evicted.")
+    lines.append("# TYPE memory_consolidation_memories_total counter")
+    for action, count in _consolidations.memories.items():
+        lines.append(f'memory_consolidation_memories_total{{action="{action}"}} {count}')
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,307 @@
+"""
+Connection Pool Instrumentation
+
+Wraps asyncpg pools to record acquire latency, connection hold times per call
+site and saturation, and optionally resizes the usable pool within bounds
+based on observed acquire wait.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import asyncpg
+
+from src.settings import settings
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bounds (ms) of the acquire-latency histogram buckets
+ACQUIRE_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class _Histogram:
+    """Fixed-bucket latency histogram (values in milliseconds)."""
+
+    def __init__(self, buckets: tuple[float, ...] = ACQUIRE_BUCKETS_MS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value_ms <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value_ms
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        running = 0
+        result = []
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+
+class InstrumentedPool:
+    """
+    asyncpg pool wrapper with acquire/hold metrics and optional adaptive sizing.
+
+    In adaptive mode the underlying pool is created at ``max_size`` and a
+    concurrency limit between ``min_size`` and ``max_size`` gates acquires.
+    The limit grows while acquires wait longer than the grow threshold and
+    shrinks when waits are negligible and the pool is under-used; idle
+    physical connections are reaped by asyncpg's inactive-connection lifetime.
+    """
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        name: str,
+        *,
+        min_size: int,
+        max_size: int,
+        long_hold_seconds: float | None = None,
+        adaptive: bool | None = None,
+    ) -> None:
+        self._pool = pool
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self._long_hold_seconds = long_hold_seconds or settings.POOL_LONG_HOLD_WARNING_SECONDS
+        self._adaptive = settings.POOL_ADAPTIVE_ENABLED if adaptive is None else adaptive
+
+        self._acquire_histogram = _Histogram()
+        self._recent_waits_ms: deque[float] = deque(maxlen=512)
+        self._hold_stats: dict[str, dict[str, float]] = {}
+        self._active_holds: dict[int, tuple[str, float]] = {}
+        self._long_holds = 0
+
+        self._in_use = 0
+        self._slots_taken = 0
+        self._peak_in_use = 0
+        self._limit = max_size
+        self._limit_condition = asyncio.Condition()
+        self._controller: asyncio.Task | None = None
+
+        if self._adaptive:
+            self._limit = min_size
+            self._controller = asyncio.create_task(self._adapt_loop())
+
+    # ── asyncpg.Pool compatible surface ──────────────────────────────────────
+
+    @asynccontextmanager
+    async def acquire(self, call_site: str = "unknown") -> AsyncIterator[asyncpg.Connection]:
+        """Acquire a connection, recording wait and hold time for ``call_site``."""
+        wait_start = time.perf_counter()
+        if self._adaptive:
+            async with self._limit_condition:
+                await self._limit_condition.wait_for(lambda: self._slots_taken < self._limit)
+                self._slots_taken += 1
+
+        try:
+            async with self._pool.acquire() as conn:
+                wait_ms = (time.perf_counter() - wait_start) * 1000
+                self._acquire_histogram.observe(wait_ms)
+                self._recent_waits_ms.append(wait_ms)
+                self._in_use += 1
+                self._peak_in_use = max(self._peak_in_use, self._in_use)
+
+                hold_start = time.perf_counter()
+                hold_key = id(conn)
+                self._active_holds[hold_key] = (call_site, hold_start)
+                try:
+                    yield conn
+                finally:
+                    self._in_use -= 1
+                    self._active_holds.pop(hold_key, None)
+                    self._record_hold(call_site, time.perf_counter() - hold_start)
+        finally:
+            if self._adaptive:
+                async with self._limit_condition:
+                    self._slots_taken -= 1
+                    self._limit_condition.notify()
+
+    async def close(self) -> None:
+        if self._controller is not None:
+            self._controller.cancel()
+            self._controller = None
+        await self._pool.close()
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def get_size(self) -> int:
+        return self._pool.get_size()
+
+    def get_idle_size(self) -> int:
+        return self._pool.get_idle_size()
+
+    # ── Metrics ──────────────────────────────────────────────────────────────
+
+    def _record_hold(self, call_site: str, held_seconds: float) -> None:
+        stats = self._hold_stats.setdefault(call_site, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        stats["count"] += 1
+        stats["total_seconds"] += held_seconds
+        stats["max_seconds"] = max(stats["max_seconds"], held_seconds)
+
+        if held_seconds >= self._long_hold_seconds:
+            self._long_holds += 1
+            logger.warning(
+                f"Pool '{self.name}': connection held {held_seconds:.2f}s by '{call_site}' "
+                f"(threshold {self._long_hold_seconds:.2f}s)"
+            )
+
+    def _wait_percentile(self, percentile: float) -> float:
+        if not self._recent_waits_ms:
+            return 0.0
+        ordered = sorted(self._recent_waits_ms)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile))
+        return ordered[index]
+
+    def snapshot(self) -> dict[str, Any]:
+        """Point-in-time view of the pool for /health and /metrics."""
+        now = time.perf_counter()
+        oldest_hold = max((now - start for _, start in self._active_holds.values()), default=0.0)
+        return {
+            "name": self.name,
+            "size": self.get_size(),
+            "idle": self.get_idle_size(),
+            "in_use": self._in_use,
+            "limit": self._limit,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "adaptive": self._adaptive,
+            "acquire_count": self._acquire_histogram.count,
+            "acquire_wait_ms_p50": round(self._wait_percentile(0.50), 3),
+            "acquire_wait_ms_p95": round(self._wait_percentile(0.95), 3),
+            "acquire_wait_ms_p99": round(self._wait_percentile(0.99), 3),
+            "long_holds": self._long_holds,
+            "oldest_active_hold_seconds": round(oldest_hold, 3),
+            "hold_by_call_site": {
+                site: {
+                    "count": int(stats["count"]),
+                    "avg_seconds": round(stats["total_seconds"] / stats["count"], 4),
+                    "max_seconds": round(stats["max_seconds"], 4),
+                }
+                for site, stats in self._hold_stats.items()
+            },
+        }
+
+    # ── Adaptive sizing ──────────────────────────────────────────────────────
+
+    async def _adapt_loop(self) -> None:
+        interval = settings.POOL_ADAPTIVE_INTERVAL_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._adapt_once()
+            except Exception as exc:
+                logger.warning(f"Pool '{self.name}': adaptive sizing step failed: {exc}")
+
+    async def _adapt_once(self) -> None:
+        p95 = self._wait_percentile(0.95)
+        peak = self._peak_in_use
+        self._peak_in_use = self._in_use
+        self._recent_waits_ms.clear()
+
+        async with self._limit_condition:
+            previous = self._limit
+            if p95 >= settings.POOL_ADAPTIVE_GROW_WAIT_MS and peak >= self._limit:
+                self._limit = min(self.max_size, self._limit + 1)
+            elif p95 <= settings.POOL_ADAPTIVE_SHRINK_WAIT_MS and peak < self._limit - 1:
+                self._limit = max(self.min_size, self._limit - 1)
+
+            if self._limit != previous:
+                self._limit_condition.notify_all()
+                logger.info(
+                    f"Pool '{self.name}': adaptive limit {previous} -> {self._limit} "
+                    f"(p95 wait {p95:.1f}ms, peak in use {peak})"
+                )
+
+
+_pools: dict[str, InstrumentedPool] = {}
+
+
+async def create_instrumented_pool(
+    dsn: str,
+    *,
+    name: str,
+    min_size: int,
+    max_size: int,
+    **pool_kwargs: Any,
+) -> InstrumentedPool:
+    """Create an asyncpg pool, wrap it and register it for reporting."""
+    adaptive = settings.POOL_ADAPTIVE_ENABLED
+    pool = await asyncpg.create_pool(
+        dsn,
+        min_size=min_size,
+        max_size=max_size,
+        **pool_kwargs,
+    )
+    instrumented = InstrumentedPool(
+        pool,
+        name,
+        min_size=min_size,
+        max_size=max_size,
+        adaptive=adaptive,
+    )
+    _pools[name] = instrumented
+    return instrumented
+
+
+def unregister_pool(name: str) -> None:
+    _pools.pop(name, None)
+
+
+def get_pool_snapshots() -> dict[str, dict[str, Any]]:
+    return {name: pool.snapshot() for name, pool in _pools.items()}
+
+
+def render_prometheus() -> str:
+    """Render all registered pools in Prometheus text exposition format."""
+    lines = [
+        "# HELP db_pool_acquire_wait_ms Time spent waiting to acquire a connection.",
+        "# TYPE db_pool_acquire_wait_ms histogram",
+    ]
+    for name, pool in _pools.items():
+        histogram = pool._acquire_histogram
+        for bound, count in histogram.cumulative():
+            lines.append(f'db_pool_acquire_wait_ms_bucket{{pool="{name}",le="{bound}"}} {count}')
+        lines.append(f'db_pool_acquire_wait_ms_sum{{pool="{name}"}} {histogram.total:.3f}')
+        lines.append(f'db_pool_acquire_wait_ms_count{{pool="{name}"}} {histogram.count}')
+
+    gauges = {
+        "db_pool_size": ("size", "Open connections."),
+        "db_pool_idle": ("idle", "Idle connections."),
+        "db_pool_in_use": ("in_use", "Connections currently checked out."),
+        "db_pool_limit": ("limit", "Current concurrency limit (adaptive mode)."),
+        "db_pool_long_holds_total": ("long_holds", "Connections held past the warning threshold."),
+    }
+    snapshots = get_pool_snapshots()
+    for metric, (key, help_text) in gauges.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {'counter' if metric.endswith('_total') else 'gauge'}")
+        for name, snapshot in snapshots.items():
+            lines.append(f'{metric}{{pool="{name}"}} {snapshot[key]}')
+
+    lines.append("# HELP db_pool_hold_seconds Connection hold time per call site.")
+    lines.append("# TYPE db_pool_hold_seconds summary")
+    for name, pool in _pools.items():
+        for site, stats in pool._hold_stats.items():
+            labels = f'pool="{name}",call_site="{site}"'
+            lines.append(f"db_pool_hold_seconds_sum{{{labels}}} {stats['total_seconds']:.6f}")
+            lines.append(f"db_pool_hold_seconds_count{{{labels}}} {int(stats['count'])}")
+
+    return "\n".join(lines) + "\n"
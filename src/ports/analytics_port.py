@@ -0,0 +1,56 @@
+"""
+Analytics Port Interface
+
+Defines the contract for columnar mirrors of the items table that can serve
+aggregate analyst queries instead of the OLTP database.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Loader used to mirror the items table: given an item id and a batch size,
+# returns up to that many rows with a greater id, ordered by id, as
+# (id, receipt_id, item_name, quantity, unit_price, total_price, purchase_date, user_id)
+ItemRowsLoader = Callable[[int, int], Awaitable[List[Tuple[Any, ...]]]]
+
+
+class AnalyticsPort(ABC):
+    """Port interface for analytical (columnar) item stores"""
+
+    @abstractmethod
+    async def start(self, loader: ItemRowsLoader) -> None:
+        """
+        Open the store, catch up with the items table and keep syncing in the background.
+
+        Args:
+            loader: Callback fetching item rows after a given id
+        """
+        pass
+
+    @abstractmethod
+    def can_serve(self, sql: str, last_write_at: Optional[float] = None) -> bool:
+        """
+        Whether ``sql`` is an aggregate-only items query this store can answer
+        within its freshness bound.
+
+        Args:
+            sql: Analyst query
+            last_write_at: time.monotonic() of the caller's last write, if recent;
+                           the store must have synced past it (read-your-writes)
+        """
+        pass
+
+    @abstractmethod
+    def notify_write(self) -> None:
+        """Schedule a sync soon after rows were written to the items table."""
+        pass
+
+    @abstractmethod
+    async def execute(self, sql: str, params: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """Run a read-only query against the mirror."""
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Stop background syncing and release the store."""
+        pass
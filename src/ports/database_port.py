@@ -6,8 +6,28 @@ Supports both sync (legacy SQLite) and async (PostgreSQL) adapters.
 """
 
 from abc import ABC, abstractmethod
-from src.domain.models import Receipt, Item
-from typing import List, Optional, Any, Dict
+from dataclasses import dataclass, field
+from datetime import datetime
+from src.domain.models import Receipt, Item, ImportCheckpoint
+from typing import List, Optional, Any, Dict, AsyncIterator, Tuple
+
+
+@dataclass(frozen=True)
+class SQLDialect:
+    """
+    What the Database Analyst needs to know to write SQL for an adapter.
+
+    Prompt fragments describe the dialect to the LLM; ``periods`` and
+    ``group_by`` are the prebuilt clauses behind get_spending_summary.
+    """
+    name: str
+    items_schema: str
+    date_functions: str  # e.g. "DATE_TRUNC, CURRENT_DATE, intervals"
+    this_month_filter: str  # Example WHERE clause for "this month"
+    month_bucket: str  # Expression grouping purchase_date by month
+    text_match: str  # Case-insensitive pattern operator
+    periods: Dict[str, str] = field(default_factory=dict)  # period -> WHERE predicate
+    group_by: Dict[str, Tuple[str, str]] = field(default_factory=dict)  # key -> (SELECT columns, GROUP/ORDER clause)
 
 
 class DatabasePort(ABC):
@@ -61,6 +81,12 @@ class AsyncDatabasePort(ABC):
     Extends capabilities with raw SQL execution and vector search
     for the Database Analyst Agent.
     """
+
+    @property
+    @abstractmethod
+    def sql_dialect(self) -> SQLDialect:
+        """SQL dialect execute_read_query() accepts, for the analyst's prompt and summaries."""
+        pass
     
     @abstractmethod
     async def connect(self) -> None:
@@ -108,9 +134,77 @@ class AsyncDatabasePort(ABC):
         self, 
         receipt_id: Optional[int] = None
     ) -> List[Item]:
-        """Get items, optionally filtered by receipt_id"""
+        """
+        Get items, optionally filtered by receipt_id.
+
+        Implementations must cap the number of returned items; use
+        iter_items() to walk the full table.
+        """
+        pass
+
+    @abstractmethod
+    def iter_items(
+        self,
+        *,
+        receipt_id: Optional[int] = None,
+        user_id: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        fetch_size: Optional[int] = None,
+    ) -> AsyncIterator[Item]:
+        """
+        Stream items ordered by (purchase_date, id) without materializing them.
+
+        Implemented as an async generator. Callers that stop early should
+        close it (e.g. via contextlib.aclosing) so the connection is released.
+
+        Args:
+            receipt_id: Only items from this receipt
+            user_id: Only items owned by this user
+            start_date: Inclusive lower bound on purchase_date
+            end_date: Exclusive upper bound on purchase_date
+            after: Keyset cursor; only items strictly after this
+                   (purchase_date, id) pair are returned
+            fetch_size: Rows fetched per round trip
+
+        Yields:
+            Item domain models with ``id`` populated
+        """
         pass
     
+    @abstractmethod
+    async def bulk_insert_items(
+        self,
+        items: List[Item],
+        *,
+        receipt_id: int,
+        user_id: Optional[str] = None,
+        checkpoint: Optional[ImportCheckpoint] = None,
+    ) -> int:
+        """
+        Insert many items in one round trip (COPY where supported).
+
+        Items are stored with whatever ``item_name_embedding`` they carry.
+        When a checkpoint is given it is persisted in the same transaction,
+        so a resumed import never double-inserts a batch.
+
+        Args:
+            items: Items to insert
+            receipt_id: Receipt/batch identifier stored on every row
+            user_id: Owner of the rows
+            checkpoint: Import progress to record atomically with the rows
+
+        Returns:
+            Number of rows inserted
+        """
+        pass
+
+    @abstractmethod
+    async def get_import_checkpoint(self, job_id: str) -> Optional[ImportCheckpoint]:
+        """Get the stored progress of a bulk import, if any."""
+        pass
+
     @abstractmethod
     async def execute_read_query(
         self,
@@ -5,7 +5,7 @@ Defines the contract for embedding providers using Pydantic models.
 """
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 
 
 class EmbeddingPort(ABC):
@@ -24,6 +24,20 @@ class EmbeddingPort(ABC):
         """
         pass
 
+    @abstractmethod
+    async def generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Generate embedding vectors for many texts, batching provider requests.
+
+        Args:
+            texts: Input texts to embed
+
+        Returns:
+            One entry per input, in input order: the embedding vector, or None
+            if that text could not be embedded
+        """
+        pass
+
     @abstractmethod
     def get_model_name(self) -> str:
         """Get the current embedding model name"""
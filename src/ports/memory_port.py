@@ -7,7 +7,7 @@ Contracts for short-term and long-term conversational memory adapters.
 from abc import ABC, abstractmethod
 from typing import Any
 
-from src.domain.models import MemoryRecord, MemorySearchResult
+from src.domain.models import MemoryDocument, MemoryRecord, MemorySearchResult, SessionSummary
 
 
 class ShortTermMemoryPort(ABC):
@@ -23,6 +23,11 @@ class ShortTermMemoryPort(ABC):
         """Persist a single chat message."""
         pass
 
+    async def add_messages(self, records: list[MemoryRecord]) -> None:
+        """Persist several chat messages in order (adapters may override with a bulk write)."""
+        for record in records:
+            await self.add_message(record)
+
     @abstractmethod
     async def get_recent_messages(
         self,
@@ -33,6 +38,14 @@ class ShortTermMemoryPort(ABC):
         """Fetch recent messages for a session."""
         pass
 
+    async def get_summary(self, session_id: str) -> SessionSummary | None:
+        """Rolling summary of the session's older messages (adapters without storage keep none)."""
+        return None
+
+    async def save_summary(self, summary: SessionSummary) -> None:
+        """Persist a session summary unless a stored one already covers more of the session."""
+        pass
+
     @abstractmethod
     async def close(self) -> None:
         """Release any resources."""
@@ -59,6 +72,36 @@ class LongTermMemoryPort(ABC):
         """Persist a semantic memory document."""
         pass
 
+    async def store_memories(self, memories: list[MemoryDocument]) -> None:
+        """Persist several memory documents (adapters may override with a bulk upsert)."""
+        for memory in memories:
+            await self.store_memory(
+                memory_id=memory.memory_id,
+                embedding=memory.embedding,
+                content=memory.content,
+                metadata=memory.metadata,
+            )
+
+    @abstractmethod
+    async def count_memories_by_user(self, *, limit: int) -> dict[str, int]:
+        """Memory counts of the ``limit`` users with the most memories."""
+        pass
+
+    @abstractmethod
+    async def list_memories(self, *, user_id: str) -> list[MemoryDocument]:
+        """All of a user's memories, with embeddings and metadata."""
+        pass
+
+    @abstractmethod
+    async def delete_memories(self, memory_ids: list[str], *, user_id: str | None = None) -> None:
+        """Delete memories by id (``user_id`` routes the request when the store is sharded by user)."""
+        pass
+
+    @abstractmethod
+    async def mark_retrieved(self, memory_ids: list[str], *, user_id: str | None = None) -> None:
+        """Record that these memories were just recalled (drives least-recently-retrieved eviction)."""
+        pass
+
     @abstractmethod
     async def search(
         self,
@@ -67,8 +110,9 @@ class LongTermMemoryPort(ABC):
         session_id: str | None,
         user_id: str | None,
         limit: int,
+        with_vectors: bool = False,
     ) -> list[MemorySearchResult]:
-        """Search semantically related memories."""
+        """Search semantically related memories (``with_vectors`` also returns their embeddings)."""
         pass
 
     @abstractmethod
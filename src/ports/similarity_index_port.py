@@ -0,0 +1,59 @@
+"""
+Similarity Index Port Interface
+
+Defines the contract for in-process item-name similarity engines that can
+stand in for the database's vector search behind AsyncDatabasePort.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from src.domain.models import Item
+
+# Loader used to catch the index up with the database: given the last indexed
+# item id, returns (new watermark, items with embeddings inserted after it)
+IndexLoader = Callable[[int], Awaitable[Tuple[int, List[Item]]]]
+
+
+class SimilarityIndexPort(ABC):
+    """Port interface for item-name similarity indexes"""
+
+    @abstractmethod
+    async def load(self) -> None:
+        """Open persisted index state, if any."""
+        pass
+
+    @abstractmethod
+    async def sync(self, loader: IndexLoader) -> None:
+        """
+        Catch up with rows written since the stored watermark and keep doing
+        so periodically (e.g. rows saved by other workers).
+
+        Args:
+            loader: Callback fetching items inserted after a given item id
+        """
+        pass
+
+    @abstractmethod
+    async def add_items(self, items: List[Item]) -> None:
+        """Insert or refresh entries for the items' names (items need embeddings)."""
+        pass
+
+    @abstractmethod
+    async def search(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the most similar distinct item names, most similar first.
+
+        Returns:
+            List of dicts with item_name, similarity_score, total_price, purchase_date
+        """
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Persist pending changes and stop background work."""
+        pass
@@ -17,11 +17,40 @@ class Settings(BaseSettings):
     STT_PROVIDER: str = "gemini"  # Options: "gemini"
     TTS_PROVIDER: str = "elevenlabs"  # Options: "elevenlabs"
     VISION_PROVIDER: str = "groq"  # Options: "groq"
-    EMBEDDING_PROVIDER: str = "gemini"  # Options: "gemini"
+    EMBEDDING_PROVIDER: str = "gemini"  # Options: "gemini", "local" (offline hashed n-grams)
 
     # Database Configuration
     DATABASE_PROVIDER: str = "postgres"  # Options: "sqlite", "postgres"
     DATABASE_URL: str
+    SQLITE_DATABASE_PATH: str = "receipts_final.db"
+    SQLITE_POOL_SIZE: int = 4  # Pooled connections and executor threads
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE_MB: int = 256
+    ITEMS_FETCH_SIZE: int = 500  # Rows per round trip when streaming items
+    ITEMS_LIST_HARD_CAP: int = 10000  # Max items returned by get_items()
+
+    # Connection pool sizing and instrumentation
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 10
+    MEMORY_POOL_MIN_SIZE: int = 1
+    MEMORY_POOL_MAX_SIZE: int = 5
+    POOL_LONG_HOLD_WARNING_SECONDS: float = 2.0
+    POOL_ADAPTIVE_ENABLED: bool = False  # Grow/shrink usable pool size between min and max
+    POOL_ADAPTIVE_GROW_WAIT_MS: float = 50.0  # p95 acquire wait that triggers growth
+    POOL_ADAPTIVE_SHRINK_WAIT_MS: float = 5.0  # p95 acquire wait below which the pool may shrink
+    POOL_ADAPTIVE_INTERVAL_SECONDS: float = 10.0
+
+    # Read replicas (analyst reads); writes always go to DATABASE_URL
+    DATABASE_REPLICA_URLS: str = ""  # Comma-separated replica DSNs
+    DATABASE_REPLICA_SELECTION: str = "round_robin"  # Options: "round_robin", "least_loaded"
+    READ_YOUR_WRITES_WINDOW_SECONDS: float = 5.0  # Session reads stay on primary after a save
+
+    # Bulk statement import
+    IMPORT_BATCH_SIZE: int = 5000  # Source rows per COPY batch/checkpoint
+    IMPORT_EMBEDDING_CACHE_SIZE: int = 100000  # Distinct item names kept in memory
+    IMPORT_API_TOKEN: str = ""  # Bearer token for the /import API; empty disables it
+    IMPORT_MAX_UPLOAD_MB: int = 50  # Larger uploads get 413; import bigger files with the CLI
+    IMPORT_MAX_TRACKED_JOBS: int = 100  # Finished API jobs whose progress stays queryable in memory
 
     # Model Configuration
     MAIN_MODEL_NAME: str = "llama-3.3-70b-versatile"
@@ -31,13 +60,95 @@ class Settings(BaseSettings):
     TTS_MODEL_NAME: str = "eleven_multilingual_v2"
     EMBEDDING_MODEL_NAME: str = "gemini-embedding-001"
     EMBEDDING_DIMENSION: int = 768
+    EMBEDDING_STORAGE_MODE: str = "float32"  # Options: "float32" (vector), "half" (halfvec), "binary" (halfvec + bit index, reranked)
+    EMBEDDING_STORAGE_AUTO_MIGRATE: bool = False  # Convert the items column on connect when the mode changes
+    EMBEDDING_BINARY_RERANK_FACTOR: int = 10  # Candidates per result fetched by the binary scan before exact rerank
+    EMBEDDING_SEARCH_CANDIDATE_FACTOR: int = 4  # Nearest rows per result taken from the float32/half index before de-duplicating item names
+    EMBEDDING_IVFFLAT_PROBES: int = 10  # ivfflat lists searched per query in float32 mode (of 100)
+    LOCAL_EMBEDDING_WORKERS: int = 2  # Threads for EMBEDDING_PROVIDER=local
+    EMBEDDING_BATCH_SIZE: int = 100  # Texts per embed_content request (Gemini max: 100)
+    EMBEDDING_BATCH_CONCURRENCY: int = 4  # Batch requests in flight per generate_embeddings() call
+    EMBEDDING_RETRY_ATTEMPTS: int = 4  # Tries per batch request on rate limits (429), 5xx and network errors
+    EMBEDDING_RETRY_BASE_SECONDS: float = 0.5  # First retry delay, doubled after each failure
+    EMBEDDING_COALESCE_ENABLED: bool = True  # Micro-batch concurrent single-text requests
+    EMBEDDING_COALESCE_WINDOW_MS: float = 5.0  # Wait for more requests before sending a batch
+    EMBEDDING_COALESCE_MAX_BATCH: int = 100  # Distinct texts that flush a batch immediately
+    EMBEDDING_REQUEST_TIMEOUT_SECONDS: float = 10.0  # Per-request deadline for coalesced requests
+    EMBEDDING_CACHE_ENABLED: bool = True  # LRU + on-disk cache in front of the embedding provider
+    EMBEDDING_CACHE_MEMORY_SIZE: int = 20000  # Vectors kept in memory
+    EMBEDDING_CACHE_PATH: str = "data/embedding_cache.db"  # SQLite file for the persistent tier; empty disables it
+    EMBEDDING_CACHE_DISK_MAX_ENTRIES: int = 500000
+    EMBEDDING_BACKFILL_ENABLED: bool = True  # Embed items saved without a vector; re-embed after model/dimension changes
+    EMBEDDING_BACKFILL_INTERVAL_SECONDS: float = 300.0  # Pause between backfill passes once caught up
+    EMBEDDING_BACKFILL_BATCH_SIZE: int = 500  # Items per provider call and bulk update
+    EMBEDDING_BACKFILL_RATE_PER_SECOND: float = 50.0  # Max texts the backfill sends to the provider per second
+
+    # Item Similarity Engine Configuration
+    SIMILARITY_ENGINE: str = "database"  # Options: "database" (pgvector / SQL scan), "numpy" (in-process index)
+    SIMILARITY_INDEX_DIR: str = "data/similarity_index"
+    SIMILARITY_INDEX_REFRESH_SECONDS: float = 60.0  # Catch up with rows written by other workers (0 disables)
+    SIMILARITY_INDEX_FLUSH_SECONDS: float = 5.0  # Debounce between an update and writing the .npy file
+    SIMILARITY_INDEX_INLINE_MAX_ROWS: int = 50000  # Larger indexes are searched in a worker thread
+    SIMILARITY_INDEX_SYNC_OVERLAP_IDS: int = 1000  # Trailing ids re-read per catch-up (out-of-order commits)
+
+    # Analytics Mirror Configuration
+    ANALYTICS_ENGINE: str = "none"  # Options: "none", "duckdb" (requires the analytics extra)
+    ANALYTICS_DUCKDB_PATH: str = "data/analytics.duckdb"
+    ANALYTICS_SYNC_INTERVAL_SECONDS: float = 30.0
+    ANALYTICS_SYNC_DEBOUNCE_SECONDS: float = 0.5  # Wait after a write before syncing
+    ANALYTICS_SYNC_BATCH_SIZE: int = 50000
+    ANALYTICS_SYNC_OVERLAP_IDS: int = 10000  # Trailing ids re-read per sync (out-of-order commits)
+    ANALYTICS_MAX_STALENESS_SECONDS: float = 120.0  # Older mirrors fall back to the database
+    ANALYTICS_TIMEZONE: str = "UTC"  # Should match the Postgres server TimeZone
 
     # Conversation Memory Configuration
     MEMORY_ENABLED: bool = True
     MEMORY_TOP_K: int = 3
+    MEMORY_CANDIDATE_FACTOR: int = 3  # Long-term candidates fetched per prompt slot, for the filters below
+    MEMORY_MIN_SIMILARITY: float = 0.4  # Long-term memories scoring below this are left out
+    MEMORY_MMR_LAMBDA: float = 0.7  # Relevance vs. diversity when picking memories (1.0 = relevance only)
+    MEMORY_RECENCY_WEIGHT: float = 0.0  # 0 disables; up to 1.0 ranks purely by recency-decayed score
+    MEMORY_RECENCY_HALF_LIFE_DAYS: float = 30.0
     SHORT_TERM_MEMORY_LIMIT: int = 8
     SHORT_TERM_MEMORY_TTL_HOURS: int = 24
+    SHORT_TERM_MEMORY_SWEEP_INTERVAL_SECONDS: float = 600.0  # Delete expired messages in the background (0 disables)
+    SHORT_TERM_MEMORY_SWEEP_BATCH_SIZE: int = 1000  # Rows per DELETE statement
+    SHORT_TERM_CACHE_ENABLED: bool = True  # In-process ring buffer of each active session's recent messages
+    SHORT_TERM_CACHE_MAX_SESSIONS: int = 10000  # Least recently used sessions are dropped beyond this
+    SHORT_TERM_CACHE_INVALIDATION: str = "postgres"  # Options: "postgres" (LISTEN/NOTIFY on DATABASE_URL), "none" (single worker only)
+    SHORT_TERM_CACHE_CHANNEL: str = "short_term_memory_invalidate"
+    SHORT_TERM_CACHE_LISTEN_URL: str = ""  # Direct/session-mode DSN for LISTEN; required when DATABASE_URL is a transaction pooler (empty = DATABASE_URL)
+    SHORT_TERM_SUMMARY_ENABLED: bool = False  # Replace older history with a rolling per-session LLM summary
+    SHORT_TERM_SUMMARY_KEEP_MESSAGES: int = 6  # Newest messages always sent raw
+    SHORT_TERM_SUMMARY_FOLD_MESSAGES: int = 6  # Older messages folded into the summary per LLM call
+    SHORT_TERM_SUMMARY_MAX_CHARS: int = 1500
+    SHORT_TERM_SUMMARY_CACHE_SECONDS: float = 60.0  # How long a worker trusts its cached copy of a summary
     MEMORY_MIN_CONTENT_LENGTH: int = 12
+    MEMORY_SHORT_TERM_TIMEOUT_SECONDS: float = 1.0  # Recent history fetch; on timeout the turn has no history
+    MEMORY_LONG_TERM_TIMEOUT_SECONDS: float = 1.5  # Embedding + long-term search; on timeout no long-term memory
+    MEMORY_WRITE_BEHIND_ENABLED: bool = True  # Persist turns from a background queue instead of before the reply
+    MEMORY_WRITE_QUEUE_SIZE: int = 1000  # Queued turns before store_turn() waits for the writer
+    MEMORY_WRITE_BATCH_SIZE: int = 50  # Max turns per batched write
+    MEMORY_WRITE_LINGER_MS: float = 20.0  # Wait for more turns before writing a partial batch
+    MEMORY_WRITE_DRAIN_TIMEOUT_SECONDS: float = 10.0  # Max time spent flushing the queue on shutdown
+    MEMORY_WRITE_RETRY_ATTEMPTS: int = 3  # Tries per batch before turns that still fail are dropped
+    MEMORY_WRITE_RETRY_BASE_SECONDS: float = 0.5  # First retry delay, doubled after each failure
+
+    # Long-term memory backend
+    LONG_TERM_MEMORY_PROVIDER: str = "qdrant"  # Options: "qdrant" (disabled without QDRANT_URL), "local" (single process only)
+    LOCAL_MEMORY_DIR: str = "data/long_term_memory"  # Snapshot + append-only log for the local backend
+    LOCAL_MEMORY_COMPACT_EVERY: int = 1000  # Log entries folded into a new snapshot
+    LOCAL_MEMORY_FSYNC: bool = False  # fsync the log on every write (survives power loss, slower)
+
+    # Long-term memory consolidation (enable on one worker only)
+    MEMORY_CONSOLIDATION_ENABLED: bool = False
+    MEMORY_CONSOLIDATION_INTERVAL_SECONDS: float = 3600.0
+    MEMORY_CONSOLIDATION_MIN_AGE_HOURS: float = 24.0  # Newer memories are left alone
+    MEMORY_CONSOLIDATION_SIMILARITY: float = 0.9  # Cosine similarity at which memories are merged
+    MEMORY_CONSOLIDATION_SUMMARIZER: str = "extractive"  # Options: "extractive" (keep the most central memory), "llm"
+    MEMORY_CONSOLIDATION_LLM_BATCH: int = 10  # Clusters summarized per LLM call
+    MEMORY_CONSOLIDATION_USERS_PER_RUN: int = 1000  # Users with the most memories are visited first
+    MEMORY_MAX_PER_USER: int = 500  # Least recently retrieved memories beyond this are deleted
 
     # Supabase short-term memory
     SUPABASE_URL: str = ""
@@ -50,6 +161,21 @@ class Settings(BaseSettings):
     QDRANT_API_KEY: str = ""
     QDRANT_COLLECTION_NAME: str = "conversation_memory"
     MEMORY_EMBEDDING_DIMENSION: int = 768
+    QDRANT_PREFER_GRPC: bool = False  # Use the gRPC API; QDRANT_GRPC_PORT must be reachable (no fallback to REST)
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_UPSERT_BATCH_SIZE: int = 256  # Points per upsert request
+    QDRANT_QUANTIZATION: str = "none"  # Options: "none", "scalar" (int8, ~4x less RAM), "binary" (~32x, best for >= 768 dims)
+    QDRANT_QUANTIZATION_ALWAYS_RAM: bool = True  # Keep quantized vectors in RAM even when originals are on disk
+    QDRANT_SEARCH_RESCORE: bool = True  # Rescore quantized candidates with the original vectors
+    QDRANT_SEARCH_OVERSAMPLING: float = 2.0  # Quantized candidates fetched per requested result
+    QDRANT_SEARCH_HNSW_EF: int = 0  # Search-time ef; 0 uses the server default
+    QDRANT_HNSW_M: int = 16
+    QDRANT_HNSW_EF_CONSTRUCT: int = 100
+    QDRANT_ON_DISK_VECTORS: bool = False  # Memory-map original vectors from disk
+    QDRANT_ON_DISK_PAYLOAD: bool = False
+    QDRANT_TENANT_INDEX: bool = False  # Tenant index on user_id with per-user HNSW links
+    QDRANT_SHARD_NUMBER: int = 0  # Shards at collection creation (0 = server default)
+    QDRANT_TENANT_SHARD_KEYS: int = 0  # Custom sharding: users hashed onto this many shard keys (distributed Qdrant only; fixed at creation)
 
     # Define a threshold for detecting silence and a timeout for ending a turn
     SILENCE_THRESHOLD: int = 3500
@@ -59,6 +185,11 @@ class Settings(BaseSettings):
     WHATSAPP_TOKEN: str
     WHATSAPP_PHONE_NUMBER_ID: str
     WHATSAPP_VERIFY_TOKEN: str
+    WHATSAPP_APP_SECRET: str = ""  # Verifies X-Hub-Signature-256 on webhooks; empty skips the check
+    WHATSAPP_WORKER_CONCURRENCY: int = 4  # Messages processed at once (one at a time per sender)
+    WHATSAPP_QUEUE_SIZE: int = 500  # Queued messages before the webhook answers 503 so WhatsApp retries
+    WHATSAPP_DEDUPE_SIZE: int = 10000  # Recent message ids remembered to drop redeliveries
+    WHATSAPP_DRAIN_TIMEOUT_SECONDS: float = 30.0  # Shutdown wait for queued messages
 
     # Telegram Bot API credentials
     TELEGRAM_BOT_TOKEN: str = ""
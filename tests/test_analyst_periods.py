@@ -0,0 +1,76 @@
+"""
+The analyst's get_spending_summary tool must produce valid SQL for every
+database adapter, not just Postgres.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.adapters.database.async_sqlite_adapter import AsyncSQLiteAdapter, _to_db_timestamp
+from src.agents.database_analyst_agent import _handle_get_spending_summary, analyst_system_prompt
+
+PERIODS = ["today", "this_week", "this_month", "last_month", "this_year", "last_7_days", "last_30_days"]
+GROUP_BYS = ["none", "day", "week", "month", "item_name"]
+
+
+def _purchases() -> list[tuple[str, float, datetime]]:
+    now = datetime.now(timezone.utc)
+    month_start = now.replace(day=1, hour=12, minute=0, second=0, microsecond=0)
+    last_month = (month_start - timedelta(days=1)).replace(day=2)
+    return [
+        ("milk", 2.0, now),
+        ("bread", 3.0, last_month),
+        ("rice", 5.0, now - timedelta(days=800)),
+    ]
+
+
+async def _summaries(db_path: str) -> dict[tuple[str, str], dict]:
+    db = AsyncSQLiteAdapter(db_path=db_path, pool_size=1)
+    await db.connect()
+    try:
+        async with db._require_pool().acquire() as conn:
+            conn.executemany(
+                "INSERT INTO items (item_name, quantity, unit_price, total_price, purchase_date) "
+                "VALUES (?, 1, ?, ?, ?)",
+                [(name, price, price, _to_db_timestamp(when)) for name, price, when in _purchases()],
+            )
+        return {
+            (period, group_by): json.loads(
+                await _handle_get_spending_summary(db, {"period": period, "group_by": group_by}, time.time())
+            )
+            for period in PERIODS
+            for group_by in GROUP_BYS
+        }
+    finally:
+        await db.disconnect()
+
+
+@pytest.fixture(scope="module")
+def sqlite_summaries(tmp_path_factory) -> dict[tuple[str, str], dict]:
+    return asyncio.run(_summaries(str(tmp_path_factory.mktemp("analyst") / "items.db")))
+
+
+@pytest.mark.parametrize("group_by", GROUP_BYS)
+@pytest.mark.parametrize("period", PERIODS)
+def test_every_period_runs_on_sqlite(sqlite_summaries, period, group_by):
+    result = sqlite_summaries[(period, group_by)]
+    assert result["status"] in ("success", "no_results"), result
+
+
+@pytest.mark.parametrize(
+    ("period", "expected"),
+    [("today", 2.0), ("last_7_days", 2.0), ("this_month", 2.0), ("last_month", 3.0)],
+)
+def test_sqlite_periods_select_the_right_rows(sqlite_summaries, period, expected):
+    result = sqlite_summaries[(period, "none")]
+    assert result["results"][0]["total_spent"] == expected
+
+
+def test_sqlite_prompt_describes_sqlite():
+    prompt = analyst_system_prompt(AsyncSQLiteAdapter(db_path=":memory:").sql_dialect)
+    assert "SQLite" in prompt
+    assert "DATE_TRUNC" not in prompt and "ILIKE" not in prompt